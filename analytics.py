@@ -2,43 +2,272 @@
 # decorators pattern included
 
 from __future__ import annotations
-from typing import Dict, Any
-from models import Instrument
+from typing import Dict, Any, Iterable
+from collections import deque
+from models import Instrument, MarketDataPoint
 import math
+import numpy as np
+
+
+class SymbolAnalytics:
+    """Incremental per-symbol state; every field is updated in O(1) per tick."""
+    __slots__ = ("version", "last_price", "returns", "ret_sum", "ret_sumsq", "ewma_var", "n_returns",
+                 "peak", "max_drawdown", "bench_ref", "pairs", "sx", "sy", "sxx", "sxy")
+
+    def __init__(self) -> None:
+        self.version = 0
+        self.last_price: float | None = None
+        self.returns: deque = deque()
+        self.ret_sum = 0.0
+        self.ret_sumsq = 0.0
+        self.ewma_var: float | None = None
+        self.n_returns = 0
+        self.peak = 0.0
+        self.max_drawdown = 0.0
+        self.bench_ref: float | None = None     # benchmark price at this symbol's previous tick
+        self.pairs: deque = deque()             # (benchmark return, symbol return)
+        self.sx = self.sy = self.sxx = self.sxy = 0.0
+
+
+class StreamingAnalytics:
+    """
+    Shared per-symbol analytics fed from the tick stream (use .update as the engine's on_tick).
+    - rolling and EWMA volatility of log returns
+    - rolling beta against `benchmark`; the benchmark return is taken over the
+      same interval as the symbol's return, so asynchronous ticks line up
+    - running max drawdown from the running peak
+    """
+    def __init__(self, window: int = 20, ewma_lambda: float = 0.94, benchmark: str = "SPY"):
+        self.window = window
+        self.ewma_lambda = ewma_lambda
+        self.benchmark = benchmark
+        self.version = 0
+        self._state: Dict[str, SymbolAnalytics] = {}
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._state
+
+    def symbol_version(self, symbol: str) -> int:
+        st = self._state.get(symbol)
+        return st.version if st else -1
+
+    def update(self, tick: MarketDataPoint) -> None:
+        st = self._state.get(tick.symbol)
+        if st is None:
+            st = self._state[tick.symbol] = SymbolAnalytics()
+        price = float(tick.price)
+        bench = self._state.get(self.benchmark)
+        bench_px = bench.last_price if bench is not None else None
+        if tick.symbol == self.benchmark:
+            bench_px = price
+
+        if st.last_price and price > 0:
+            r = math.log(price / st.last_price)
+            self._push_return(st, r)
+            if bench_px and st.bench_ref:
+                self._push_pair(st, math.log(bench_px / st.bench_ref), r)
+
+        st.peak = max(st.peak, price)
+        if st.peak > 0:
+            st.max_drawdown = max(st.max_drawdown, 1.0 - price / st.peak)
+        st.last_price = price
+        st.bench_ref = bench_px
+        st.version += 1
+        self.version += 1
+
+    __call__ = update
+
+    def _push_return(self, st: SymbolAnalytics, r: float) -> None:
+        st.returns.append(r)
+        st.ret_sum += r
+        st.ret_sumsq += r * r
+        if len(st.returns) > self.window:
+            old = st.returns.popleft()
+            st.ret_sum -= old
+            st.ret_sumsq -= old * old
+        lam = self.ewma_lambda
+        st.ewma_var = r * r if st.ewma_var is None else lam * st.ewma_var + (1 - lam) * r * r
+        st.n_returns += 1
+
+    def _push_pair(self, st: SymbolAnalytics, x: float, y: float) -> None:
+        st.pairs.append((x, y))
+        st.sx += x; st.sy += y; st.sxx += x * x; st.sxy += x * y
+        if len(st.pairs) > self.window:
+            ox, oy = st.pairs.popleft()
+            st.sx -= ox; st.sy -= oy; st.sxx -= ox * ox; st.sxy -= ox * oy
+
+    # ==== readers ====
+    def volatility(self, symbol: str) -> float:
+        st = self._state.get(symbol)
+        n = len(st.returns) if st else 0
+        if n < 2:
+            return 0.0
+        var = (st.ret_sumsq - st.ret_sum * st.ret_sum / n) / (n - 1)
+        return math.sqrt(max(var, 0.0))
+
+    def ewma_volatility(self, symbol: str) -> float:
+        st = self._state.get(symbol)
+        return math.sqrt(st.ewma_var) if st and st.ewma_var is not None else 0.0
+
+    def beta(self, symbol: str) -> float:
+        if symbol == self.benchmark:
+            return 1.0
+        st = self._state.get(symbol)
+        n = len(st.pairs) if st else 0
+        if n < 2:
+            return 0.0
+        var_b = st.sxx - st.sx * st.sx / n
+        if var_b <= 1e-18:
+            return 0.0
+        return (st.sxy - st.sx * st.sy / n) / var_b
+
+    def max_drawdown(self, symbol: str) -> float:
+        st = self._state.get(symbol)
+        return st.max_drawdown if st else 0.0
+
+    def metrics(self, symbol: str) -> Dict[str, float]:
+        return {"volatility": self.volatility(symbol), "ewma_volatility": self.ewma_volatility(symbol),
+                "beta": self.beta(symbol), "max_drawdown": self.max_drawdown(symbol)}
+
+
+def _overrides_get_metrics(instrument: Instrument) -> bool:
+    return isinstance(instrument, InstrumentDecorator) and \
+        type(instrument).get_metrics is not InstrumentDecorator.get_metrics
 
 
 class InstrumentDecorator(Instrument):
-    def __init__(self, instrument: Instrument):
+    """
+    Base decorator. Pass `analytics` (a StreamingAnalytics) once, usually to the
+    innermost decorator; outer layers inherit it. Symbols the analytics state has
+    not seen fall back to the static price-only formulas.
+
+    A stack is flattened at construction: get_metrics() builds one dict from the
+    base instrument, lets every layer _decorate() it, and memoizes the result
+    until the base price_version or the symbol's analytics version changes.
+    A layer written the older way (overriding get_metrics) cannot be flattened:
+    layers above it treat it as their base and are not memoized, since its
+    output may change without a version bump.
+    """
+    def __init__(self, instrument: Instrument, analytics: StreamingAnalytics | None = None):
         super().__init__(instrument.symbol, instrument.price)
         self._instrument = instrument
+        self.analytics = analytics if analytics is not None else getattr(instrument, "analytics", None)
+        if isinstance(instrument, InstrumentDecorator) and not _overrides_get_metrics(instrument):
+            self._base, self._layers = instrument._base, instrument._layers + (self,)
+            self._memoize = instrument._memoize
+        else:
+            self._base, self._layers = instrument, (self,)
+            self._memoize = not _overrides_get_metrics(instrument)
+        self._cache_key = None
+        self._cache: Dict[str, Any] | None = None
+
+    def _live(self) -> StreamingAnalytics | None:
+        a = self.analytics
+        return a if a is not None and self.symbol in a else None
+
+    def _version(self):
+        base = self._base
+        price_key = getattr(base, "price_version", None)
+        if price_key is None:
+            price_key = ("price", base.price)
+        a = self.analytics
+        return (price_key, a.symbol_version(self.symbol) if a is not None else -1)
+
+    def _decorate(self, metrics: Dict[str, Any]) -> None:
+        pass
 
     def get_metrics(self) -> Dict[str, Any]:
-        return self._instrument.get_metrics()
+        if not self._memoize:
+            metrics = self._base.get_metrics()
+            for layer in self._layers:
+                layer._decorate(metrics)
+            return metrics
+        key = self._version()
+        if key != self._cache_key:
+            metrics = self._base.get_metrics()
+            for layer in self._layers:
+                layer._decorate(metrics)
+            self._cache_key, self._cache = key, metrics
+        return dict(self._cache)
 
 
 class VolatilityDecorator(InstrumentDecorator):
-    def get_metrics(self) -> Dict[str, Any]:
-        metrics = super().get_metrics()
+    def _decorate(self, metrics: Dict[str, Any]) -> None:
+        live = self._live()
+        if live is not None:
+            metrics["volatility"] = round(live.volatility(self.symbol), 6)
+            metrics["ewma_volatility"] = round(live.ewma_volatility(self.symbol), 6)
+            return
         price = float(metrics.get("price", 0.0))
         vol = (math.log1p(price) % 0.2) + 0.01  # deterministic small number
         metrics["volatility"] = round(vol, 6)
-        return metrics
 
 
 class BetaDecorator(InstrumentDecorator):
-    def get_metrics(self) -> Dict[str, Any]:
-        metrics = super().get_metrics()
+    def _decorate(self, metrics: Dict[str, Any]) -> None:
+        live = self._live()
+        if live is not None:
+            metrics["beta"] = round(live.beta(self.symbol), 6)
+            return
         price = float(metrics.get("price", 0.0))
         beta = 0.8 + ((price % 10) / 50)  # deterministic function of price
         metrics["beta"] = round(beta, 6)
-        return metrics
 
 
 class DrawdownDecorator(InstrumentDecorator):
-    def get_metrics(self) -> Dict[str, Any]:
-        metrics = super().get_metrics()
+    def _decorate(self, metrics: Dict[str, Any]) -> None:
+        live = self._live()
+        if live is not None:
+            metrics["max_drawdown"] = round(live.max_drawdown(self.symbol), 6)
+            return
         price = float(metrics.get("price", 0.0))
         frac = price - float(int(price))
         drawdown = min(0.5, frac)  # between 0 and 0.999..., cap 0.5
         metrics["max_drawdown"] = round(drawdown, 6)
-        return metrics
+
+
+# ==== batch API ====
+METRIC_LAYERS = {"volatility": VolatilityDecorator, "beta": BetaDecorator, "max_drawdown": DrawdownDecorator}
+
+
+def batch_metrics(instruments: Iterable[Instrument], layers: Iterable[str] = ("volatility", "beta", "max_drawdown"),
+                  analytics: StreamingAnalytics | None = None) -> Dict[str, np.ndarray]:
+    """
+    Columnar equivalent of stacking the decorators named in `layers` over every
+    instrument: returns {"symbol": ..., "price": ..., <metric>: ...} NumPy arrays.
+    Static formulas are evaluated as array ops; symbols known to `analytics`
+    take their live values instead.
+    """
+    bases = [getattr(inst, "_base", inst) for inst in instruments]
+    layers = list(layers)
+    for name in layers:
+        if name not in METRIC_LAYERS:
+            raise ValueError(f"Unknown metric layer: {name}")
+    symbols = np.array([b.symbol for b in bases], dtype=object)
+    price = np.fromiter((float(b.price) for b in bases), dtype=np.float64, count=len(bases))
+    out: Dict[str, np.ndarray] = {"symbol": symbols, "price": price}
+
+    live = np.zeros(len(bases), dtype=bool)
+    if analytics is not None:
+        live = np.fromiter((s in analytics for s in symbols), dtype=bool, count=len(bases))
+    live_syms = symbols[live]
+
+    def column(static: np.ndarray, reader) -> np.ndarray:
+        col = np.round(static, 6)
+        if live.any():
+            col[live] = np.round([reader(s) for s in live_syms], 6)
+        return col
+
+    if "volatility" in layers:
+        out["volatility"] = column(np.mod(np.log1p(price), 0.2) + 0.01,
+                                   analytics.volatility if analytics else None)
+        if live.any():
+            ewma = np.full(len(bases), np.nan)
+            ewma[live] = np.round([analytics.ewma_volatility(s) for s in live_syms], 6)
+            out["ewma_volatility"] = ewma
+    if "beta" in layers:
+        out["beta"] = column(0.8 + np.mod(price, 10) / 50, analytics.beta if analytics else None)
+    if "max_drawdown" in layers:
+        out["max_drawdown"] = column(np.minimum(0.5, price - np.trunc(price)),
+                                     analytics.max_drawdown if analytics else None)
+    return out
@@ -0,0 +1,83 @@
+# benchmarks/orderbook.py
+# order-event throughput of the heap-based OrderBook
+#
+#   python benchmarks/orderbook.py [--events 1000000] [--seed 0] [--target 1000000]
+#
+# Mix: ~60% limit adds around a drifting mid, ~30% cancels of random live
+# orders, ~10% market orders. Exits with status 1 when --target is given and
+# the measured events/sec falls below it.
+
+from __future__ import annotations
+import argparse
+import os
+import random
+import sys
+import time
+from typing import List, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from orderbook import OrderBook
+
+
+def make_events(n: int, seed: int = 0) -> List[Tuple[str, str, float, float]]:
+    """(kind, side, quantity, price) tuples; cancels pick their target at run time."""
+    rng = random.Random(seed)
+    mid, events = 100.0, []
+    for _ in range(n):
+        mid += rng.gauss(0.0, 0.01)
+        side = "BUY" if rng.random() < 0.5 else "SELL"
+        r = rng.random()
+        if r < 0.6:
+            off = rng.randint(0, 20) * 0.01
+            events.append(("limit", side, float(rng.randint(1, 10) * 10), round(mid - off if side == "BUY" else mid + off, 2)))
+        elif r < 0.9:
+            events.append(("cancel", side, 0.0, rng.random()))
+        else:
+            events.append(("market", side, float(rng.randint(1, 5) * 10), 0.0))
+    return events
+
+
+def run(events, book: OrderBook | None = None) -> Tuple[float, int]:
+    """Seconds spent and fills produced replaying `events` into one book."""
+    book = book or OrderBook("BENCH")
+    live: List[int] = []
+    submit, cancel = book.submit, book.cancel
+    fills = 0
+    t0 = time.perf_counter()
+    for kind, side, qty, px in events:
+        if kind == "limit":
+            order, f = submit(side, qty, px)
+            if order.active:
+                live.append(order.id)
+            fills += len(f)
+        elif kind == "cancel":
+            if live:
+                i = int(px * len(live))
+                oid = live[i]
+                live[i] = live[-1]
+                live.pop()
+                cancel(oid)
+        else:
+            fills += len(submit(side, qty)[1])
+    return time.perf_counter() - t0, fills
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="OrderBook event throughput")
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--target", type=float, default=None, help="minimum events/sec")
+    args = parser.parse_args(argv)
+
+    events = make_events(args.events, args.seed)
+    secs, fills = run(events)
+    rate = args.events / secs
+    print(f"{args.events} events in {secs:.2f}s -> {rate:,.0f} events/sec ({fills} fills)")
+    return 1 if args.target and rate < args.target else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
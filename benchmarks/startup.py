@@ -0,0 +1,80 @@
+# benchmarks/startup.py
+# cold-start and per-module import-time budget check
+#
+#   python benchmarks/startup.py [--config data/config.json] [--repeat 5]
+#
+# Budgets (milliseconds) come from "startup_budget_ms" in config.json; the key
+# "main.py --help" is the CLI cold start, every other key is a module name.
+# Exits with status 1 when any measurement exceeds its budget. The pytest
+# wrapper (tests/test_startup_budget.py) only runs with STARTUP_BUDGET=1.
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CLI_KEY = "main.py --help"
+
+
+def measure_command(argv: List[str], repeat: int = 5) -> float:
+    """Best-of-`repeat` wall time in ms for a fresh interpreter running argv."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, *argv], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, (time.perf_counter() - t0) * 1000)
+    return best
+
+
+def measure_import(module: str, repeat: int = 3) -> float:
+    """Best-of-`repeat` cumulative import time in ms, from `python -X importtime`."""
+    best = float("inf")
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              cwd=ROOT, check=True, capture_output=True, text=True)
+        for line in proc.stderr.splitlines():
+            parts = [p.strip() for p in line.split("|")]
+            if len(parts) == 3 and parts[2] == module:
+                best = min(best, int(parts[1]) / 1000)
+    return best
+
+
+def check(budgets: Dict[str, float], repeat: int = 5) -> List[Tuple[str, float, float]]:
+    """[(name, measured_ms, budget_ms)] for every budget entry."""
+    rows = []
+    for name, budget in budgets.items():
+        if name == CLI_KEY:
+            ms = measure_command(["main.py", "--help"], repeat)
+        else:
+            ms = measure_import(name, repeat)
+        rows.append((name, ms, float(budget)))
+    return rows
+
+
+def load_budgets(config_path: str) -> Dict[str, float]:
+    with open(config_path, "r", encoding="utf-8") as f:
+        return json.load(f).get("startup_budget_ms", {})
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Startup-time budget check")
+    parser.add_argument("--config", default=os.path.join(ROOT, "data", "config.json"))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for name, ms, budget in check(load_budgets(args.config), args.repeat):
+        ok = ms <= budget
+        failed += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name:<20} {ms:8.1f} ms  (budget {budget:.0f} ms)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
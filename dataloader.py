@@ -2,15 +2,20 @@
 # adapter pattern included
 
 import csv
+import hashlib
 import json
 import os
+import pickle
+import time
 import xml.etree.ElementTree as ET
 from datetime import datetime
-from patterns.factory import InstrumentFactory
+from patterns.factory import InstrumentFactory, InstrumentRegistry
 from patterns.singleton import Config
 from models import MarketDataPoint,MarketDataContainer
 from datetime import timezone
-import pandas as pd
+from lazy import lazy_import
+
+pd = lazy_import("pandas")    # loaded on the first CSV read
 
 
 
@@ -44,6 +49,33 @@ class BloombergXMLAdapter:
         return MarketDataPoint(symbol=xml_symbol, price=xml_price, timestamp=xml_timestamp)
 
 
+def file_digest(path: str) -> str:
+    """sha256 of a file's contents, read in 1 MiB chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _load_offsets(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_offset(path: str, key: str, state: dict) -> None:
+    offsets = _load_offsets(path)
+    offsets[key] = state
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(offsets, f)
+    os.replace(tmp, path)
+
+
 def read_ticks_csv_pd(path: str):
     df = pd.read_csv(path, parse_dates=["timestamp"])
     # ensure timezone-aware
@@ -64,6 +96,7 @@ class DataLoader:
         self.portfolio_structure_path = self.cfg.get("portfolio_structure_path")
         self.report_path = self.cfg.get("report_path")
         self.default_strategy = self.cfg.get("default_strategy")
+        self.follow_state = {}      # abs path -> live follow_market_data state (offset, bad_rows, ...)
 
 
     def load_instruments_from_csv(self):
@@ -78,6 +111,168 @@ class DataLoader:
                 instruments.append(inst)
         return instruments
 
+    def load_instruments_bulk(self, file_path: str | None = None):
+        """Read instruments.csv column-wise and build everything via InstrumentFactory.create_many."""
+        file_path = file_path or os.path.join(self.data_path or "./data/", "instruments.csv")
+        with open(file_path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            columns = list(zip(*reader)) or [()] * len(header)
+        return InstrumentFactory.create_many(dict(zip(header, columns)))
+
+    def load_instrument_registry(self, file_path: str | None = None, use_cache: bool = True) -> InstrumentRegistry:
+        """
+        Symbol-keyed instrument master, cached as a pickle under `cache_path`
+        (default <data_path>/.cache). The cache is reused while the CSV's size and
+        mtime match; if only the mtime moved, a content hash decides.
+        """
+        file_path = file_path or os.path.join(self.data_path or "./data/", "instruments.csv")
+        cache_dir = self.cfg.get("cache_path") or os.path.join(self.data_path or "./data/", ".cache")
+        cache_file = os.path.join(cache_dir, os.path.basename(file_path) + ".registry.pkl")
+        st = os.stat(file_path)
+        stamp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+        digest = None
+        if use_cache and os.path.exists(cache_file):
+            try:
+                with open(cache_file, "rb") as f:
+                    cached = pickle.load(f)
+                if cached["stamp"] == stamp:
+                    return cached["registry"]
+                if cached["stamp"]["size"] == stamp["size"]:
+                    digest = file_digest(file_path)
+                    if digest == cached["sha256"]:
+                        self._write_registry_cache(cache_file, stamp, digest, cached["registry"])
+                        return cached["registry"]
+            except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+                pass    # unreadable cache: rebuild
+
+        registry = InstrumentRegistry(self.load_instruments_bulk(file_path))
+        if use_cache:
+            self._write_registry_cache(cache_file, stamp, digest or file_digest(file_path), registry)
+        return registry
+
+    @staticmethod
+    def _write_registry_cache(cache_file: str, stamp: dict, digest: str, registry: InstrumentRegistry):
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp = cache_file + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"stamp": stamp, "sha256": digest, "registry": registry}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_file)
+
+    def _offsets_file(self) -> str:
+        cache_dir = self.cfg.get("cache_path") or os.path.join(self.data_path or "./data/", ".cache")
+        return os.path.join(cache_dir, "follow_offsets.json")
+
+    @staticmethod
+    def _follow_rotated(f, st, state: dict) -> bool:
+        """Different file under the same name (new inode, shrunk, or rewritten from the top)."""
+        if state["inode"] is not None and st.st_ino != state["inode"]:
+            return True
+        if st.st_size < state["offset"]:
+            return True
+        if state["head"] is not None:
+            f.seek(0)
+            return hashlib.sha1(f.read(state["head_len"])).hexdigest() != state["head"]
+        return False
+
+    @staticmethod
+    def _follow_row(line: bytes, state: dict):
+        """One complete CSV line -> MarketDataPoint, None (blank/header) or ValueError."""
+        text = line.decode("utf-8", "replace").strip()
+        if not text:
+            return None
+        row = next(csv.reader([text]))
+        if state["header"] is None:
+            state["header"] = row
+            return None
+        rec = dict(zip(state["header"], row))
+        try:
+            ts = datetime.fromisoformat(rec["timestamp"].replace("Z", "+00:00"))
+            if ts.tzinfo is None:
+                ts = ts.replace(tzinfo=timezone.utc)
+            return MarketDataPoint(symbol=rec["symbol"], price=float(rec["price"]), timestamp=ts)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"bad row {text!r}: {e}") from None
+
+    def follow_market_data(self, path: str, poll_interval: float = 1.0, max_polls: int | None = None,
+                           stop=None, offsets_path: str | None = None):
+        """
+        Tail an append-only tick CSV (timestamp,symbol,price) and yield a
+        MarketDataPoint for every newly appended row, e.g.
+            TradingEngine(data=loader.follow_market_data("market_data.csv"), ...)
+        - only bytes past the remembered offset are read on each poll; a
+          trailing line without its newline is left for the next poll
+        - the offset advances row by row as ticks are handed out, and is
+          persisted to offsets_path (default <cache_path>/follow_offsets.json)
+          after each poll and when the generator is closed, so a restart
+          resumes after the last consumed row (a hard kill re-delivers at most
+          the rows of the poll in progress)
+        - malformed rows are skipped and counted in state["bad_rows"]
+          (self.follow_state[abs path])
+        - a rotated file (new inode, shrunk, or its first bytes rewritten) is
+          read again from byte 0, skipping rows at or before the last timestamp
+        Stops after `max_polls` polls or once `stop` (threading.Event or
+        callable) is set; otherwise sleeps poll_interval between empty polls.
+        """
+        if not os.path.isabs(path):
+            path = os.path.join(self.data_path or "./data", path)
+        offsets_path = offsets_path or self._offsets_file()
+        key = os.path.abspath(path)
+        state = {"offset": 0, "header": None, "last_timestamp": None, "inode": None,
+                 "head": None, "head_len": 0, "bad_rows": 0}
+        state.update(_load_offsets(offsets_path).get(key, {}))
+        self.follow_state[key] = state
+        last_ts = datetime.fromisoformat(state["last_timestamp"]) if state["last_timestamp"] else None
+        is_stopped = (stop.is_set if hasattr(stop, "is_set") else stop) or (lambda: False)
+
+        polls, guard = 0, None
+        try:
+            while not is_stopped() and (max_polls is None or polls < max_polls):
+                polls += 1
+                chunk, end = b"", 0
+                try:
+                    f = open(path, "rb")
+                except FileNotFoundError:
+                    f = None
+                if f is not None:
+                    with f:
+                        st = os.fstat(f.fileno())
+                        if self._follow_rotated(f, st, state):     # start over on the new file
+                            state.update(offset=0, header=None, head=None, head_len=0)
+                            guard = last_ts
+                        state["inode"] = st.st_ino
+                        if st.st_size > state["offset"]:
+                            f.seek(state["offset"])
+                            chunk = f.read(st.st_size - state["offset"])
+                        end = chunk.rfind(b"\n") + 1        # complete lines only
+                        want = min(state["offset"] + end, 1024)
+                        if state["head_len"] < want:            # fingerprint of the file's first lines
+                            f.seek(0)
+                            state["head"], state["head_len"] = hashlib.sha1(f.read(want)).hexdigest(), want
+                if end == 0:
+                    if max_polls is None or polls < max_polls:
+                        time.sleep(poll_interval)
+                    continue
+
+                pos = state["offset"]
+                for line in chunk[:end].splitlines(keepends=True):
+                    pos += len(line)
+                    try:
+                        tick = self._follow_row(line, state)
+                    except ValueError:
+                        state["bad_rows"] += 1
+                        tick = None
+                    if tick is None or (guard is not None and tick.timestamp <= guard):
+                        state["offset"] = pos
+                        continue
+                    guard, last_ts = None, tick.timestamp
+                    state["offset"], state["last_timestamp"] = pos, last_ts.isoformat()
+                    yield tick
+                _save_offset(offsets_path, key, state)
+        finally:
+            _save_offset(offsets_path, key, state)
+
     def load_market_data(self, paths: str | list[str]):
         """
         Load one or more market data files (.json = Yahoo, .xml = Bloomberg)
@@ -51,11 +51,36 @@ class TradingEngine:
         return signals"""
 
 from __future__ import annotations
-from typing import Iterable, Dict, Any, List, Callable
+from typing import Iterable, Iterator, Dict, Any, List, Callable, Tuple
+from datetime import datetime, timedelta, timezone
+from itertools import repeat
+import time
 from models import MarketDataPoint
-from patterns.command import Account, ExecuteOrderCommand, CommandInvoker
+from patterns.command import Account, Command, ExecuteOrderCommand, CommandInvoker
 from patterns.observer import SignalPublisher
 from patterns.strategy import Strategy
+from pnl import MarkToMarket
+from memprofile import MemoryProfiler
+from windows import PriceWindows
+from pipeline import BarAggregator
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from recorder import SignalRecorder     # annotation only; keeps numpy off the import path
+
+_NULL_STAGE = nullcontext()
+
+def _no_stage(name: str):
+    return _NULL_STAGE
+
+def wall_clock() -> datetime:
+    """Clock for live feeds: tick lag is measured against the current UTC time."""
+    return datetime.now(timezone.utc)
+
+def replay_clock(start: datetime) -> Callable[[], datetime]:
+    """Clock that reads `start` now and advances with elapsed processing time."""
+    t0 = time.perf_counter()
+    return lambda: start + timedelta(seconds=time.perf_counter() - t0)
 
 class OrderRouter:
     def route(self, signal: Dict[str, Any]):
@@ -73,23 +98,189 @@ class BasicRisk:
         if abs(proj) > self.max_pos: return None
         return signal
 
+class EngineMetrics:
+    """Counters kept by TradingEngine.run; lag is only sampled in conflation mode."""
+    def __init__(self):
+        self.ticks_in = 0               # pulled from the data source
+        self.ticks_processed = 0        # reached strategies
+        self.conflated = 0              # dropped in favour of a newer tick of the same symbol
+        self.conflations = 0            # backlog batches that were collapsed
+        self.lag_last = 0.0
+        self.lag_max = 0.0
+        self._lag_sum = 0.0
+        self._lag_n = 0
+
+    def observe_lag(self, lag: float) -> None:
+        self.lag_last = lag
+        if lag > self.lag_max: self.lag_max = lag
+        self._lag_sum += lag; self._lag_n += 1
+
+    @property
+    def conflation_rate(self) -> float:
+        return self.conflated / self.ticks_in if self.ticks_in else 0.0
+
+    @property
+    def lag_mean(self) -> float:
+        return self._lag_sum / self._lag_n if self._lag_n else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"ticks_in": self.ticks_in, "ticks_processed": self.ticks_processed,
+                "conflated": self.conflated, "conflations": self.conflations,
+                "conflation_rate": self.conflation_rate, "lag_last": self.lag_last,
+                "lag_mean": self.lag_mean, "lag_max": self.lag_max}
+
 class TradingEngine:
     def __init__(self, data: Iterable[MarketDataPoint], strategies: List[Strategy],
                  publisher: SignalPublisher, router: OrderRouter,
                  risk: BasicRisk, account: Account, invoker: CommandInvoker,
-                 on_fill: Callable[[Dict[str, Any]], None] | None = None):
+                 on_fill: Callable[[Dict[str, Any]], None] | None = None,
+                 on_tick: Callable[[MarketDataPoint], None] | None = None,
+                 pnl: MarkToMarket | None = None,
+                 command_factory: Callable[[Account, Dict[str, Any]], Command] | None = None,
+                 profiler: MemoryProfiler | None = None,
+                 windows: PriceWindows | None = None,
+                 recorder: SignalRecorder | None = None,
+                 conflate_lag: float | None = None,
+                 clock: Callable[[], datetime] | None = None,
+                 conflate_max_batch: int = 10_000):
         self.data = data; self.strategies = strategies; self.publisher = publisher
         self.router = router; self.risk = risk; self.account = account; self.invoker = invoker
-        self.on_fill = on_fill
+        self.on_fill = on_fill; self.on_tick = on_tick; self.pnl = pnl
+        # approved order -> Command; e.g. orderbook.FillSimulator.command
+        self.command_factory = command_factory or ExecuteOrderCommand.from_signal
+        self.profiler = profiler                    # memprofile.MemoryProfiler: per-stage tracemalloc
+        self.recorder = recorder                    # recorder.SignalRecorder: capture signals for replay()
+        # conflation: once a tick is more than conflate_lag seconds behind clock(),
+        # pending ticks collapse to the latest per symbol before the tick strategies
+        # (see _conflate). The default clock is replay-paced: it starts at the first
+        # tick's timestamp and advances with elapsed processing time, so a backtest
+        # only conflates when it falls behind the data's own pace. Pass
+        # clock=wall_clock for a live feed.
+        self.conflate_lag = conflate_lag
+        self.clock = clock
+        self.conflate_max_batch = conflate_max_batch
+        self.metrics = EngineMetrics()
+        # opt-in: one price window per symbol shared by the tick strategies that can
+        # bind to it; they are bound for the duration of run() only
+        self.windows = windows
 
     def run(self):
-        for tick in self.data:                      # ← one pass over data
-            for strat in self.strategies:          # ← BOTH strategies per tick
-                for sig in strat.generate_signals(tick):
-                    self.publisher.notify(sig)      # observers
-                    order_like = self.router.route(sig)
-                    approved = self.risk.approve(order_like)
-                    if not approved: continue
-                    cmd = ExecuteOrderCommand.from_signal(self.account, approved)
-                    res = self.invoker.execute_cmd(cmd)
-                    if self.on_fill: self.on_fill(res)
+        prof = self.profiler
+        stage = prof.stage if prof else _no_stage
+        tick_strats = [s for s in self.strategies if getattr(s, "bar_interval", None) is None]
+        bar_strats: Dict[float, List[Strategy]] = {}
+        for s in self.strategies:
+            if getattr(s, "bar_interval", None) is not None:
+                bar_strats.setdefault(float(s.bar_interval), []).append(s)
+        bars = BarAggregator(bar_strats) if bar_strats else None
+        windows = self.windows
+        bound = []
+        if windows is not None:
+            for s in tick_strats:
+                if getattr(s, "bind_windows", None) and s._windows is None:
+                    s.bind_windows(windows)
+                    bound.append(s)
+        m = self.metrics
+        conflating = self.conflate_lag is not None
+        source = self._conflate() if conflating else zip(self.data, repeat(True))
+        if prof: prof.start()                           # no-op if tracemalloc is already tracing
+        try:
+            for tick, keep in source:                   # ← one pass over data
+                with stage("tick"):                     # every tick, conflated or not
+                    if windows is not None: windows.update(tick)    # before strategies read their views
+                    if self.on_tick: self.on_tick(tick)     # e.g. StreamingAnalytics.update
+                    if self.pnl: self.pnl.on_tick(tick)     # mark-to-market before new signals
+                    closed = bars.update(tick) if bars else ()
+                for bar in closed:                      # bars that ended before this tick go first
+                    self._run_strategies(bar, bar_strats[bar.interval], stage)
+                if keep:
+                    m.ticks_processed += 1
+                    self._run_strategies(tick, tick_strats, stage)
+                if prof: prof.tick()
+            if bars:
+                for bar in bars.flush():                # last partial bars at end of data
+                    self._run_strategies(bar, bar_strats[bar.interval], stage)
+        finally:
+            for s in bound:
+                s.unbind_windows()
+            if prof: prof.stop()
+        if not conflating:
+            m.ticks_in = m.ticks_processed
+
+    def _conflate(self) -> Iterator[Tuple[MarketDataPoint, bool]]:
+        """
+        Yield (tick, keep) for every tick of self.data in order. When the next
+        tick's lag (clock() - timestamp, measured after the previous tick was
+        processed) exceeds conflate_lag, read every tick that has already
+        arrived (timestamp <= now, at most conflate_max_batch); only the latest
+        per symbol is kept for the tick strategies. Windows, bars and PnL still
+        see every tick.
+        """
+        m, clock, limit = self.metrics, self.clock, self.conflate_lag
+        it = iter(self.data)
+        pending = None
+        while True:
+            if pending is not None:
+                tick, pending = pending, None
+            else:
+                tick = next(it, None)
+                if tick is None:
+                    return
+                m.ticks_in += 1
+            if clock is None:
+                clock = replay_clock(tick.timestamp)
+            now = clock()
+            lag = (now - tick.timestamp).total_seconds()
+            m.observe_lag(lag)
+            if lag <= limit:
+                yield tick, True
+                continue
+            batch = [tick]
+            for nxt in it:
+                m.ticks_in += 1
+                if nxt.timestamp > now or len(batch) >= self.conflate_max_batch:
+                    pending = nxt                   # not arrived yet: handled on the next round
+                    break
+                batch.append(nxt)
+            latest: Dict[str, int] = {}
+            for i, t in enumerate(batch):
+                latest[t.symbol] = i
+            if len(latest) < len(batch):
+                m.conflated += len(batch) - len(latest)
+                m.conflations += 1
+            for i, t in enumerate(batch):
+                yield t, latest[t.symbol] == i
+
+    def _run_strategies(self, event, strategies: List[Strategy], stage) -> None:
+        for strat in strategies:                    # ← BOTH strategies per tick
+            with stage("strategy"):
+                signals = strat.generate_signals(event)
+            for sig in signals:
+                with stage("dispatch"):
+                    sig.setdefault("strategy", type(strat).__name__)
+                    if self.recorder: self.recorder.record(event.timestamp, sig)
+                    self._dispatch(sig)
+
+    def _dispatch(self, sig: Dict[str, Any]) -> None:
+        """Signal -> observers -> router -> risk -> command -> fill hooks."""
+        self.publisher.notify(sig)      # observers
+        order_like = self.router.route(sig)
+        approved = self.risk.approve(order_like)
+        if not approved: return
+        cmd = self.command_factory(self.account, approved)
+        res = self.invoker.execute_cmd(cmd)
+        if res and res.get("status") == "executed":     # pending/resting orders report their fills later
+            self.report_fill(res)
+
+    def report_fill(self, res: Dict[str, Any] | None) -> None:
+        """Fill hooks (pnl, on_fill); also the entry for fills made outside dispatch (FillSimulator.connect)."""
+        if self.pnl: self.pnl.on_fill(res)
+        if self.on_fill: self.on_fill(res)
+
+    def replay(self, signals: Iterable[Dict[str, Any]]) -> int:
+        """Feed recorded signals (e.g. SignalRecording.signals()) straight into dispatch; no data, no strategies."""
+        n = 0
+        for sig in signals:
+            self._dispatch(sig)
+            n += 1
+        return n
@@ -0,0 +1,49 @@
+# lazy.py
+# deferred imports for heavy optional dependencies (numpy, pandas)
+
+from __future__ import annotations
+import importlib.util
+import sys
+from types import ModuleType
+
+
+_pending = set()        # registered by lazy_import, code not run yet
+
+
+class _TrackingLoader:
+    """Wraps the real loader so we know when a lazy module actually executes."""
+    def __init__(self, loader):
+        self.loader = loader
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        module.__spec__.loader = module.__loader__ = self.loader
+        self.loader.exec_module(module)
+        _pending.discard(module.__spec__.name)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Return `name` as a module whose code only runs on first attribute access.
+    Already-imported modules are returned as-is; a missing module raises
+    ModuleNotFoundError immediately, like a normal import.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(_TrackingLoader(spec.loader))
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    _pending.add(name)
+    loader.exec_module(module)
+    return module
+
+
+def is_loaded(name: str) -> bool:
+    """True once `name` has actually executed (not just been registered lazily)."""
+    return name in sys.modules and name not in _pending
@@ -1,38 +1,146 @@
 
 
 from __future__ import annotations
-from patterns.singleton import Config
-from patterns.observer import SignalPublisher, LoggerObserver, AlertObserver
-from patterns.command import Account, CommandInvoker
-from patterns.strategy import MeanReversionStrategy, BreakoutStrategy
-from dataloader import DataLoader
-from engine import TradingEngine, OrderRouter, BasicRisk
-
-def main():
-    cfg = Config("data/config.json")
-    loader = DataLoader(cfg)
+import argparse
+import os
 
-    # Build data stream: mix adapters + CSV
-    ext_ticks = loader.load_market_data(["external_data_bloomberg.xml", "external_data_yahoo.json"])
-    csv_ticks = list(loader.load_market_data("market_data.csv"))
-    data_stream = sorted([*ext_ticks, *csv_ticks], key=lambda t: t.timestamp)
 
-    # Strategies
-    strategies = [
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the trading simulation over the configured market data.")
+    parser.add_argument("--config", default="data/config.json", help="path to config.json")
+    parser.add_argument("--walk-forward", type=int, default=0, metavar="N",
+                        help="split the data into N consecutive folds, each backtested in its own process")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for --walk-forward")
+    parser.add_argument("--record", metavar="PATH", help="record strategy signals to PATH while running")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="skip data and strategies; replay signals recorded with --record")
+    return parser.parse_args(argv)
+
+
+def build_strategies():
+    from patterns.strategy import MeanReversionStrategy, BreakoutStrategy
+    return [
         MeanReversionStrategy(window=20, threshold=0.02, size=10.0),
         BreakoutStrategy(window=20, size=10.0),
     ]
 
+
+# config keys that change which signals the strategies see (reorder, conflation)
+SIGNAL_CONFIG_KEYS = ("reorder_lateness_seconds", "conflate_lag_seconds")
+
+
+def signal_fingerprint(cfg, data_files) -> str:
+    """Fingerprint of everything that shapes the signal stream: strategies, data, config."""
+    from recorder import fingerprint
+    return fingerprint(build_strategies(), data_files, extra={k: cfg.get(k) for k in SIGNAL_CONFIG_KEYS})
+
+
+def run_fold(name: str, start: int, stop: int) -> dict:
+    """Worker: attach to the shared tick arrays by name and backtest rows [start, stop)."""
+    from shm import SharedTicks
+    from patterns.observer import SignalPublisher
+    from patterns.command import Account, CommandInvoker
+    from engine import TradingEngine, OrderRouter, BasicRisk
+    from windows import PriceWindows
+
+    shared = SharedTicks.attach(name)
+    try:
+        account = Account(cash=100_000)
+        invoker = CommandInvoker()
+        TradingEngine(data=shared.ticks(start, stop), strategies=build_strategies(),
+                      publisher=SignalPublisher(), router=OrderRouter(),
+                      risk=BasicRisk(positions=account.positions, max_pos=1000, max_order=200),
+                      account=account, invoker=invoker, windows=PriceWindows()).run()
+    finally:
+        shared.close()
+    return {"start": start, "stop": stop, "orders": invoker.order_count,
+            "cash": account.cash, "positions": dict(account.positions)}
+
+
+def walk_forward(name: str, n_ticks: int, folds: int, workers: int | None = None) -> list:
+    """Run consecutive folds of a SharedTicks dataset in parallel; no tick data is pickled."""
+    from concurrent.futures import ProcessPoolExecutor
+    bounds = [(n_ticks * k // folds, n_ticks * (k + 1) // folds) for k in range(folds)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_fold, [name] * folds, *zip(*bounds)))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # heavy modules load only once we actually run
+    from patterns.singleton import Config
+    from patterns.observer import SignalPublisher, AsyncSignalPublisher, LoggerObserver, AlertObserver
+    from patterns.command import Account, CommandInvoker
+    from dataloader import DataLoader
+    from pipeline import ReorderBuffer
+    from reporting import StructuredLogSink
+    from report_store import RunReportWriter
+    from engine import TradingEngine, OrderRouter, BasicRisk
+    from memprofile import MemoryProfiler
+    from windows import PriceWindows
+    from pnl import MarkToMarket
+
+    cfg = Config(args.config)
+    loader = DataLoader(cfg)
+    ext_files = ["external_data_bloomberg.xml", "external_data_yahoo.json"]
+    data_files = [os.path.join(loader.data_path or "./data", f) for f in (*ext_files, "market_data.csv")]
+
+    recording = recorder = None
+    if args.replay or args.record:
+        from recorder import SignalRecorder, SignalRecording
+        fp = signal_fingerprint(cfg, data_files)
+        if args.replay:
+            recording = SignalRecording(args.replay).check(fp)    # StaleRecordingError if inputs changed
+        else:
+            recorder = SignalRecorder(args.record, fp)
+
+    # Build data stream: mix adapters + CSV
+    if recording is not None:
+        ext_ticks, csv_ticks = [], []
+    else:
+        ext_ticks = loader.load_market_data(ext_files)
+        csv_ticks = list(loader.load_market_data("market_data.csv"))
+    lateness = cfg.get("reorder_lateness_seconds")
+    reorder = ReorderBuffer(lateness=lateness) if lateness is not None else None
+    if reorder is not None:
+        data_stream = reorder([*ext_ticks, *csv_ticks])     # streaming reorder + dedup
+    else:
+        data_stream = sorted([*ext_ticks, *csv_ticks], key=lambda t: t.timestamp)
+
+    if args.walk_forward:
+        from shm import SharedTicks
+        with SharedTicks.create(data_stream) as shared:      # loaded once, attached by every fold
+            for fold in walk_forward(shared.name, len(shared), args.walk_forward, args.workers):
+                print(fold)
+        return
+
+    # Strategies
+    strategies = build_strategies() if recording is None else []
+
     # Observers
-    publisher = SignalPublisher()
-    publisher.attach(LoggerObserver())
+    if cfg.get("observer_dispatch", "sync") == "async":
+        publisher = AsyncSignalPublisher()
+    else:
+        publisher = SignalPublisher()
+    sink = StructuredLogSink.from_config(cfg) if cfg.get("structured_log", False) else None
+    publisher.attach(LoggerObserver(console=cfg.get("console_log", True), sink=sink))
     publisher.attach(AlertObserver(threshold=500))
+    report = RunReportWriter.from_config(cfg) if cfg.get("run_report", False) else None
+    if report is not None:
+        publisher.attach(report)
 
     # Execution
     account = Account(cash=100_000)
     invoker = CommandInvoker()
     router = OrderRouter()
     risk = BasicRisk(positions=account.positions, max_pos=1000, max_order=200)
+    pnl = MarkToMarket(cash=account.cash)
+
+    def on_fill(res):
+        if sink is not None:
+            sink.write("fill", res)
+        if report is not None:
+            report.on_fill(res)
 
     engine = TradingEngine(
         data=data_stream,
@@ -42,10 +150,37 @@ def main():
         risk=risk,
         account=account,
         invoker=invoker,
-        on_fill=lambda res: None,
+        on_fill=on_fill if (sink or report) else None,
+        windows=PriceWindows(),                 # one price history per symbol for both strategies
+        pnl=pnl,
+        profiler=MemoryProfiler.from_config(cfg) if cfg.get("memory_profile", False) else None,
+        recorder=recorder,
+        conflate_lag=cfg.get("conflate_lag_seconds"),
     )
 
-    engine.run()
+    if recording is not None:
+        engine.replay(recording.signals())
+    elif engine.profiler:
+        with engine.profiler:
+            engine.run()
+        print(engine.profiler.format_report())
+    else:
+        engine.run()
+    if recorder is not None:
+        recorder.close()
+    if isinstance(publisher, AsyncSignalPublisher):
+        publisher.close()           # flush queued signals before reporting
+    if sink is not None:
+        sink.close()
+    if report is not None:
+        report.record_stats("run", ticks=reorder.emitted if reorder else len(data_stream),
+                            orders=invoker.order_count, equity=pnl.equity,
+                            realized=pnl.realized, unrealized=pnl.unrealized)
+        report.record_stats("engine", **engine.metrics.snapshot())
+        report.write_equity_curve(pnl.curve)
+        if reorder is not None:
+            report.record_stats("reorder", **reorder.stats())
+        print(f"Run report: {report.close()}")
     print("\n--- Done ---")
     print(account)
 
@@ -0,0 +1,148 @@
+# memprofile.py
+# tracemalloc-based per-stage memory instrumentation with budgets
+
+from __future__ import annotations
+from typing import Any, Dict, List, Tuple
+import linecache
+import tracemalloc
+
+_IGNORE = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_IGNORE)
+
+
+class MemoryBudgetExceeded(RuntimeError):
+    pass
+
+
+class _Stage:
+    """Context manager for one named stage; net traced bytes are charged to the stage."""
+    __slots__ = ("prof", "name", "calls", "retained", "_start", "_snap", "sites", "last_sample")
+
+    def __init__(self, prof: "MemoryProfiler", name: str):
+        self.prof = prof
+        self.name = name
+        self.calls = 0
+        self.retained = 0
+        self._start = 0
+        self._snap = None
+        self.sites: Dict[str, int] = {}
+        self.last_sample = 0
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            raise RuntimeError(f"stage {self.name!r} entered without tracemalloc; start the profiler first")
+        if self.prof.sampling:
+            self._snap = _snapshot()
+        self._start = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, *exc):
+        delta = tracemalloc.get_traced_memory()[0] - self._start
+        self.calls += 1
+        self.retained += delta
+        if self._snap is not None:
+            after = _snapshot()
+            for stat in after.compare_to(self._snap, "lineno")[: self.prof.top]:
+                if stat.size_diff > 0:
+                    key = str(stat.traceback[0])
+                    self.sites[key] = self.sites.get(key, 0) + stat.size_diff
+            self._snap = None
+        budget = self.prof.budgets.get(self.name)
+        if budget is not None and self.retained > budget and exc[0] is None:
+            raise MemoryBudgetExceeded(
+                f"stage {self.name!r} retained {self.retained} bytes (budget {budget})")
+        return False
+
+
+class MemoryProfiler:
+    """
+    Memory instrumentation for TradingEngine(profiler=...).
+    - stage(name) brackets a pipeline stage; the net change in traced memory is
+      accumulated per stage, so a stage that keeps what it allocates shows up
+      as steady growth
+    - tick() is called once per tick; every `interval` ticks the next tick is a
+      sample: each stage call is bracketed by snapshots and its top allocation
+      sites (file:line) are accumulated, and the growth rate since the previous
+      sample is recorded
+    - budgets {stage: bytes} raise MemoryBudgetExceeded from the stage that
+      crosses its limit, so leak tests fail instead of only logging
+    TradingEngine.run() starts tracing for the run if nobody else did; a stage
+    entered while tracemalloc is off raises instead of reporting zeros.
+    """
+    def __init__(self, interval: int = 1000, budgets: Dict[str, int] | None = None,
+                 top: int = 10, frames: int = 1):
+        self.interval = interval
+        self.budgets = dict(budgets or {})
+        self.top = top
+        self.frames = frames
+        self.ticks = 0
+        self.sampling = False
+        self.growth: Dict[str, List[Tuple[int, float]]] = {}   # stage -> [(tick, bytes per tick)]
+        self._stages: Dict[str, _Stage] = {}
+        self._started_here = False
+        self._depth = 0
+
+    @classmethod
+    def from_config(cls, cfg) -> "MemoryProfiler":
+        return cls(interval=cfg.get("memory_sample_interval", 1000), budgets=cfg.get("memory_budgets") or {})
+
+    def start(self) -> "MemoryProfiler":
+        """Start tracemalloc unless it is already tracing; nests with stop()."""
+        self._depth += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_here = True
+        return self
+
+    def stop(self) -> None:
+        """Stop tracemalloc when the outermost start() that began tracing is closed."""
+        self._depth = max(self._depth - 1, 0)
+        if self._started_here and self._depth == 0:
+            tracemalloc.stop()
+            self._started_here = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stage(self, name: str) -> _Stage:
+        s = self._stages.get(name)
+        if s is None:
+            s = self._stages[name] = _Stage(self, name)
+        return s
+
+    def tick(self) -> None:
+        self.ticks += 1
+        if self.sampling:
+            self.sampling = False
+        elif self.interval and self.ticks % self.interval == 0:
+            for s in self._stages.values():
+                self.growth.setdefault(s.name, []).append((self.ticks, (s.retained - s.last_sample) / self.interval))
+                s.last_sample = s.retained
+            self.sampling = True                  # snapshot around every stage of the next tick
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        for s in self._stages.values():
+            rates = self.growth.get(s.name, [])
+            sites = sorted(s.sites.items(), key=lambda kv: -kv[1])[: self.top]
+            out[s.name] = {"calls": s.calls, "retained": s.retained,
+                           "bytes_per_tick": rates[-1][1] if rates else None,
+                           "budget": self.budgets.get(s.name), "top_sites": sites}
+        return out
+
+    def format_report(self) -> str:
+        lines = []
+        for name, r in self.report().items():
+            rate = "n/a" if r["bytes_per_tick"] is None else f"{r['bytes_per_tick']:.1f} B/tick"
+            lines.append(f"{name:<12} calls={r['calls']:<8} retained={r['retained']:<10} growth={rate}")
+            for site, size in r["top_sites"]:
+                filename, _, lineno = site.rpartition(":")
+                src = linecache.getline(filename, int(lineno)).strip() if lineno.isdigit() else ""
+                lines.append(f"    {size:>10} B  {site}  {src}")
+        return "\n".join(lines)
@@ -3,10 +3,14 @@
 
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Protocol
+from typing import List, Dict, Any, Protocol, Iterator, Mapping
+from collections.abc import MutableMapping
 from abc import ABC, abstractmethod
 import random
 import datetime
+from lazy import lazy_import
+
+np = lazy_import("numpy")    # only PositionBook needs it
 
          
 class MarketDataPoint:
@@ -23,6 +27,12 @@ class Instrument:
     symbol: str
     price: float
 
+    def __setattr__(self, name, value):
+        # bump price_version on every price write so metric caches can invalidate
+        if name == "price":
+            object.__setattr__(self, "price_version", getattr(self, "price_version", -1) + 1)
+        object.__setattr__(self, name, value)
+
     def get_metrics(self) -> dict:
         return {"symbol": self.symbol, "price": self.price}
 
@@ -63,6 +73,18 @@ class Position(PortfolioComponent):
     quantity: float
     price: float
 
+    def __setattr__(self, name, value):
+        parents = self.__dict__.get("_parents")
+        if parents and name == "symbol" and value != self.symbol:
+            object.__setattr__(self, name, value)
+            for parent in parents:
+                parent._mark("_stale")
+            return
+        object.__setattr__(self, name, value)
+        if parents and name in ("quantity", "price"):
+            for parent in parents:
+                parent._invalidate()
+
     def get_value(self) -> float:
         return self.quantity * self.price
 
@@ -72,18 +94,159 @@ class Position(PortfolioComponent):
 
 @dataclass
 class PortfolioGroup(PortfolioComponent):
+    """
+    Composite node. A queried group keeps an inverted index {symbol: [Position
+    leaves in its subtree]} and every group a cached value; add()/remove() and
+    leaf writes only flag the ancestor chains (stopping at the first node that
+    is already flagged), and the index/value are rebuilt on the next query.
+    A component may sit in several groups (or twice in one); it is counted once
+    per path, as before. Other PortfolioComponent types are not indexed: they
+    are delegated to on every get_positions()/get_value() call.
+    Nothing here recurses, so nesting depth is not bounded by the recursion limit.
+    """
     name: str
     components: List[PortfolioComponent] = field(default_factory=list)
 
+    def __post_init__(self):
+        self._parents: List[PortfolioGroup] = []
+        self._index: Dict[str, List[Position]] | None = None
+        self._opaque: List[PortfolioComponent] = []     # non-Position, non-group components in the subtree
+        self._stale = True                              # structure changed since _index was built
+        self._value: float = 0.0
+        self._dirty = True
+        initial, self.components = self.components, []
+        for comp in initial:
+            self.add(comp)
+
     def add(self, component: PortfolioComponent):
         self.components.append(component)
+        if isinstance(component, (Position, PortfolioGroup)):
+            parents = component.__dict__.setdefault("_parents", [])
+            parents.append(self)
+        self._mark("_stale")
+        self._mark("_dirty")
+
+    def remove(self, component: PortfolioComponent):
+        for i, comp in enumerate(self.components):
+            if comp is component:
+                del self.components[i]
+                break
+        else:
+            raise ValueError("Component not in this PortfolioGroup")
+        if isinstance(component, (Position, PortfolioGroup)):
+            parents = component._parents
+            del parents[next(i for i, p in enumerate(parents) if p is self)]
+        self._mark("_stale")
+        self._mark("_dirty")
+
+    def _mark(self, flag: str):
+        # a flagged node's ancestors are always flagged, so stop at the first one on each chain
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if not getattr(node, flag):
+                setattr(node, flag, True)
+                stack.extend(node._parents)
+
+    def _invalidate(self):
+        self._mark("_dirty")
+
+    def _leaf_index(self) -> Dict[str, List[Position]]:
+        if self._index is not None and not self._stale:
+            return self._index
+        index: Dict[str, List[Position]] = {}
+        opaque: List[PortfolioComponent] = []
+        stack = list(self.components)
+        while stack:
+            comp = stack.pop()
+            if isinstance(comp, Position):
+                index.setdefault(comp.symbol, []).append(comp)
+            elif isinstance(comp, PortfolioGroup):
+                if comp._stale:                         # its whole subtree is walked below
+                    comp._stale, comp._index = False, None
+                if comp._index is not None:
+                    for sym, leaves in comp._index.items():
+                        index.setdefault(sym, []).extend(leaves)
+                    opaque.extend(comp._opaque)
+                else:
+                    stack.extend(comp.components)
+            else:
+                opaque.append(comp)
+        self._index, self._opaque, self._stale = index, opaque, False
+        return index
+
+    # ==== index queries ====
+    def leaves(self, symbol: str) -> List[Position]:
+        return list(self._leaf_index().get(symbol, ()))
+
+    def locate(self, symbol: str) -> List[Tuple[Position, List["PortfolioGroup"]]]:
+        """Each leaf for `symbol` with its ancestor path from this group down to the leaf's parent."""
+        out, seen = [], set()
+        for leaf in self._leaf_index().get(symbol, ()):
+            if id(leaf) in seen:
+                continue
+            seen.add(id(leaf))
+            stack = [(parent, (parent, None)) for parent in leaf._parents]
+            while stack:
+                node, link = stack.pop()                # link: (node, link to the node below)
+                if node is self:
+                    path = []
+                    while link is not None:
+                        path.append(link[0])
+                        link = link[1]
+                    out.append((leaf, path))
+                    continue
+                stack.extend((p, (p, link)) for p in node._parents)
+        return out
+
+    def reprice(self, prices: Mapping[str, float]) -> int:
+        """Bulk mark: set price on every leaf of each symbol; returns the number of leaves touched."""
+        index, touched = self._leaf_index(), 0
+        for sym, px in prices.items():
+            seen = set()
+            for leaf in index.get(sym, ()):
+                if id(leaf) not in seen:
+                    seen.add(id(leaf))
+                    leaf.price = px
+                    touched += 1
+        return touched
 
     def get_value(self) -> float:
-        return sum(c.get_value() for c in self.components)
+        if not self._dirty:
+            return self._value
+        # post-order over the dirty groups only; clean subtrees answer from their cache
+        done: Dict[int, Tuple[float, bool]] = {}        # id(group) -> (value, volatile)
+        stack = [(self, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in done:
+                continue
+            if not expanded:
+                stack.append((node, True))
+                stack.extend((c, False) for c in node.components
+                             if isinstance(c, PortfolioGroup) and c._dirty and id(c) not in done)
+                continue
+            total, volatile = 0.0, False
+            for c in node.components:
+                if isinstance(c, PortfolioGroup):
+                    if c._dirty:
+                        v, vol = done[id(c)]
+                        total += v
+                        volatile = volatile or vol
+                    else:
+                        total += c._value
+                else:
+                    total += c.get_value()
+                    if not isinstance(c, Position):     # unknown components can change without telling us
+                        volatile = True
+            done[id(node)] = (total, volatile)
+            if not volatile:
+                node._value, node._dirty = total, False
+        return done[id(self)][0]
 
     def get_positions(self) -> Dict[str, float]:
-        flat: Dict[str, float] = {}
-        for comp in self.components:
+        flat = {sym: sum((l.quantity for l in leaves), 0.0) for sym, leaves in self._leaf_index().items()}
+        for comp in self._opaque:
             for sym, qty in comp.get_positions().items():
                 flat[sym] = flat.get(sym, 0.0) + qty
         return flat
@@ -205,3 +368,139 @@ class MarketDataContainer:
 
     def clear_signals(self) -> None:
         self.signals.clear()
+
+
+class PositionBook:
+    """
+    Array-backed position book for large symbol universes.
+    - Symbols are interned to dense integer ids (self.ids / self.symbols)
+    - Quantity and cost basis live in NumPy arrays indexed by id
+    - Whole-book operations (mark-to-market, exposure, PnL) are single vectorized calls
+    """
+    def __init__(self, capacity: int = 64) -> None:
+        self.ids: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.qty = np.zeros(capacity, dtype=np.float64)
+        self.cost = np.zeros(capacity, dtype=np.float64)
+        self.held = np.zeros(capacity, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    # ids
+    def intern(self, symbol: str) -> int:
+        sid = self.ids.get(symbol)
+        if sid is None:
+            sid = len(self.symbols)
+            if sid == len(self.qty):
+                self._grow(2 * sid)
+            self.ids[symbol] = sid
+            self.symbols.append(symbol)
+        return sid
+
+    def _grow(self, capacity: int) -> None:
+        for name in ("qty", "cost", "held"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    # trades
+    def apply(self, symbol: str, quantity: float, price: float) -> None:
+        sid = self.intern(symbol)
+        self.qty[sid] += quantity
+        self.cost[sid] += quantity * price
+        self.held[sid] = True
+
+    def revert(self, symbol: str, quantity: float, price: float) -> None:
+        sid = self.intern(symbol)
+        self.qty[sid] -= quantity
+        self.cost[sid] -= quantity * price
+        if abs(self.qty[sid]) < 1e-8:       # flat again: cost keeps the realized PnL of earlier trades
+            self.qty[sid] = 0.0
+            self.held[sid] = False
+
+    def drop(self, symbol: str) -> None:
+        sid = self.ids.get(symbol)
+        if sid is not None:
+            self.qty[sid] = 0.0
+            self.cost[sid] = 0.0
+            self.held[sid] = False
+
+    # vectorized book operations
+    def price_vector(self, prices: Mapping[str, float], fill: float = float("nan")) -> np.ndarray:
+        """Align a {symbol: price} map to the book's id order."""
+        n = len(self.symbols)
+        out = np.full(n, fill, dtype=np.float64)
+        for sym, px in prices.items():
+            sid = self.ids.get(sym)
+            if sid is not None:
+                out[sid] = px
+        return out
+
+    def _prices(self, prices) -> np.ndarray:
+        if isinstance(prices, np.ndarray):
+            return prices
+        return self.price_vector(prices)
+
+    def market_values(self, prices) -> np.ndarray:
+        n = len(self.symbols)
+        return np.where(self.held[:n], self.qty[:n] * self._prices(prices), 0.0)
+
+    def market_value(self, prices) -> float:
+        return float(np.nansum(self.market_values(prices)))
+
+    def gross_exposure(self, prices) -> float:
+        return float(np.nansum(np.abs(self.market_values(prices))))
+
+    def net_exposure(self, prices) -> float:
+        return self.market_value(prices)
+
+    def net_pnl(self, prices) -> np.ndarray:
+        """
+        Per-symbol total PnL, realized plus unrealized: market value minus the
+        net cash paid for the position (cost holds every trade's quantity x price).
+        A symbol that is no longer held reports only its realized part, -cost.
+        """
+        n = len(self.symbols)
+        return np.where(self.held[:n], self.qty[:n] * self._prices(prices), 0.0) - self.cost[:n]
+
+    def total_pnl(self, prices) -> float:
+        return float(np.nansum(self.net_pnl(prices)))
+
+
+class PositionsView(MutableMapping):
+    """Dict-style {symbol: quantity} view over a PositionBook (read/write)."""
+    def __init__(self, book: PositionBook) -> None:
+        self._book = book
+
+    def __getitem__(self, symbol: str) -> float:
+        sid = self._book.ids.get(symbol)
+        if sid is None or not self._book.held[sid]:
+            raise KeyError(symbol)
+        return float(self._book.qty[sid])
+
+    def __setitem__(self, symbol: str, quantity: float) -> None:
+        sid = self._book.intern(symbol)
+        self._book.qty[sid] = quantity
+        self._book.held[sid] = True
+
+    def __delitem__(self, symbol: str) -> None:
+        if symbol not in self:
+            raise KeyError(symbol)
+        self._book.drop(symbol)
+
+    def __contains__(self, symbol: object) -> bool:
+        sid = self._book.ids.get(symbol)
+        return sid is not None and bool(self._book.held[sid])
+
+    def __iter__(self) -> Iterator[str]:
+        held = self._book.held
+        return (sym for sid, sym in enumerate(self._book.symbols) if held[sid])
+
+    def __len__(self) -> int:
+        return int(self._book.held[: len(self._book.symbols)].sum())
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
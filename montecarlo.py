@@ -0,0 +1,125 @@
+# montecarlo.py
+# parallel, seeded Monte Carlo VaR / expected shortfall
+
+from __future__ import annotations
+from typing import Dict, List, Mapping, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from models import PortfolioComponent
+from risk import PortfolioRisk, _leaf_prices
+
+# arrays attached by each worker process: name -> (SharedMemory, ndarray)
+_SHARED: Dict[str, Tuple[shared_memory.SharedMemory, np.ndarray]] = {}
+
+
+def _attach(specs: Dict[str, Tuple[str, Tuple[int, ...]]]) -> None:
+    for key, (name, shape) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        arr = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        arr.flags.writeable = False
+        _SHARED[key] = (shm, arr)
+
+
+def _simulate_chunk(chunk: int, n: int, seed: np.random.SeedSequence) -> Tuple[int, np.ndarray]:
+    """Losses for one chunk: z ~ N(0, I), returns = z @ factor.T, loss = -(returns @ exposure)."""
+    factor = _SHARED["factor"][1]
+    exposure = _SHARED["exposure"][1]
+    rng = np.random.Generator(np.random.PCG64(seed))
+    z = rng.standard_normal((n, factor.shape[1]))
+    return chunk, -((z @ factor.T) @ exposure)
+
+
+class MonteCarloVaR:
+    """
+    Monte Carlo VaR / ES for a vector of exposures under N(0, cov) returns.
+    - scenarios are cut into fixed-size chunks; chunk i always draws from
+      SeedSequence(seed).spawn(...)[i], so results do not depend on `workers`
+    - the shock factor matrix (cov = F @ F.T) and exposures are placed in
+      multiprocessing.shared_memory once and attached by every worker
+    """
+    def __init__(self, symbols: Sequence[str], exposures: np.ndarray, cov: np.ndarray,
+                 chunk_size: int = 100_000):
+        self.symbols = list(symbols)
+        self.exposures = np.asarray(exposures, dtype=np.float64)
+        self.cov = np.asarray(cov, dtype=np.float64)
+        if self.cov.shape != (len(self.symbols), len(self.symbols)) or len(self.exposures) != len(self.symbols):
+            raise ValueError("symbols, exposures and cov dimensions do not match")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+        self.chunk_size = chunk_size
+        vals, vecs = np.linalg.eigh(self.cov)          # PSD-safe square root
+        self.factor = vecs * np.sqrt(np.clip(vals, 0.0, None))
+
+    @classmethod
+    def from_portfolio(cls, node: PortfolioComponent, risk: PortfolioRisk,
+                       prices: Mapping[str, float] | None = None, **kwargs) -> "MonteCarloVaR":
+        """Exposures of a PortfolioGroup node with the rolling covariance from PortfolioRisk."""
+        w = risk.exposures(node, prices)
+        cov = risk.returns.covariance()
+        held = np.flatnonzero(w)
+        symbols = [risk.returns.symbols[i] for i in held]
+        return cls(symbols, w[held], cov[np.ix_(held, held)], **kwargs)
+
+    @classmethod
+    def from_positions(cls, node: PortfolioComponent, cov: np.ndarray, symbols: Sequence[str],
+                       prices: Mapping[str, float] | None = None, **kwargs) -> "MonteCarloVaR":
+        """Exposures from a node's positions and leaf prices against a caller-supplied covariance."""
+        prices = {**_leaf_prices(node), **(prices or {})}
+        qty = node.get_positions()
+        w = np.array([qty.get(s, 0.0) * prices.get(s, 0.0) for s in symbols])
+        return cls(symbols, w, cov, **kwargs)
+
+    def _chunks(self, n_scenarios: int, seed: int) -> List[Tuple[int, int, np.random.SeedSequence]]:
+        sizes = [self.chunk_size] * (n_scenarios // self.chunk_size)
+        if n_scenarios % self.chunk_size:
+            sizes.append(n_scenarios % self.chunk_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        return [(i, n, s) for i, (n, s) in enumerate(zip(sizes, seeds))]
+
+    def simulate(self, n_scenarios: int = 1_000_000, seed: int = 0, workers: int | None = None) -> np.ndarray:
+        """Simulated losses in chunk order (positive = loss)."""
+        if n_scenarios < 1:
+            raise ValueError(f"n_scenarios must be >= 1, got {n_scenarios}")
+        chunks = self._chunks(n_scenarios, seed)
+        segments: List[shared_memory.SharedMemory] = []
+        try:
+            specs = {}
+            for key, arr in (("factor", self.factor), ("exposure", self.exposures)):
+                shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+                np.ndarray(arr.shape, dtype=np.float64, buffer=shm.buf)[...] = arr
+                segments.append(shm)
+                specs[key] = (shm.name, arr.shape)
+
+            out: List[np.ndarray] = [None] * len(chunks)
+            if workers is not None and workers <= 1:
+                _attach(specs)
+                try:
+                    for c in chunks:
+                        i, losses = _simulate_chunk(*c)
+                        out[i] = losses
+                finally:
+                    for key in specs:
+                        _SHARED.pop(key)[0].close()
+            else:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(specs,)) as pool:
+                    for i, losses in pool.map(_simulate_chunk, *zip(*chunks)):
+                        out[i] = losses
+            return np.concatenate(out)
+        finally:
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+
+    def run(self, n_scenarios: int = 1_000_000, seed: int = 0, workers: int | None = None,
+            confidence: float = 0.99) -> Dict[str, float]:
+        losses = self.simulate(n_scenarios, seed, workers)
+        var = float(np.quantile(losses, confidence))
+        tail = losses[losses >= var]
+        return {"var": var, "es": float(tail.mean()) if len(tail) else var,
+                "confidence": confidence, "scenarios": int(len(losses))}
+
+    def stress(self, shocks: Mapping[str, float]) -> float:
+        """PnL of a deterministic scenario given per-symbol returns, e.g. {"SPY": -0.2}."""
+        r = np.array([shocks.get(s, 0.0) for s in self.symbols])
+        return float(r @ self.exposures)
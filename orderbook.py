@@ -0,0 +1,313 @@
+# orderbook.py
+# heap-based limit order book and a fill simulator on top of it
+
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Tuple
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import heapq
+import itertools
+from models import MarketDataPoint
+from patterns.command import Account, Command, ExecuteOrderCommand
+
+
+class Order:
+    __slots__ = ("id", "side", "price", "quantity", "remaining", "owner", "active")
+
+    def __init__(self, oid: int, side: str, price: float | None, quantity: float, owner: Any = None):
+        self.id = oid
+        self.side = side
+        self.price = price
+        self.quantity = quantity
+        self.remaining = quantity
+        self.owner = owner
+        self.active = True
+
+    def __repr__(self):
+        return f"Order(id={self.id}, side={self.side}, price={self.price}, remaining={self.remaining})"
+
+
+class OrderBook:
+    """
+    One symbol, price-time priority.
+    - bids/asks are heaps of (key, seq, order); key is -price for bids, price for asks
+    - cancel() is lazy: the order is flagged and skipped when it reaches the top,
+      and the heaps are rebuilt once dead entries outnumber live ones
+    - submit() matches an incoming order against the opposite side; a limit
+      remainder rests, a market remainder is cancelled (IOC)
+    - self_trade(resting) -> True stops matching at that resting order and
+      cancels the incoming remainder (self-trade prevention, "cancel newest")
+    Fills are returned as (resting_order, quantity, price) at the resting price.
+    """
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self._bids: List[Tuple[float, int, Order]] = []
+        self._asks: List[Tuple[float, int, Order]] = []
+        self._orders: Dict[int, Order] = {}
+        self._ids = itertools.count(1)
+        self._dead = 0
+
+    def submit(self, side: str, quantity: float, price: float | None = None, owner: Any = None,
+               self_trade: Callable[[Order], bool] | None = None) -> Tuple[Order, List[Tuple[Order, float, float]]]:
+        is_buy = side == "BUY"
+        book = self._asks if is_buy else self._bids
+        fills = []
+        remaining = quantity
+        blocked = False
+        while remaining > 0 and book:
+            key, _, rest = book[0]
+            if not rest.active:
+                heapq.heappop(book); self._dead -= 1
+                continue
+            level = key if is_buy else -key
+            if price is not None and (level > price if is_buy else level < price):
+                break
+            if self_trade is not None and self_trade(rest):
+                blocked = True
+                break
+            q = rest.remaining if rest.remaining < remaining else remaining
+            rest.remaining -= q
+            remaining -= q
+            fills.append((rest, q, level))
+            if rest.remaining <= 0:
+                rest.active = False
+                heapq.heappop(book)
+                del self._orders[rest.id]
+
+        order = Order(next(self._ids), side, price, quantity, owner)
+        order.remaining = remaining
+        if remaining > 0 and price is not None and not blocked:
+            heapq.heappush(self._bids if is_buy else self._asks, (-price if is_buy else price, order.id, order))
+            self._orders[order.id] = order
+        else:
+            order.active = False
+        return order, fills
+
+    def cancel(self, order_id: int) -> bool:
+        order = self._orders.pop(order_id, None)
+        if order is None:
+            return False
+        order.active = False
+        self._dead += 1
+        if self._dead > len(self._orders) + 64:
+            self._compact()
+        return True
+
+    def _compact(self) -> None:
+        self._bids = [e for e in self._bids if e[2].active]
+        self._asks = [e for e in self._asks if e[2].active]
+        heapq.heapify(self._bids); heapq.heapify(self._asks)
+        self._dead = 0
+
+    def _top(self, book) -> Order | None:
+        while book and not book[0][2].active:
+            heapq.heappop(book); self._dead -= 1
+        return book[0][2] if book else None
+
+    def best_bid(self) -> float | None:
+        o = self._top(self._bids)
+        return o.price if o else None
+
+    def best_ask(self) -> float | None:
+        o = self._top(self._asks)
+        return o.price if o else None
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self._orders
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+
+@dataclass
+class FillModel:
+    """
+    Synthetic liquidity rebuilt around every tick: `levels` price levels per side,
+    `depth` shares each, the first at +/- half_spread_bps and then every level_bps.
+    Orders reach the book `latency` seconds after submission (at the first tick
+    at or past that time). order_type "market" ignores the signal price;
+    "limit" uses it as the limit (a signal's own "order_type" wins).
+    """
+    half_spread_bps: float = 1.0
+    level_bps: float = 1.0
+    levels: int = 5
+    depth: float = 100.0
+    latency: float = 0.0
+    order_type: str = "market"
+
+    def __post_init__(self):
+        if self.half_spread_bps <= 0 or self.level_bps < 0 or self.levels < 1:
+            raise ValueError("need half_spread_bps > 0, level_bps >= 0 and levels >= 1")
+
+    def ladder(self, price: float) -> List[Tuple[float, float]]:
+        """(bid, ask) price pairs, best first."""
+        out = []
+        for k in range(self.levels):
+            bps = (self.half_spread_bps + k * self.level_bps) / 1e4
+            out.append((price * (1 - bps), price * (1 + bps)))
+        return out
+
+
+class SimulatedOrderCommand(Command):
+    """
+    Order sent to a FillSimulator. Each fill is applied to the Account as its own
+    ExecuteOrderCommand; undo() cancels whatever still rests and undoes the fills.
+    """
+    def __init__(self, sim: "FillSimulator", account: Account, symbol: str, action: str,
+                 quantity: float, limit: float | None = None, meta: Dict[str, Any] | None = None):
+        self.sim = sim
+        self.account = account
+        self.symbol = symbol
+        self.action = action.upper()
+        self.quantity = float(quantity)
+        self.limit = limit
+        self.meta = dict(meta or {})
+        self.fills: List[ExecuteOrderCommand] = []
+        self.order: Order | None = None
+        self.status = "new"
+        self._executed = False
+
+    @property
+    def filled(self) -> float:
+        return sum(c.quantity for c in self.fills)
+
+    def execute(self) -> Dict[str, Any]:
+        if self._executed: raise RuntimeError("Command already executed")
+        self._executed = True
+        self.sim.submit(self)
+        return self.result()
+
+    def fill(self, quantity: float, price: float) -> Dict[str, Any]:
+        child = ExecuteOrderCommand(self.account, self.symbol, self.action, quantity, price, self.meta)
+        self.fills.append(child)
+        return child.execute()
+
+    def result(self) -> Dict[str, Any]:
+        filled = self.filled
+        avg = sum(c.quantity * c.price for c in self.fills) / filled if filled else None
+        status = "executed" if filled else self.status
+        return {"status": status, "symbol": self.symbol, "action": self.action, "quantity": filled,
+                "price": avg, "remaining": self.quantity - filled, "fills": len(self.fills), "meta": self.meta}
+
+    def undo(self) -> Dict[str, Any]:
+        if not self._executed: raise RuntimeError("Command not executed yet")
+        if self.order is not None:
+            self.sim.book(self.symbol).cancel(self.order.id)
+        self.sim.discard(self)
+        for child in reversed(self.fills):
+            child.undo()
+        self.fills.clear()
+        self._executed = False
+        self.status = "new"
+        return {"status": "undone", "symbol": self.symbol, "action": self.action,
+                "quantity": self.quantity, "price": self.limit, "meta": self.meta}
+
+
+class FillSimulator:
+    """
+    Matching layer for backtests: one OrderBook per symbol seeded with FillModel
+    liquidity on every tick. Wire it into an engine with sim.connect(engine).
+    Synchronous fills come back in the command result; fills that happen later
+    (latency, resting limits crossed by a new quote) go to `on_fill`, which
+    connect() points at the engine's fill hooks so PnL sees them too.
+    An order stops at a resting order of its own Account and its remainder is
+    cancelled, so one account never trades with itself.
+    """
+    def __init__(self, account: Account, model: FillModel | None = None, on_fill=None):
+        self.account = account
+        self.model = model or FillModel()
+        self.on_fill = on_fill
+        self.books: Dict[str, OrderBook] = {}
+        self.now: datetime | None = None
+        self._quotes: Dict[str, List[int]] = {}
+        self._pending: List[Tuple[datetime, int, SimulatedOrderCommand]] = []
+        self._seq = itertools.count()
+
+    def connect(self, engine) -> None:
+        """Use this simulator for the engine's orders, quotes and every later fill."""
+        engine.command_factory = self.command
+        prev = engine.on_tick
+        if prev is None:
+            engine.on_tick = self.on_tick
+        else:
+            def on_tick(tick, _sim=self.on_tick, _prev=prev):
+                _sim(tick)
+                _prev(tick)
+            engine.on_tick = on_tick
+        self.on_fill = engine.report_fill
+
+    def book(self, symbol: str) -> OrderBook:
+        b = self.books.get(symbol)
+        if b is None:
+            b = self.books[symbol] = OrderBook(symbol)
+        return b
+
+    def command(self, account: Account, signal: Dict[str, Any]) -> SimulatedOrderCommand:
+        """command_factory hook: signal -> SimulatedOrderCommand."""
+        kind = signal.get("order_type", self.model.order_type)
+        limit = float(signal["price"]) if kind == "limit" else None
+        return SimulatedOrderCommand(self, account, signal["symbol"], signal["action"],
+                                     signal["size"], limit, signal.get("meta"))
+
+    def submit(self, cmd: SimulatedOrderCommand) -> None:
+        if self.model.latency > 0 and self.now is not None:
+            cmd.status = "pending"
+            due = self.now + timedelta(seconds=self.model.latency)
+            heapq.heappush(self._pending, (due, next(self._seq), cmd))
+            return
+        self._match(cmd, deferred=False)
+
+    def discard(self, cmd: SimulatedOrderCommand) -> None:
+        self._pending = [p for p in self._pending if p[2] is not cmd]
+        heapq.heapify(self._pending)
+
+    def _match(self, cmd: SimulatedOrderCommand, deferred: bool) -> List[Dict[str, Any]]:
+        def own(rest: Order) -> bool:          # never trade against the same account's resting order
+            return isinstance(rest.owner, SimulatedOrderCommand) and rest.owner.account is cmd.account
+        order, fills = self.book(cmd.symbol).submit(cmd.action, cmd.quantity, cmd.limit, owner=cmd, self_trade=own)
+        out, passive = [], []
+        for rest, q, px in fills:
+            out.append(cmd.fill(q, px))
+            if isinstance(rest.owner, SimulatedOrderCommand):      # crossed one of our own resting orders
+                passive.append(rest.owner.fill(q, px))
+        self._report(passive)
+        if order.active:
+            cmd.order = order
+            cmd.status = "resting"
+        elif order.remaining > 0:
+            cmd.status = "cancelled"                              # market remainder beyond depth, or self-trade
+        if deferred:
+            self._report(out)
+        return out + passive
+
+    def _report(self, results: List[Dict[str, Any]]) -> None:
+        if self.on_fill:
+            for res in results:
+                self.on_fill(res)
+
+    def _requote(self, symbol: str, price: float) -> List[Dict[str, Any]]:
+        book = self.book(symbol)
+        for oid in self._quotes.get(symbol, ()):
+            book.cancel(oid)
+        ids, out = [], []
+        depth = self.model.depth
+        for bid, ask in self.model.ladder(price):
+            for side, px in (("SELL", ask), ("BUY", bid)):
+                order, fills = book.submit(side, depth, px)
+                for rest, q, fpx in fills:                         # quote moved through our resting limit
+                    if isinstance(rest.owner, SimulatedOrderCommand):
+                        out.append(rest.owner.fill(q, fpx))
+                if order.active:
+                    ids.append(order.id)
+        self._quotes[symbol] = ids
+        return out
+
+    def on_tick(self, tick: MarketDataPoint) -> List[Dict[str, Any]]:
+        """Refresh liquidity for the tick's symbol, then release orders whose latency elapsed."""
+        self.now = tick.timestamp
+        out = self._requote(tick.symbol, float(tick.price))
+        self._report(out)
+        while self._pending and self._pending[0][0] <= self.now:
+            _, _, cmd = heapq.heappop(self._pending)
+            out += self._match(cmd, deferred=True)
+        return out
@@ -6,6 +6,7 @@ import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from models import *
 import json
+import re
 
 @dataclass
 class PortfolioBuilder:
@@ -41,36 +42,43 @@ class PortfolioBuilder:
     def build(self) -> PortfolioGroup:
         """
         Build a PortfolioGroup (composite) tree.
+        Iterative (explicit stack), so nesting depth is not bounded by the recursion limit.
 
         Returns:
             PortfolioGroup: root composite with Positions and nested groups.
         """
-        
-        group = PortfolioGroup(name=self._name)
-
-        # add leaf positions
-        for p in self._positions:
-            pos = Position(symbol=p["symbol"], quantity=p["quantity"], price=p["price"])
-            group.add(pos)
-
-        # add sub-groups from child builders
-        for child in self._subbuilders:
-            group.add(child.build())
-
-        return group
+        root = PortfolioGroup(name=self._name)
+        stack = [(self, root)]
+        while stack:
+            builder, group = stack.pop()
+            # add leaf positions
+            for p in builder._positions:
+                group.add(Position(symbol=p["symbol"], quantity=p["quantity"], price=p["price"]))
+            # add sub-groups from child builders
+            for child in builder._subbuilders:
+                sub = PortfolioGroup(name=child._name)
+                group.add(sub)
+                stack.append((child, sub))
+        return root
 
     # ==== json ====
     @staticmethod
     def from_dict(data: Dict[str, Any]) -> "PortfolioBuilder":
-        b = PortfolioBuilder().set_name(data.get("name", "Portfolio"))
-        if data.get("owner"):
-            b.set_owner(data["owner"])
-        for p in data.get("positions", []):
-            b.add_position(p["symbol"], p["quantity"], p.get("price"))
-        for sub in data.get("subportfolios", []):
-            child_builder = PortfolioBuilder.from_dict(sub)
-            b.add_subportfolio(child_builder)
-        return b
+        """Accepts both "subportfolios" and "sub_portfolios" for nested portfolios."""
+        root = PortfolioBuilder()
+        stack = [(data, root)]
+        while stack:
+            node, b = stack.pop()
+            b.set_name(node.get("name", "Portfolio"))
+            if node.get("owner"):
+                b.set_owner(node["owner"])
+            for p in node.get("positions", []):
+                b.add_position(p["symbol"], p["quantity"], p.get("price"))
+            for sub in _subportfolios(node):
+                child_builder = PortfolioBuilder()
+                b.add_subportfolio(child_builder)
+                stack.append((sub, child_builder))
+        return root
 
     @staticmethod
     def from_json(path: str) -> "PortfolioBuilder":
@@ -78,3 +86,194 @@ class PortfolioBuilder:
             data = json.load(f)
         return PortfolioBuilder.from_dict(data)
 
+    @staticmethod
+    def stream_json(path: str, table: bool = False):
+        """
+        Build the PortfolioGroup tree straight from the file's JSON events,
+        without json.load, intermediate builders or recursion.
+        With table=True returns (group, table) where table is a columnar
+        {"symbol", "quantity", "price", "portfolio"} dict of lists.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return _StreamingPortfolioParser(want_tree=True, want_table=table).parse(iter_json_events(f))
+
+    @staticmethod
+    def stream_positions_table(path: str) -> Dict[str, List[Any]]:
+        """Flat columnar position table only; no PortfolioGroup objects are created."""
+        with open(path, "r", encoding="utf-8") as f:
+            return _StreamingPortfolioParser(want_tree=False, want_table=True).parse(iter_json_events(f))
+
+
+SUBPORTFOLIO_KEYS = ("subportfolios", "sub_portfolios")
+
+
+def _subportfolios(node: Dict[str, Any]) -> List[Dict[str, Any]]:
+    subs: List[Dict[str, Any]] = []
+    for key in SUBPORTFOLIO_KEYS:
+        subs.extend(node.get(key) or [])
+    return subs
+
+
+# ==== streaming JSON ====
+_WS = re.compile(r"[ \t\n\r]*")
+_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?")
+_DELIM = re.compile(r"[,\]}\s]")
+_LITERALS = {"true": True, "false": False, "null": None}
+
+
+def iter_json_events(fp, chunk_size: int = 1 << 16):
+    """
+    Incremental JSON reader over a text file object. Yields
+    ("start_map"|"end_map"|"start_array"|"end_array", None), ("key", str) and
+    ("value", scalar) events while holding at most one chunk plus the token
+    in progress in memory. Nesting is tracked with an explicit stack.
+    """
+    buf, pos, eof = "", 0, False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf, pos = buf[pos:] + chunk, 0
+        return True
+
+    containers: List[str] = []       # "map" | "array"
+    expect_key = False
+    while True:
+        pos = _WS.match(buf, pos).end()
+        if pos >= len(buf):
+            if fill():
+                continue
+            if containers:
+                raise ValueError("Unexpected end of JSON input")
+            return
+        ch = buf[pos]
+        if ch == "{":
+            pos += 1; containers.append("map"); expect_key = True
+            yield ("start_map", None)
+        elif ch == "[":
+            pos += 1; containers.append("array"); expect_key = False
+            yield ("start_array", None)
+        elif ch in "}]":
+            if not containers or containers.pop() != ("map" if ch == "}" else "array"):
+                raise ValueError(f"Unbalanced {ch!r} at offset {pos}")
+            pos += 1; expect_key = False
+            yield ("end_map" if ch == "}" else "end_array", None)
+        elif ch == ",":
+            pos += 1; expect_key = bool(containers) and containers[-1] == "map"
+        elif ch == ":":
+            pos += 1
+        elif ch == '"':
+            try:
+                text, end = json.decoder.scanstring(buf, pos + 1)
+            except json.JSONDecodeError:
+                if not eof and fill():
+                    continue
+                raise
+            pos = end
+            if expect_key:
+                expect_key = False
+                yield ("key", text)
+            else:
+                yield ("value", text)
+        else:
+            # numbers/literals end at a delimiter; make sure the whole token is buffered
+            if not eof and not _DELIM.search(buf, pos) and fill():
+                continue
+            m = _NUMBER.match(buf, pos)
+            if m:
+                tok = m.group()
+                pos = m.end()
+                yield ("value", float(tok) if any(c in tok for c in ".eE") else int(tok))
+                continue
+            for lit, val in _LITERALS.items():
+                if buf.startswith(lit, pos):
+                    pos += len(lit)
+                    yield ("value", val)
+                    break
+            else:
+                raise ValueError(f"Invalid JSON at offset {pos}: {buf[pos:pos + 20]!r}")
+
+
+class _StreamingPortfolioParser:
+    """Consumes iter_json_events() and assembles PortfolioGroups / a position table."""
+    def __init__(self, want_tree: bool = True, want_table: bool = False):
+        self.want_tree = want_tree
+        self.want_table = want_table
+        self.table: Dict[str, List[Any]] = {"symbol": [], "quantity": [], "price": [], "portfolio": []}
+
+    def parse(self, events):
+        # frames: [kind, payload, pending_key]
+        #   portfolio -> {"name", "positions", "subs", "rows"}; position -> dict;
+        #   positions / subs -> owning portfolio payload; skip -> None
+        stack: List[list] = []
+        root = None
+        for kind, value in events:
+            top = stack[-1] if stack else None
+            if kind == "key":
+                top[2] = value
+            elif kind == "value":
+                if top is None:
+                    raise ValueError("Portfolio JSON must be an object")
+                if top[0] == "portfolio" and top[2] in ("name", "owner"):
+                    top[1][top[2]] = value
+                elif top[0] == "position":
+                    top[1][top[2]] = value
+            elif kind in ("start_map", "start_array"):
+                is_map = kind == "start_map"
+                if top is None:
+                    if not is_map:
+                        raise ValueError("Portfolio JSON must be an object")
+                    frame = ["portfolio", self._new_portfolio(), None]
+                    root = frame[1]
+                elif top[0] == "portfolio" and not is_map and top[2] == "positions":
+                    frame = ["positions", top[1], None]
+                elif top[0] == "portfolio" and not is_map and top[2] in SUBPORTFOLIO_KEYS:
+                    frame = ["subs", top[1], None]
+                elif top[0] == "positions" and is_map:
+                    frame = ["position", {}, None]
+                elif top[0] == "subs" and is_map:
+                    frame = ["portfolio", self._new_portfolio(), None]
+                    top[1]["subs"].append(frame[1])
+                else:
+                    frame = ["skip", None, None]
+                stack.append(frame)
+            else:  # end_map / end_array
+                frame = stack.pop()
+                if frame[0] == "position":
+                    self._add_position(stack[-1][1], frame[1])
+                elif frame[0] == "portfolio":
+                    self._close_portfolio(frame[1])
+        if root is None:
+            raise ValueError("Empty portfolio JSON")
+        if self.want_tree and self.want_table:
+            return root["group"], self.table
+        return root["group"] if self.want_tree else self.table
+
+    def _new_portfolio(self) -> Dict[str, Any]:
+        return {"name": "Portfolio", "positions": [], "subs": [], "rows": [], "group": None}
+
+    def _add_position(self, owner: Dict[str, Any], p: Dict[str, Any]) -> None:
+        if self.want_tree:
+            owner["positions"].append(Position(symbol=p["symbol"], quantity=p["quantity"], price=p.get("price")))
+        if self.want_table:
+            owner["rows"].append(len(self.table["symbol"]))
+            self.table["symbol"].append(p["symbol"])
+            self.table["quantity"].append(p["quantity"])
+            self.table["price"].append(p.get("price"))
+            self.table["portfolio"].append(None)
+
+    def _close_portfolio(self, frame: Dict[str, Any]) -> None:
+        for i in frame.pop("rows"):
+            self.table["portfolio"][i] = frame["name"]
+        if not self.want_tree:
+            return
+        group = PortfolioGroup(name=frame["name"])
+        # same order as build(): leaf positions first, then sub-groups
+        for pos in frame.pop("positions"):
+            group.add(pos)
+        for sub in frame.pop("subs"):
+            group.add(sub.pop("group"))
+        frame["group"] = group
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List
+from models import PositionBook, PositionsView
 
 class Command(ABC):
     @abstractmethod
@@ -9,19 +10,21 @@ class Command(ABC):
     def undo(self) -> Any: ...
 
 class Account:
-    def __init__(self, cash: float = 100_000.0):
+    """Cash plus an array-backed PositionBook; .positions is a {symbol: qty} view over it."""
+    def __init__(self, cash: float = 100_000.0, capacity: int = 64):
         self.cash = float(cash)
-        self.positions: Dict[str, float] = {}
+        self.book = PositionBook(capacity)
+        self.positions = PositionsView(self.book)
     def apply_trade(self, symbol: str, quantity: float, price: float):
-        notional = float(quantity) * float(price)
-        self.cash -= notional
-        self.positions[symbol] = self.positions.get(symbol, 0.0) + float(quantity)
+        self.cash -= quantity * price
+        self.book.apply(symbol, quantity, price)
     def revert_trade(self, symbol: str, quantity: float, price: float):
-        notional = float(quantity) * float(price)
-        self.cash += notional
-        self.positions[symbol] = self.positions.get(symbol, 0.0) - float(quantity)
-        if abs(self.positions.get(symbol, 0.0)) < 1e-8:
-            self.positions.pop(symbol, None)
+        self.cash += quantity * price
+        self.book.revert(symbol, quantity, price)
+    def market_value(self, prices) -> float:
+        return self.book.market_value(prices)
+    def equity(self, prices) -> float:
+        return self.cash + self.book.market_value(prices)
     def __repr__(self):
         return f"<Account cash={self.cash:.2f} positions={self.positions}>"
 
@@ -55,6 +58,10 @@ class CommandInvoker:
         self._redo_stack: List[Command] = []
     def execute_cmd(self, cmd: Command):
         res = cmd.execute(); self._history.append(cmd); self._redo_stack.clear(); return res
+    @property
+    def order_count(self) -> int:
+        """Commands executed and not undone."""
+        return len(self._history)
     def undo(self):
         if not self._history: raise RuntimeError("Nothing to undo")
         cmd = self._history.pop(); res = cmd.undo(); self._redo_stack.append(cmd); return res
@@ -1,24 +1,112 @@
 # factory.py
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from dataclasses import fields
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 from models import Stock, Bond, ETF, Instrument
 
 class InstrumentFactory:
+    # type name -> Instrument dataclass; constructor args are taken from its fields
+    _registry: Dict[str, type] = {"stock": Stock, "bond": Bond, "etf": ETF}
+    _extra: Dict[type, Tuple[str, ...]] = {}      # class -> constructor fields after symbol, price
+
+    @classmethod
+    def register(cls, type_name: str, instrument_cls: type) -> None:
+        cls._registry[type_name.strip().lower()] = instrument_cls
+
+    @classmethod
+    def _lookup(cls, t: str) -> type:
+        try:
+            return cls._registry[t]
+        except KeyError:
+            raise ValueError(f"Unknown instrument type: {t}") from None
+
+    @classmethod
+    def _extra_fields(cls, inst_cls: type) -> Tuple[str, ...]:
+        names = cls._extra.get(inst_cls)
+        if names is None:
+            names = cls._extra[inst_cls] = tuple(f.name for f in fields(inst_cls) if f.name not in ("symbol", "price"))
+        return names
+
     @staticmethod
     def create_instrument(data: dict) -> Instrument:
         t = (data.get("type") or "").strip().lower()
         symbol = data["symbol"]
         price = float(data["price"])
-        sector = data.get("sector", "")
-        issuer = data.get("issuer", "")
-        maturity = data.get("maturity", "")
-
-        if t == "stock":
-            return Stock(symbol, price, sector, issuer)
-        elif t == "bond":
-            return Bond(symbol, price, sector, issuer, maturity)
-        elif t == "etf":
-            return ETF(symbol, price, sector, issuer)
-        else:
-            raise ValueError(f"Unknown instrument type: {t}")
+        inst_cls = InstrumentFactory._lookup(t)
+        return inst_cls(symbol, price, *(data.get(name, "") for name in InstrumentFactory._extra_fields(inst_cls)))
+
+    @classmethod
+    def create_many(cls, frame: Any) -> List[Instrument]:
+        """
+        Bulk path over a whole frame: a {column: sequence} mapping or a pandas DataFrame.
+        Types are normalized once per distinct value, rows are grouped by type and each
+        group is built with one constructor loop; repeated strings are interned and
+        missing values (absent columns, pandas NaN) become "" as in create_instrument.
+        Output order matches the input rows.
+        """
+        cols = {c: list(frame[c]) for c in frame.keys()}
+        n = len(cols.get("symbol", ()))
+        raw_types = cols.get("type") or [""] * n
+        norm = {t: (t or "").strip().lower() for t in set(raw_types)}
+        groups: Dict[str, List[int]] = {}
+        for i, t in enumerate(raw_types):
+            groups.setdefault(norm[t], []).append(i)
+
+        out: List[Instrument] = [None] * n
+        symbols, prices = cols["symbol"], cols["price"]
+        for t, rows in groups.items():
+            inst_cls = cls._lookup(t)
+            extra_cols = [cols.get(name) or [""] * n for name in cls._extra_fields(inst_cls)]
+            for i in rows:
+                out[i] = inst_cls(sys.intern(str(symbols[i])), float(prices[i]),
+                                  *(_cell(c[i]) for c in extra_cols))
+        return out
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, str):
+        return sys.intern(value)
+    return "" if isinstance(value, float) and value != value else value     # NaN -> missing
+
+
+class InstrumentRegistry:
+    """Symbol-keyed instrument master (symbols interned); picklable for the on-disk cache."""
+    def __init__(self, instruments: Iterable[Instrument] = ()):
+        self._by_symbol: Dict[str, Instrument] = {}
+        for inst in instruments:
+            self.add(inst)
+
+    def add(self, inst: Instrument) -> None:
+        inst.symbol = sys.intern(inst.symbol)
+        self._by_symbol[inst.symbol] = inst
+
+    def get(self, symbol: str, default: Instrument | None = None) -> Instrument | None:
+        return self._by_symbol.get(symbol, default)
+
+    def __getitem__(self, symbol: str) -> Instrument:
+        return self._by_symbol[symbol]
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._by_symbol
+
+    def __iter__(self) -> Iterator[Instrument]:
+        return iter(self._by_symbol.values())
+
+    def __len__(self) -> int:
+        return len(self._by_symbol)
+
+    def symbols(self) -> List[str]:
+        return list(self._by_symbol)
+
+    def by_type(self, inst_cls: type) -> List[Instrument]:
+        return [i for i in self._by_symbol.values() if isinstance(i, inst_cls)]
+
+    def __getstate__(self):
+        return {"instruments": list(self._by_symbol.values())}
 
+    def __setstate__(self, state):
+        # pickle does not preserve interning, so re-intern on load
+        self._by_symbol = {}
+        for inst in state["instruments"]:
+            self.add(inst)
@@ -1,7 +1,12 @@
 # observer.py
 
 from __future__ import annotations
-from typing import List, Dict, Any, Protocol
+from typing import List, Dict, Any, Iterable, Protocol, Tuple
+from collections import deque
+import atexit
+import bisect
+import itertools
+import threading
 
 '''
 SignalPublisher: .attach(observer) and .notify(signal).
@@ -13,31 +18,286 @@ class Observer(Protocol):
         ...
 
 
+class _Subscription:
+    __slots__ = ("observer", "symbols", "actions", "min_notional", "seq", "queue")
+
+    def __init__(self, observer, symbols, actions, min_notional, seq):
+        self.observer = observer
+        self.symbols = symbols
+        self.actions = actions
+        self.min_notional = min_notional
+        self.seq = seq
+        self.queue = None
+
+
+class SubscriptionIndex:
+    """
+    Index of observer subscriptions keyed by (symbol | None, action | None).
+    Each bucket is kept sorted by min_notional, so match() only touches the
+    subscriptions a signal is actually delivered to.
+    """
+    def __init__(self):
+        self._buckets: Dict[Tuple[str | None, str | None], List[_Subscription]] = {}
+        self._thresholds: Dict[Tuple[str | None, str | None], List[float]] = {}
+        self._subs: List[_Subscription] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._subs)
+
+    def __iter__(self):
+        return iter(list(self._subs))
+
+    def __contains__(self, obs) -> bool:
+        return any(s.observer is obs for s in self._subs)
+
+    def add(self, obs: Observer, symbols: Iterable[str] | None = None,
+            actions: Iterable[str] | None = None, min_notional: float | None = None) -> _Subscription:
+        syms = frozenset(symbols) if symbols else None
+        acts = frozenset(a.upper() for a in actions) if actions else None
+        sub = _Subscription(obs, syms, acts, float(min_notional or 0.0), next(self._seq))
+        for key in self._keys(sub):
+            bucket = self._buckets.setdefault(key, [])
+            thresholds = self._thresholds.setdefault(key, [])
+            i = bisect.bisect_right(thresholds, sub.min_notional)
+            bucket.insert(i, sub)
+            thresholds.insert(i, sub.min_notional)
+        self._subs.append(sub)
+        return sub
+
+    def remove(self, obs: Observer) -> List[_Subscription]:
+        removed = [s for s in self._subs if s.observer is obs]
+        for sub in removed:
+            for key in self._keys(sub):
+                bucket = self._buckets[key]
+                i = next(j for j, s in enumerate(bucket) if s is sub)
+                del bucket[i]
+                del self._thresholds[key][i]
+                if not bucket:
+                    del self._buckets[key]
+                    del self._thresholds[key]
+        self._subs = [s for s in self._subs if s.observer is not obs]
+        return removed
+
+    @staticmethod
+    def _keys(sub: _Subscription):
+        for sym in (sub.symbols or (None,)):
+            for act in (sub.actions or (None,)):
+                yield (sym, act)
+
+    def match(self, signal: Dict[str, Any]) -> List[_Subscription]:
+        """Subscriptions interested in this signal, in attach order."""
+        sym = signal.get("symbol")
+        act = str(signal.get("action", "")).upper()
+        notional = None
+        hits: List[_Subscription] = []
+        buckets = 0
+        for key in ((sym, act), (sym, None), (None, act), (None, None)):
+            bucket = self._buckets.get(key)
+            if not bucket:
+                continue
+            thresholds = self._thresholds[key]
+            if thresholds[-1] <= 0.0:
+                hits.extend(bucket)
+            else:
+                if notional is None:
+                    notional = abs(float(signal.get("size", 0.0)) * float(signal.get("price", 0.0)))
+                hits.extend(bucket[: bisect.bisect_right(thresholds, notional)])
+            buckets += 1
+        if buckets > 1:
+            hits.sort(key=lambda s: s.seq)
+        return hits
+
+
 class SignalPublisher:
+    """
+    attach(obs) delivers every signal to obs; attach(obs, symbols=..., actions=...,
+    min_notional=...) delivers only matching signals via the SubscriptionIndex.
+    """
     def __init__(self):
-        self._observers: List[Observer] = []
+        self._index = SubscriptionIndex()
 
-    def attach(self, obs: Observer):
-        self._observers.append(obs)
+    def attach(self, obs: Observer, symbols: Iterable[str] | None = None,
+               actions: Iterable[str] | None = None, min_notional: float | None = None):
+        self._index.add(obs, symbols, actions, min_notional)
 
     def detach(self, obs: Observer):
-        self._observers = [o for o in self._observers if o is not obs]
+        self._index.remove(obs)
 
     def notify(self, signal: Dict[str, Any]):
-        for o in list(self._observers):
+        for sub in self._index.match(signal):
             try:
-                o.update(signal)
+                sub.observer.update(signal)
             except Exception as e:
                 # swallow observer exceptions to avoid breaking the publish flow
-                print(f"[SignalPublisher] Observer {o} raised error: {e}")
+                print(f"[SignalPublisher] Observer {sub.observer} raised error: {e}")
+
+
+class _ObserverQueue:
+    """Bounded ring queue feeding one observer, with its own overflow policy."""
+    POLICIES = ("block", "drop_oldest", "drop_newest")
+
+    def __init__(self, obs: Observer, capacity: int, policy: str):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        if capacity <= 0:
+            raise ValueError("capacity must be > 0")
+        self.observer = obs
+        self.capacity = capacity
+        self.policy = policy
+        self.items: deque = deque()
+        self.dropped = 0
+        self.delivered = 0
+
+
+class AsyncSignalPublisher(SignalPublisher):
+    """
+    Non-blocking publisher: notify() only enqueues; a background worker
+    delivers to observers in batches.
+    - every observer has a bounded ring queue with policy block | drop_oldest | drop_newest
+    - observers may implement update_batch(signals) to receive a whole batch at once
+    - flush() waits for queued signals; close() flushes and stops the worker
+    """
+    def __init__(self, capacity: int = 1024, batch_size: int = 64, policy: str = "block",
+                 flush_at_exit: bool = True):
+        super().__init__()
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.policy = policy
+        self._queues: List[_ObserverQueue] = []
+        self._cond = threading.Condition()
+        self._inflight = 0
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="SignalPublisher-dispatch", daemon=True)
+        self._worker.start()
+        self._flush_at_exit = flush_at_exit
+        if flush_at_exit:
+            atexit.register(self.close)
+
+    def attach(self, obs: Observer, symbols: Iterable[str] | None = None,
+               actions: Iterable[str] | None = None, min_notional: float | None = None,
+               policy: str | None = None, capacity: int | None = None):
+        q = _ObserverQueue(obs, capacity or self.capacity, policy or self.policy)
+        with self._cond:
+            self._index.add(obs, symbols, actions, min_notional).queue = q
+            self._queues.append(q)
+
+    def detach(self, obs: Observer):
+        with self._cond:
+            removed = {id(sub.queue) for sub in self._index.remove(obs)}
+            self._queues = [q for q in self._queues if id(q) not in removed]
+            self._cond.notify_all()
+
+    def notify(self, signal: Dict[str, Any]):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Publisher is closed")
+            for sub in self._index.match(signal):
+                q = sub.queue
+                if len(q.items) >= q.capacity:
+                    if q.policy == "drop_newest":
+                        q.dropped += 1
+                        continue
+                    if q.policy == "drop_oldest":
+                        q.items.popleft()
+                        q.dropped += 1
+                    else:
+                        while len(q.items) >= q.capacity and q in self._queues:
+                            self._cond.wait()
+                q.items.append(signal)
+            self._cond.notify_all()
+
+    # ==== worker ====
+    def _pending(self) -> int:
+        return sum(len(q.items) for q in self._queues)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and not self._pending():
+                    self._cond.wait()
+                if self._closed and not self._pending():
+                    return
+                batches = []
+                for q in self._queues:
+                    n = min(len(q.items), self.batch_size)
+                    if n:
+                        batches.append((q, [q.items.popleft() for _ in range(n)]))
+                        self._inflight += n
+                self._cond.notify_all()          # wake producers blocked on a full queue
+            for q, batch in batches:
+                self._deliver(q.observer, batch)
+                with self._cond:
+                    q.delivered += len(batch)
+                    self._inflight -= len(batch)
+                    self._cond.notify_all()
+
+    def _deliver(self, obs: Observer, batch: List[Dict[str, Any]]):
+        update_batch = getattr(obs, "update_batch", None)
+        try:
+            if update_batch is not None:
+                update_batch(batch)
+                return
+        except Exception as e:
+            print(f"[SignalPublisher] Observer {obs} raised error: {e}")
+            return
+        for signal in batch:
+            try:
+                obs.update(signal)
+            except Exception as e:
+                print(f"[SignalPublisher] Observer {obs} raised error: {e}")
+
+    # ==== shutdown / stats ====
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every queued signal has been delivered. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending() and not self._inflight, timeout)
+
+    def close(self, flush: bool = True, timeout: float | None = None):
+        if flush and self._worker.is_alive():
+            self.flush(timeout)
+        with self._cond:
+            if not flush:
+                for q in self._queues:
+                    q.dropped += len(q.items)
+                    q.items.clear()
+            self._closed = True
+            self._cond.notify_all()
+        if threading.current_thread() is not self._worker:
+            self._worker.join(timeout)
+        if self._flush_at_exit:
+            atexit.unregister(self.close)
+            self._flush_at_exit = False
+
+    def dropped(self, obs: Observer | None = None) -> int:
+        with self._cond:
+            return sum(q.dropped for q in self._queues if obs is None or q.observer is obs)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            return [{"observer": q.observer, "policy": q.policy, "pending": len(q.items),
+                     "delivered": q.delivered, "dropped": q.dropped} for q in self._queues]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 
 class LoggerObserver:
-    def __init__(self, prefix: str = "[Logger]"):
+    """Console logger; pass a sink (e.g. reporting.StructuredLogSink) for structured output
+    and console=False to silence the per-signal print."""
+    def __init__(self, prefix: str = "[Logger]", console: bool = True, sink: Any = None):
         self.prefix = prefix
+        self.console = console
+        self.sink = sink
 
     def update(self, signal: Dict[str, Any]) -> None:
-        print(f"{self.prefix} Signal received: {signal}")
+        if self.sink is not None:
+            self.sink.write("signal", signal)
+        if self.console:
+            print(f"{self.prefix} Signal received: {signal}")
 
 
 class AlertObserver:
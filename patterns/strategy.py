@@ -20,6 +20,12 @@ class Signal:
 
 
 class Strategy(ABC):
+    _windows = None         # windows.PriceWindows while bound by TradingEngine.run
+    bar_interval = None     # seconds: the engine feeds closed pipeline.Bar objects instead of ticks
+
+    def unbind_windows(self) -> None:
+        self._windows = None
+
     @abstractmethod
     def generate_signals(self, tick: Any) -> List[Dict[str, Any]]:
         raise NotImplementedError
@@ -27,21 +33,33 @@ class Strategy(ABC):
 
 class MeanReversionStrategy(Strategy):
 
-    def __init__(self, window: int = 20, threshold: float = 0.02, size: float = 10.0):
+    def __init__(self, window: int = 20, threshold: float = 0.02, size: float = 10.0,
+                 bar_interval: float | None = None):
         self.window = window
         self.threshold = threshold
         self.size = size
+        self.bar_interval = bar_interval
         self._prices = defaultdict(lambda: deque(maxlen=self.window))
 
+    def bind_windows(self, windows) -> None:
+        """Read prices from a shared PriceWindows (fed by its owner) instead of own deques."""
+        windows.register(self.window)
+        self._windows = windows
+
     def generate_signals(self, tick: MarketDataPoint) -> List[Dict[str, Any]]:
         sym = getattr(tick, "symbol", None) or tick.symbol
         price = float(getattr(tick, "price", None) or tick.price)
-        dq = self._prices[sym]
-        dq.append(price)
+        w = self._windows.view(sym, self.window) if self._windows is not None else None
+        if w is not None:                                   # already includes this price
+            n, total = len(w), w.sum
+        else:                                               # unbound, or a symbol the windows never saw
+            dq = self._prices[sym]
+            dq.append(price)
+            n, total = len(dq), sum(dq)
         signals = []
 
-        if len(dq) >= max(2, int(self.window / 4)):  # wait for some data
-            mean = sum(dq) / len(dq)
+        if n >= max(2, int(self.window / 4)):  # wait for some data
+            mean = total / n
             if price < mean * (1 - self.threshold):
                 signals.append(Signal(sym, "BUY", self.size, price, {"mean": mean}).as_dict())
             elif price > mean * (1 + self.threshold):
@@ -52,28 +70,39 @@ class MeanReversionStrategy(Strategy):
         return signals
 
 class BreakoutStrategy(Strategy):
-    def __init__(self, window: int = 20, size: float = 10.0):
+    def __init__(self, window: int = 20, size: float = 10.0, bar_interval: float | None = None):
         self.window = window
         self.size = size
+        self.bar_interval = bar_interval
         self._prices = defaultdict(lambda: deque(maxlen=self.window))
 
+    def bind_windows(self, windows) -> None:
+        windows.register(self.window, lag=1)
+        self._windows = windows
+
     def generate_signals(self, tick: Any) -> List[Dict[str, Any]]:
         sym = getattr(tick, "symbol", None) or tick.get("symbol")
         price = float(getattr(tick, "price", None) or tick.get("price"))
-        dq = self._prices[sym]
         signals: List[Dict[str, Any]] = []
+        w = self._windows.view(sym, self.window, lag=1) if self._windows is not None else None
+        if w is not None:                                    # history before this price
+            full = len(w) >= self.window
+            rh, rl = (w.max, w.min) if full else (None, None)
+        else:
+            dq = self._prices[sym]
+            full = len(dq) >= self.window
+            rh, rl = (max(dq), min(dq)) if full else (None, None)
 
         # compute breakout vs. HISTORY ONLY
-        if len(dq) >= self.window:
-            rh = max(dq)
-            rl = min(dq)
+        if full:
             if price > rh:
                 signals.append(Signal(sym, "BUY", self.size, price, {"rolling_high": rh}).as_dict())
             elif price < rl:
                 signals.append(Signal(sym, "SELL", self.size, price, {"rolling_low": rl}).as_dict())
 
         # update the rolling window AFTER decisions
-        dq.append(price)
+        if w is None:
+            dq.append(price)
         return signals
 
 
@@ -0,0 +1,190 @@
+# pipeline.py
+# streaming stages that sit between the loaders and TradingEngine
+
+from __future__ import annotations
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Set, Tuple
+from collections import deque
+from datetime import datetime, timedelta, timezone
+import heapq
+from models import MarketDataPoint
+
+
+class ReorderBuffer:
+    """
+    Re-sequences a slightly out-of-order, partly duplicated tick stream.
+    - ticks wait in a min-heap until the watermark (newest timestamp seen minus
+      `lateness`) passes them, then leave in timestamp order (arrival order on ties)
+    - a tick older than the last one already emitted is dropped as late
+    - exact duplicates (symbol, timestamp, price) are dropped using a FIFO set of
+      the last `dedup_capacity` keys
+    The heap only holds ticks inside the lateness window (or `max_pending`,
+    whichever is hit first), so memory does not grow with the stream.
+    Usage: TradingEngine(data=ReorderBuffer(lateness=2.0)(ticks), ...)
+    """
+    def __init__(self, lateness: float | timedelta = 1.0, dedup_capacity: int = 65_536,
+                 max_pending: int | None = None):
+        self.lateness = lateness if isinstance(lateness, timedelta) else timedelta(seconds=lateness)
+        if self.lateness < timedelta(0):
+            raise ValueError("lateness must be >= 0")
+        self.dedup_capacity = dedup_capacity
+        self.max_pending = max_pending
+        self._heap: List[Tuple[datetime, int, MarketDataPoint]] = []
+        self._seq = 0
+        self._keys: Set[Tuple[str, datetime, float]] = set()
+        self._key_order: Deque[Tuple[str, datetime, float]] = deque()
+        self._newest: datetime | None = None
+        self._released: datetime | None = None
+        self.received = 0
+        self.emitted = 0
+        self.late_dropped = 0
+        self.duplicates = 0
+
+    def _seen(self, tick: MarketDataPoint) -> bool:
+        key = (tick.symbol, tick.timestamp, float(tick.price))
+        if key in self._keys:
+            return True
+        self._keys.add(key)
+        self._key_order.append(key)
+        if len(self._key_order) > self.dedup_capacity:
+            self._keys.discard(self._key_order.popleft())
+        return False
+
+    def push(self, tick: MarketDataPoint) -> List[MarketDataPoint]:
+        """Accept one tick; returns the ticks that became releasable (possibly none)."""
+        self.received += 1
+        ts = tick.timestamp
+        if self._released is not None and ts < self._released:
+            self.late_dropped += 1
+            return []
+        if self._seen(tick):
+            self.duplicates += 1
+            return []
+        heapq.heappush(self._heap, (ts, self._seq, tick))
+        self._seq += 1
+        if self._newest is None or ts > self._newest:
+            self._newest = ts
+        return self._release(self._newest - self.lateness)
+
+    def _release(self, watermark: datetime | None) -> List[MarketDataPoint]:
+        out = []
+        heap = self._heap
+        while heap and (watermark is None or heap[0][0] <= watermark
+                        or (self.max_pending is not None and len(heap) > self.max_pending)):
+            ts, _, tick = heapq.heappop(heap)
+            self._released = ts
+            out.append(tick)
+        self.emitted += len(out)
+        return out
+
+    def flush(self) -> List[MarketDataPoint]:
+        """Release everything still buffered (end of stream)."""
+        return self._release(None)
+
+    def __call__(self, ticks: Iterable[MarketDataPoint]) -> Iterator[MarketDataPoint]:
+        for t in ticks:
+            yield from self.push(t)
+        yield from self.flush()
+
+    @property
+    def pending(self) -> int:
+        return len(self._heap)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"received": self.received, "emitted": self.emitted, "pending": self.pending,
+                "late_dropped": self.late_dropped, "duplicates": self.duplicates}
+
+
+class Bar:
+    """OHLCV bar; quacks like a MarketDataPoint (symbol, price=close, timestamp=bar end)."""
+    __slots__ = ("symbol", "interval", "start", "timestamp", "open", "high", "low", "close", "volume")
+
+    def __init__(self, symbol: str, interval: float, start: datetime, price: float):
+        self.symbol = symbol
+        self.interval = interval
+        self.start = start
+        self.timestamp = start + timedelta(seconds=interval)
+        self.open = self.high = self.low = self.close = price
+        self.volume = 1                         # tick count (sources carry no traded size)
+
+    @property
+    def price(self) -> float:
+        return self.close
+
+    def __repr__(self):
+        return (f"Bar(symbol={self.symbol}, interval={self.interval}, start={self.start}, "
+                f"o={self.open}, h={self.high}, l={self.low}, c={self.close}, v={self.volume})")
+
+
+class BarAggregator:
+    """
+    Incremental OHLCV bars per (symbol, interval) for any number of intervals
+    (seconds). Buckets are aligned to the epoch, so 60s bars start on the minute;
+    naive timestamps are read as UTC and give naive bars.
+    update(tick) extends the tick's open bar and returns every open bar, of any
+    symbol, whose bucket is older than the tick's: bars close when the stream's
+    watermark passes them, as they would on a real clock, not when their own
+    symbol ticks again. Closed bars come out ordered by (end time, interval).
+    A tick older than an interval's watermark is counted in `late_ticks` and
+    skipped for that interval (its bucket has already been closed).
+    """
+    def __init__(self, intervals: Iterable[float] = (60.0,)):
+        self.intervals = sorted(set(float(i) for i in intervals))
+        if not self.intervals or self.intervals[0] <= 0:
+            raise ValueError("intervals must be positive")
+        self._open: Dict[Tuple[str, float], Tuple[int, Bar]] = {}
+        self._heaps: Dict[float, List[Tuple[int, int, str]]] = {i: [] for i in self.intervals}  # (bucket, seq, symbol)
+        self._mark: Dict[float, int] = {}                   # interval -> newest bucket seen
+        self._seq = 0
+        self.bars_closed = 0
+        self.late_ticks = 0
+
+    def update(self, tick: MarketDataPoint) -> List[Bar]:
+        closed = []
+        px = float(tick.price)
+        tz = tick.timestamp.tzinfo
+        secs = (tick.timestamp if tz else tick.timestamp.replace(tzinfo=timezone.utc)).timestamp()
+        for interval in self.intervals:
+            bucket = int(secs // interval)
+            mark = self._mark.get(interval)
+            if mark is not None and bucket < mark:
+                self.late_ticks += 1
+                continue
+            if mark is None or bucket > mark:
+                self._mark[interval] = bucket
+                heap = self._heaps[interval]
+                while heap and heap[0][0] < bucket:
+                    _, _, sym = heapq.heappop(heap)
+                    closed.append(self._open.pop((sym, interval))[1])
+            key = (tick.symbol, interval)
+            cur = self._open.get(key)
+            if cur is not None:
+                bar = cur[1]
+                if px > bar.high: bar.high = px
+                if px < bar.low: bar.low = px
+                bar.close = px
+                bar.volume += 1
+                continue
+            start = datetime.fromtimestamp(bucket * interval, tz=tz or timezone.utc)
+            if tz is None:
+                start = start.replace(tzinfo=None)
+            self._open[key] = (bucket, Bar(tick.symbol, interval, start, px))
+            self._seq += 1
+            heapq.heappush(self._heaps[interval], (bucket, self._seq, tick.symbol))
+        if len(self.intervals) > 1:
+            closed.sort(key=lambda b: (b.timestamp, b.interval))
+        self.bars_closed += len(closed)
+        return closed
+
+    def flush(self) -> List[Bar]:
+        """Close every open bar (end of data), oldest first."""
+        closed = sorted((bar for _, bar in self._open.values()), key=lambda b: (b.timestamp, b.interval))
+        self._open.clear()
+        for heap in self._heaps.values():
+            heap.clear()
+        self.bars_closed += len(closed)
+        return closed
+
+    def __call__(self, ticks: Iterable[MarketDataPoint]) -> Iterator[Bar]:
+        for t in ticks:
+            yield from self.update(t)
+        yield from self.flush()
@@ -0,0 +1,120 @@
+# pnl.py
+# streaming mark-to-market PnL and equity curve
+
+from __future__ import annotations
+from typing import Any, Dict, List, Tuple
+from models import MarketDataPoint
+
+
+class EquityCurve:
+    """
+    Bounded, downsampled equity curve. Every `stride`-th sample is kept; when
+    the buffer reaches `capacity` every other point is dropped and the stride
+    doubles, so memory stays at `capacity` points for any session length.
+    """
+    def __init__(self, capacity: int = 4096):
+        if capacity < 2:
+            raise ValueError("capacity must be >= 2")
+        self.capacity = capacity
+        self.stride = 1
+        self.points: List[Tuple[Any, float]] = []
+        self._seen = 0
+
+    def append(self, timestamp: Any, equity: float) -> None:
+        i = self._seen
+        self._seen += 1
+        if i % self.stride:
+            return
+        if len(self.points) >= self.capacity:
+            self.points = self.points[::2]
+            self.stride *= 2
+            if i % self.stride:          # not on the coarser grid
+                return
+        self.points.append((timestamp, equity))
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+
+class _Book:
+    __slots__ = ("quantity", "avg_price", "last", "unrealized", "realized")
+
+    def __init__(self):
+        self.quantity = 0.0
+        self.avg_price = 0.0
+        self.last: float | None = None
+        self.unrealized = 0.0
+        self.realized = 0.0
+
+
+class MarkToMarket:
+    """
+    Per-symbol average-cost PnL fed by the engine (TradingEngine(pnl=...)).
+    - on_tick: refresh the symbol's last price and unrealized PnL; totals move by
+      the delta, so per-tick cost is O(1) regardless of how many positions are held
+    - on_fill: average-cost accounting as in MarketDataContainer.apply_fill,
+      extended to short positions; reducing trades realize PnL against avg_price
+    """
+    def __init__(self, cash: float = 0.0, curve_capacity: int = 4096):
+        self.initial_equity = float(cash)
+        self.books: Dict[str, _Book] = {}
+        self.unrealized = 0.0
+        self.realized = 0.0
+        self.curve = EquityCurve(curve_capacity)
+
+    @property
+    def equity(self) -> float:
+        return self.initial_equity + self.realized + self.unrealized
+
+    def _book(self, symbol: str) -> _Book:
+        b = self.books.get(symbol)
+        if b is None:
+            b = self.books[symbol] = _Book()
+        return b
+
+    def _remark(self, b: _Book) -> None:
+        new = b.quantity * (b.last - b.avg_price) if b.quantity and b.last is not None else 0.0
+        self.unrealized += new - b.unrealized
+        b.unrealized = new
+
+    def on_tick(self, tick: MarketDataPoint) -> None:
+        b = self._book(tick.symbol)
+        b.last = float(tick.price)
+        if b.quantity:
+            self._remark(b)
+        self.curve.append(tick.timestamp, self.equity)
+
+    def on_fill(self, fill: Dict[str, Any] | None) -> None:
+        if not fill or fill.get("status") != "executed":
+            return
+        qty = float(fill["quantity"])
+        signed = qty if str(fill["action"]).upper() == "BUY" else -qty
+        self.apply(fill["symbol"], signed, float(fill["price"]))
+
+    def apply(self, symbol: str, signed_qty: float, price: float) -> None:
+        b = self._book(symbol)
+        old = b.quantity
+        if old == 0 or (old > 0) == (signed_qty > 0):
+            total = abs(old) + abs(signed_qty)
+            b.avg_price = (b.avg_price * abs(old) + price * abs(signed_qty)) / total if total else 0.0
+            b.quantity = old + signed_qty
+        else:
+            closing = min(abs(signed_qty), abs(old))
+            pnl = closing * (price - b.avg_price) * (1 if old > 0 else -1)
+            b.realized += pnl
+            self.realized += pnl
+            b.quantity = old + signed_qty
+            if abs(b.quantity) < 1e-12:
+                b.quantity = 0.0
+                b.avg_price = 0.0
+            elif (b.quantity > 0) != (old > 0):
+                b.avg_price = price          # flipped: remainder opened at the fill price
+        if b.last is None:
+            b.last = price
+        self._remark(b)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"equity": self.equity, "realized": self.realized, "unrealized": self.unrealized,
+                "positions": {s: {"quantity": b.quantity, "avg_price": b.avg_price, "last": b.last,
+                                  "unrealized": b.unrealized, "realized": b.realized}
+                              for s, b in self.books.items() if b.quantity or b.realized}}
@@ -0,0 +1,138 @@
+# recorder.py
+# record strategy signals once, replay them into publisher/router/risk/commands
+
+from __future__ import annotations
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Sequence, Tuple
+from datetime import datetime
+import hashlib
+import json
+import struct
+from tickstore import from_ns, to_ns
+
+MAGIC = b"SIGREC1\n"
+_HEAD = struct.Struct("<I")                 # length of the header JSON
+_TAG = struct.Struct("<B")
+_NAME = struct.Struct("<H")                 # name length (symbol / strategy table entry)
+_REC = struct.Struct("<qHHBddH")            # ts_ns, symbol id, strategy id, action, size, price, extra len
+_SYMBOL, _STRATEGY, _SIGNAL = 1, 2, 3
+ACTIONS = ("BUY", "SELL", "HOLD")
+_CORE = ("symbol", "action", "size", "price", "strategy")
+
+
+class StaleRecordingError(ValueError):
+    pass
+
+
+def strategy_config(strategies: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Public scalar parameters of each strategy (window, threshold, size, ...)."""
+    out = []
+    for s in strategies:
+        params = {k: v for k, v in sorted(vars(s).items())
+                  if not k.startswith("_") and isinstance(v, (int, float, str, bool))}
+        out.append({"type": type(s).__name__, "params": params})
+    return out
+
+
+def fingerprint(strategies: Sequence[Any], data_files: Iterable[str] = (), extra: Any = None) -> str:
+    """sha256 over strategy parameters and the contents of every input data file."""
+    from dataloader import file_digest
+    h = hashlib.sha256()
+    h.update(json.dumps(strategy_config(strategies), sort_keys=True).encode())
+    for path in data_files:
+        h.update(file_digest(path).encode())
+    if extra is not None:
+        h.update(json.dumps(extra, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class SignalRecorder:
+    """
+    Append-only binary log of the signals produced by TradingEngine.run
+    (TradingEngine(recorder=...)). Layout:
+      MAGIC, u32 header length, header JSON {"fingerprint", "meta"}
+      then tagged entries: symbol/strategy table entries (written the first time
+      a name appears) and fixed-width signal records; any other signal keys
+      (meta, order_type, ...) ride along as a short JSON blob.
+    """
+    def __init__(self, path: str, fingerprint: str, meta: Dict[str, Any] | None = None):
+        self.path = path
+        self.count = 0
+        self._fp: BinaryIO = open(path, "wb")
+        self._ids: Tuple[Dict[str, int], Dict[str, int]] = ({}, {})
+        head = json.dumps({"fingerprint": fingerprint, "meta": meta or {}}).encode()
+        self._fp.write(MAGIC + _HEAD.pack(len(head)) + head)
+
+    def _id(self, table: int, name: str) -> int:
+        ids = self._ids[table - 1]
+        i = ids.get(name)
+        if i is None:
+            i = ids[name] = len(ids)
+            raw = name.encode()
+            self._fp.write(_TAG.pack(table) + _NAME.pack(len(raw)) + raw)
+        return i
+
+    def record(self, timestamp: datetime, sig: Dict[str, Any]) -> None:
+        extra = {k: v for k, v in sig.items() if k not in _CORE}
+        blob = json.dumps(extra, separators=(",", ":"), default=str).encode() if extra else b""
+        sym = self._id(_SYMBOL, sig["symbol"])
+        strat = self._id(_STRATEGY, sig.get("strategy") or "")
+        self._fp.write(_TAG.pack(_SIGNAL) + _REC.pack(to_ns(timestamp), sym, strat, ACTIONS.index(sig["action"].upper()),
+                                                       float(sig["size"]), float(sig["price"]), len(blob)) + blob)
+        self.count += 1
+
+    def close(self) -> None:
+        if not self._fp.closed:
+            self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SignalRecording:
+    """Reader for a SignalRecorder file; iterating yields (timestamp, signal dict)."""
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a signal recording")
+            (n,) = _HEAD.unpack(f.read(_HEAD.size))
+            head = json.loads(f.read(n))
+            self._offset = f.tell()
+        self.fingerprint = head["fingerprint"]
+        self.meta = head["meta"]
+
+    def check(self, expected: str) -> "SignalRecording":
+        if expected != self.fingerprint:
+            raise StaleRecordingError(
+                f"{self.path} was recorded for fingerprint {self.fingerprint[:12]}..., "
+                f"current inputs give {expected[:12]}...; record again")
+        return self
+
+    def __iter__(self) -> Iterator[Tuple[datetime, Dict[str, Any]]]:
+        tables: Tuple[List[str], List[str]] = ([], [])
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            while True:
+                tag = f.read(1)
+                if not tag:
+                    return
+                if tag[0] == _SIGNAL:
+                    raw = f.read(_REC.size)
+                    if len(raw) < _REC.size:
+                        raise ValueError(f"truncated signal record in {self.path}")
+                    ts, sym, strat, act, size, price, n = _REC.unpack(raw)
+                    sig = {"symbol": tables[0][sym], "action": ACTIONS[act], "size": size, "price": price}
+                    if n:
+                        sig.update(json.loads(f.read(n)))
+                    sig["strategy"] = tables[1][strat]
+                    yield from_ns(ts), sig
+                else:
+                    (n,) = _NAME.unpack(f.read(_NAME.size))
+                    tables[tag[0] - 1].append(f.read(n).decode())
+
+    def signals(self) -> Iterator[Dict[str, Any]]:
+        for _, sig in self:
+            yield sig
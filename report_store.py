@@ -0,0 +1,215 @@
+# report_store.py
+# chunked, columnar run reports under report_path
+
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List
+from datetime import datetime, timezone
+import csv
+import importlib.util
+import json
+import os
+import queue
+import threading
+
+MANIFEST = "manifest.json"
+
+
+def _parquet_available() -> bool:
+    return importlib.util.find_spec("pandas") is not None and importlib.util.find_spec("pyarrow") is not None
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, default=str)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class RunReportWriter:
+    """
+    Streams run data (signals, fills, equity, per-stage stats) into
+    <report_path>/<run_id>/<stream>/part-NNNNN.{csv,parquet}.
+    - rows are buffered per stream and cut into chunks of chunk_rows
+    - a background thread writes chunks, so the run never holds its full history
+    - close() flushes partial chunks and writes manifest.json for RunReport
+    fmt: "csv", "parquet" (pandas + pyarrow) or "auto" (parquet when available).
+    """
+    def __init__(self, report_path: str = "./reports/", run_id: str | None = None,
+                 chunk_rows: int = 10_000, fmt: str = "auto", max_pending_chunks: int = 8):
+        if fmt == "auto":
+            fmt = "parquet" if _parquet_available() else "csv"
+        if fmt not in ("csv", "parquet"):
+            raise ValueError(f"Unsupported report format: {fmt}")
+        self.fmt = fmt
+        self.run_id = run_id or datetime.now(timezone.utc).strftime("run-%Y%m%dT%H%M%S%fZ")
+        self.path = os.path.join(report_path, self.run_id)
+        os.makedirs(self.path, exist_ok=True)
+        self.chunk_rows = chunk_rows
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self._manifest: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending_chunks)
+        self._error: BaseException | None = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="RunReportWriter", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, cfg, **kwargs) -> "RunReportWriter":
+        return cls(cfg.get("report_path") or "./reports/", **kwargs)
+
+    # ==== producers ====
+    def record(self, stream: str, row: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Report writer is closed")
+            buf = self._buffers.setdefault(stream, [])
+            buf.append(row)
+            if len(buf) < self.chunk_rows:
+                return
+            self._buffers[stream] = []
+            seq = self._next_part(stream)
+        self._queue.put((stream, seq, buf))       # blocks when the writer falls behind
+
+    def update(self, signal: Dict[str, Any]) -> None:
+        """Observer hook: publisher.attach(writer) records every signal."""
+        self.record("signals", signal)
+
+    def on_fill(self, fill: Dict[str, Any] | None) -> None:
+        if fill:
+            self.record("fills", fill)
+
+    def record_equity(self, timestamp: Any, equity: float) -> None:
+        self.record("equity", {"timestamp": timestamp, "equity": equity})
+
+    def write_equity_curve(self, curve) -> None:
+        """Append a pnl.EquityCurve's (downsampled) points."""
+        for ts, eq in curve.points:
+            self.record_equity(ts, eq)
+
+    def record_stats(self, stage: str, **values: Any) -> None:
+        self.record("stats", {"stage": stage, **values})
+
+    def _next_part(self, stream: str) -> int:
+        entry = self._manifest.setdefault(stream, {"parts": [], "rows": 0, "columns": []})
+        entry.setdefault("_next", 0)
+        seq = entry["_next"]
+        entry["_next"] += 1
+        return seq
+
+    # ==== writer thread ====
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write_chunk(*item)
+            except BaseException as e:        # surfaced again by close()
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write_chunk(self, stream: str, seq: int, rows: List[Dict[str, Any]]) -> None:
+        columns: List[str] = []
+        seen = set()
+        for row in rows:
+            for k in row:
+                if k not in seen:
+                    seen.add(k); columns.append(k)
+        directory = os.path.join(self.path, stream)
+        os.makedirs(directory, exist_ok=True)
+        name = f"part-{seq:05d}.{self.fmt}"
+        if self.fmt == "csv":
+            with open(os.path.join(directory, name), "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                w.writerow(columns)
+                w.writerows([_cell(row.get(c, "")) for c in columns] for row in rows)
+        else:
+            import pandas as pd
+            cols = {c: [_cell(row.get(c)) for row in rows] for c in columns}
+            pd.DataFrame(cols).to_parquet(os.path.join(directory, name), index=False)
+        with self._lock:
+            entry = self._manifest[stream]
+            entry["parts"].append(name)
+            entry["rows"] += len(rows)
+            entry["columns"] += [c for c in columns if c not in entry["columns"]]
+
+    def flush(self) -> None:
+        """Hand every partial chunk to the writer and wait until all are on disk."""
+        with self._lock:
+            pending = [(s, self._next_part(s), rows) for s, rows in self._buffers.items() if rows]
+            self._buffers = {s: [] for s in self._buffers}
+        for item in pending:
+            self._queue.put(item)
+        self._queue.join()
+        if self._error is not None:
+            raise self._error
+
+    def close(self) -> str:
+        """Flush, write the manifest and stop the writer; returns the run directory."""
+        if self._closed:
+            return self.path
+        self.flush()
+        with self._lock:
+            self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        manifest = {"run_id": self.run_id, "format": self.fmt,
+                    "streams": {s: {k: v for k, v in e.items() if not k.startswith("_")}
+                                for s, e in self._manifest.items()}}
+        for entry in manifest["streams"].values():
+            entry["parts"].sort()
+        with open(os.path.join(self.path, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RunReport:
+    """Lazy reader for a run directory written by RunReportWriter; chunks load one at a time."""
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, MANIFEST), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.format = self.manifest["format"]
+
+    def streams(self) -> List[str]:
+        return list(self.manifest["streams"])
+
+    def rows(self, stream: str) -> int:
+        return self.manifest["streams"][stream]["rows"]
+
+    def _parts(self, stream: str) -> List[str]:
+        entry = self.manifest["streams"].get(stream)
+        if entry is None:
+            raise KeyError(f"No stream {stream!r} in report {self.path}")
+        return [os.path.join(self.path, stream, p) for p in entry["parts"]]
+
+    def iter_chunks(self, stream: str) -> Iterator[Any]:
+        """Yield one pandas DataFrame per chunk."""
+        import pandas as pd
+        for part in self._parts(stream):
+            yield pd.read_parquet(part) if self.format == "parquet" else pd.read_csv(part)
+
+    def iter_rows(self, stream: str) -> Iterator[Dict[str, Any]]:
+        """Row dicts without pandas (CSV values come back as strings)."""
+        if self.format == "parquet":
+            for chunk in self.iter_chunks(stream):
+                yield from chunk.to_dict("records")
+            return
+        for part in self._parts(stream):
+            with open(part, newline="", encoding="utf-8") as f:
+                yield from csv.DictReader(f)
+
+    def load(self, stream: str):
+        """Whole stream as one DataFrame (loads every chunk)."""
+        import pandas as pd
+        chunks = list(self.iter_chunks(stream))
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
@@ -1,45 +1,238 @@
 
 from __future__ import annotations
-from typing import Protocol, Dict, Any, List
+from typing import Protocol, Callable, Dict, Any, Iterable, List, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
+import json
+import math
+import os
+import threading
+import time
+from patterns.observer import SubscriptionIndex
 
 # -------- Publisher / Observer interfaces ----------
 class Observer(Protocol):
     def update(self, signal: Dict[str, Any]) -> None: ...
 
 class SignalPublisher:
-    """Simple publisher that notifies attached observers with a signal dict."""
+    """Simple publisher that notifies attached observers with a signal dict.
+    Observers may subscribe to a subset of symbols/actions or a minimum notional."""
     def __init__(self) -> None:
-        self._observers: List[Observer] = []
+        self._index = SubscriptionIndex()
 
-    def attach(self, obs: Observer) -> None:
-        if obs not in self._observers:
-            self._observers.append(obs)
+    def attach(self, obs: Observer, symbols: Iterable[str] | None = None,
+               actions: Iterable[str] | None = None, min_notional: float | None = None) -> None:
+        if obs not in self._index:
+            self._index.add(obs, symbols, actions, min_notional)
 
     def detach(self, obs: Observer) -> None:
-        if obs in self._observers:
-            self._observers.remove(obs)
+        self._index.remove(obs)
 
     def notify(self, signal: Dict[str, Any]) -> None:
-        for obs in list(self._observers):
-            obs.update(signal)
+        for sub in self._index.match(signal):
+            sub.observer.update(signal)
 
 # -------- Concrete observers ----------
 @dataclass
 class LoggerObserver:
-    """Prints signals (or route to std logging if you prefer)."""
+    """Prints signals and/or forwards them to a structured sink (console=False in production)."""
     prefix: str = "[SIGNAL]"
+    console: bool = True
+    sink: StructuredLogSink | None = None
     def update(self, signal: Dict[str, Any]) -> None:
-        ts = signal.get("timestamp") or datetime.utcnow().isoformat()
-        print(f"{self.prefix} {ts} {signal}")
+        if self.sink is not None:
+            self.sink.write("signal", signal)
+        if self.console:
+            ts = signal.get("timestamp") or datetime.utcnow().isoformat()
+            print(f"{self.prefix} {ts} {signal}")
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch (DDSketch-style): every value lands in bucket
+    ceil(log(x) / log(gamma)), so quantiles carry a bounded relative error
+    of `accuracy`. Buckets are plain counts, so sketches add and subtract.
+    Memory is capped at max_bins by folding the lowest buckets together: the
+    bucket they fold into becomes `floor`, and later values below it land there.
+    Sketches that are subtracted from each other must share a floor (fold()).
+    """
+    def __init__(self, accuracy: float = 0.01, max_bins: int = 2048) -> None:
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.bins: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.floor: int | None = None
+
+    def add(self, value: float, n: int = 1) -> None:
+        self.count += n
+        if value <= 0.0:
+            self.zeros += n
+            return
+        k = math.ceil(math.log(value) / self._log_gamma)
+        if self.floor is not None and k < self.floor:
+            k = self.floor
+        self.bins[k] = self.bins.get(k, 0) + n
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        keys = sorted(self.bins)
+        self.fold(keys[len(keys) - self.max_bins])
+
+    def fold(self, floor: int) -> None:
+        """Move every bucket below `floor` into it; later values below it land there too."""
+        if self.floor is not None and floor <= self.floor:
+            return
+        self.floor = floor
+        low = [k for k in self.bins if k < floor]
+        if low:
+            self.bins[floor] = self.bins.get(floor, 0) + sum(self.bins.pop(k) for k in low)
+
+    def merge(self, other: "QuantileSketch", sign: int = 1) -> None:
+        for k, c in other.bins.items():
+            left = self.bins.get(k, 0) + sign * c
+            if left:
+                self.bins[k] = left
+            else:
+                self.bins.pop(k, None)
+        self.zeros += sign * other.zeros
+        self.count += sign * other.count
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        if not self.count:
+            return [0.0 for _ in qs]
+        keys = sorted(self.bins)
+        out = []
+        for q in qs:
+            rank = q * (self.count - 1)
+            seen = self.zeros
+            if rank < seen:
+                out.append(0.0)
+                continue
+            value = 0.0
+            for k in keys:
+                seen += self.bins[k]
+                if seen > rank:
+                    value = 2 * self.gamma ** k / (self.gamma + 1)
+                    break
+            out.append(value)
+        return out
+
+
+class RollingStats:
+    """
+    Time-bucketed rolling window: `buckets` slots of `bucket_seconds` each.
+    The window aggregate is maintained by adding new values and subtracting
+    whole buckets as they expire, so updates never re-scan the window.
+    """
+    QS = (0.5, 0.95, 0.99)
+
+    def __init__(self, window_seconds: float = 60.0, buckets: int = 12, accuracy: float = 0.01,
+                 max_bins: int = 2048) -> None:
+        self.bucket_seconds = window_seconds / buckets
+        self.window_seconds = window_seconds
+        self._accuracy = accuracy
+        self._max_bins = max_bins
+        self._epochs = [-1] * buckets
+        self._counts = [0] * buckets
+        self._notional = [QuantileSketch(accuracy, max_bins) for _ in range(buckets)]
+        self._size = [QuantileSketch(accuracy, max_bins) for _ in range(buckets)]
+        self.count = 0
+        self.notional = QuantileSketch(accuracy, max_bins)
+        self.size = QuantileSketch(accuracy, max_bins)
+        self._epoch = -1
+        self._cached: Dict[str, Any] | None = None
+
+    def _advance(self, now: float) -> int:
+        epoch = int(now // self.bucket_seconds)
+        if epoch != self._epoch:
+            n = len(self._epochs)
+            for slot, e in enumerate(self._epochs):
+                if e >= 0 and e <= epoch - n:
+                    self._expire(slot)
+            self._epoch = epoch
+            self._cached = None
+        return epoch
+
+    def _expire(self, slot: int) -> None:
+        self.count -= self._counts[slot]
+        self.notional.merge(self._notional[slot], -1)
+        self.size.merge(self._size[slot], -1)
+        self._counts[slot] = 0
+        self._notional[slot] = self._slot_sketch(self.notional)
+        self._size[slot] = self._slot_sketch(self.size)
+        self._epochs[slot] = -1
+
+    def _slot_sketch(self, total: QuantileSketch) -> QuantileSketch:
+        sk = QuantileSketch(self._accuracy, self._max_bins)
+        if total.floor is not None:
+            sk.fold(total.floor)
+        return sk
+
+    @staticmethod
+    def _add(total: QuantileSketch, slots: List[QuantileSketch], slot: int, value: float) -> None:
+        """
+        Add to the slot and the window total, keeping their buckets aligned: the
+        total holds every slot's keys, so it is the one that hits max_bins, and
+        its fold is applied to every slot so whole-slot subtraction stays exact.
+        """
+        floor = total.floor
+        slots[slot].add(value)
+        total.add(value)
+        if total.floor != floor:
+            for sk in slots:
+                sk.fold(total.floor)
+
+    def add(self, now: float, size: float, notional: float) -> None:
+        epoch = self._advance(now)
+        slot = epoch % len(self._epochs)
+        if self._epochs[slot] != epoch:
+            if self._epochs[slot] >= 0:
+                self._expire(slot)
+            self._epochs[slot] = epoch
+        self._counts[slot] += 1
+        self.count += 1
+        self._add(self.notional, self._notional, slot, notional)
+        self._add(self.size, self._size, slot, size)
+        self._cached = None
+
+    def stats(self, now: float) -> Dict[str, Any]:
+        self._advance(now)
+        if self._cached is None:
+            p = self.notional.quantiles(self.QS)
+            z = self.size.quantiles(self.QS)
+            self._cached = {
+                "count": self.count,
+                "rate": self.count / self.window_seconds,
+                "notional": {"p50": p[0], "p95": p[1], "p99": p[2]},
+                "size": {"p50": z[0], "p95": z[1], "p99": z[2]},
+            }
+        return self._cached
+
 
 @dataclass
 class MetricsObserver:
-    """Keeps simple analytics counters over signals."""
+    """Keeps analytics counters over signals plus bounded rolling metrics
+    (rate, notional and size quantiles) per symbol and per strategy."""
     count: int = 0
     by_action: Dict[str, int] = field(default_factory=dict)
     last_signal: Dict[str, Any] | None = None
+    window_seconds: float = 60.0
+    buckets: int = 12
+    clock: Callable[[], float] = time.monotonic
+    by_symbol: Dict[str, RollingStats] = field(default_factory=dict, repr=False)
+    by_strategy: Dict[str, RollingStats] = field(default_factory=dict, repr=False)
+    _snap: Dict[str, Any] | None = field(default=None, init=False, repr=False, compare=False)
+    _snap_epoch: int = field(default=-1, init=False, repr=False, compare=False)
+    _dirty: Dict[str, set] = field(default_factory=lambda: {"by_symbol": set(), "by_strategy": set()},
+                                   init=False, repr=False, compare=False)
+
+    def _stats(self, table: Dict[str, RollingStats], key: str) -> RollingStats:
+        rs = table.get(key)
+        if rs is None:
+            rs = table[key] = RollingStats(self.window_seconds, self.buckets)
+        return rs
 
     def update(self, signal: Dict[str, Any]) -> None:
         self.count += 1
@@ -47,5 +240,140 @@ class MetricsObserver:
         self.by_action[act] = self.by_action.get(act, 0) + 1
         self.last_signal = signal
 
+        now = self.clock()
+        size = abs(float(signal.get("size", 0.0)))
+        notional = size * abs(float(signal.get("price", 0.0)))
+        symbol = str(signal.get("symbol", "UNKNOWN"))
+        self._stats(self.by_symbol, symbol).add(now, size, notional)
+        strategy = str(signal.get("strategy") or (signal.get("meta") or {}).get("strategy") or "UNKNOWN")
+        self._stats(self.by_strategy, strategy).add(now, size, notional)
+        self._dirty["by_symbol"].add(symbol)
+        self._dirty["by_strategy"].add(strategy)
+
     def snapshot(self) -> Dict[str, Any]:
-        return {"count": self.count, "by_action": dict(self.by_action), "last": self.last_signal}
+        """
+        Cached: the same dict comes back until a signal arrives or the window
+        moves to a new bucket; after updates only the touched symbols and
+        strategies are recomputed. Treat the result as read-only.
+        """
+        now = self.clock()
+        epoch = int(now // (self.window_seconds / self.buckets))
+        snap, dirty = self._snap, self._dirty
+        if snap is not None and epoch == self._snap_epoch and not (dirty["by_symbol"] or dirty["by_strategy"]):
+            return snap
+        tables = {"by_symbol": self.by_symbol, "by_strategy": self.by_strategy}
+        if snap is None or epoch != self._snap_epoch:       # buckets expired everywhere
+            views = {name: {k: rs.stats(now) for k, rs in table.items()} for name, table in tables.items()}
+        else:
+            views = {name: {**snap[name], **{k: tables[name][k].stats(now) for k in dirty[name]}}
+                     for name in tables}
+        for keys in dirty.values():
+            keys.clear()
+        self._snap = {"count": self.count, "by_action": dict(self.by_action), "last": self.last_signal, **views}
+        self._snap_epoch = epoch
+        return self._snap
+
+# -------- Structured log sink ----------
+class StructuredLogSink:
+    """
+    Buffered JSON Lines writer for signals and fills.
+    - write() only appends to an in-memory batch; serialization and file IO
+      happen on a background thread every flush_interval seconds (or sooner
+      once batch_size records are pending)
+    - the active file rotates to name.1 ... name.N once it exceeds max_bytes
+    """
+    def __init__(self, directory: str = "./reports/", filename: str = "events.jsonl",
+                 max_bytes: int = 64 * 1024 * 1024, backups: int = 5,
+                 batch_size: int = 1024, flush_interval: float = 0.5) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, filename)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._pending: List[Tuple[str, float, Dict[str, Any]]] = []
+        self._lock = threading.Lock()        # guards _pending
+        self._io_lock = threading.Lock()     # guards the file handle
+        self._wake = threading.Event()
+        self._closed = False
+        self._fh = open(self.path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="StructuredLogSink", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, cfg, **kwargs) -> "StructuredLogSink":
+        kwargs.setdefault("max_bytes", int(cfg.get("log_max_bytes", 64 * 1024 * 1024)))
+        return cls(cfg.get("report_path") or "./reports/", **kwargs)
+
+    # ==== producer side ====
+    def write(self, kind: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Sink is closed")
+            self._pending.append((kind, time.time(), record))
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def update(self, signal: Dict[str, Any]) -> None:
+        self.write("signal", signal)
+
+    def update_batch(self, signals: List[Dict[str, Any]]) -> None:
+        now = time.time()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Sink is closed")
+            self._pending.extend(("signal", now, s) for s in signals)
+        self._wake.set()
+
+    # ==== writer side ====
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        with self._io_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            text = "".join(json.dumps({"kind": k, "logged_at": t, **rec}, default=str) + "\n"
+                           for k, t, rec in batch)
+            self._fh.write(text)
+            self._fh.flush()
+            self.written += len(batch)
+            if self._fh.tell() >= self.max_bytes:
+                self._rotate()
+
+    def _rotate(self) -> None:
+        self._fh.close()
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._fh = open(self.path, "a", encoding="utf-8")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        with self._io_lock:
+            self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
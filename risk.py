@@ -0,0 +1,202 @@
+# risk.py
+# portfolio-level risk over the composite portfolio
+
+from __future__ import annotations
+from typing import Dict, List, Mapping
+from statistics import NormalDist
+import math
+import numpy as np
+from models import MarketDataPoint, PortfolioComponent, PortfolioGroup, Position
+
+
+class ReturnsWindow:
+    """
+    Rolling matrix of per-symbol log returns (ring buffer of `window` rows).
+    - update(tick) only records the last price per symbol
+    - sample() appends one row of returns since the previous sample
+      (symbols without a new price contribute 0.0)
+    - sum and cross-product matrices are updated on push/evict, so the
+      covariance never re-scans the window
+    If `interval` (seconds) is set, update() samples automatically whenever a
+    tick crosses into a new interval.
+    """
+    def __init__(self, window: int = 250, interval: float | None = None, capacity: int = 16):
+        self.window = window
+        self.interval = interval
+        self.ids: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.count = 0
+        self._head = 0
+        self._bucket = None
+        self._rows = np.zeros((window, capacity))
+        self._sum = np.zeros(capacity)
+        self._cross = np.zeros((capacity, capacity))
+        self._last = np.full(capacity, np.nan)
+        self._ref = np.full(capacity, np.nan)
+        self._cov: np.ndarray | None = None
+
+    def intern(self, symbol: str) -> int:
+        sid = self.ids.get(symbol)
+        if sid is None:
+            sid = len(self.symbols)
+            if sid == len(self._sum):
+                self._grow(2 * sid)
+            self.ids[symbol] = sid
+            self.symbols.append(symbol)
+            self._cov = None
+        return sid
+
+    def _grow(self, capacity: int) -> None:
+        n = len(self._sum)
+        rows = np.zeros((self.window, capacity)); rows[:, :n] = self._rows; self._rows = rows
+        s = np.zeros(capacity); s[:n] = self._sum; self._sum = s
+        c = np.zeros((capacity, capacity)); c[:n, :n] = self._cross; self._cross = c
+        for name in ("_last", "_ref"):
+            a = np.full(capacity, np.nan); a[:n] = getattr(self, name); setattr(self, name, a)
+
+    def update(self, tick: MarketDataPoint) -> None:
+        if self.interval:
+            bucket = int(tick.timestamp.timestamp() // self.interval)
+            if self._bucket is not None and bucket != self._bucket:
+                self.sample()
+            self._bucket = bucket
+        self._last[self.intern(tick.symbol)] = float(tick.price)
+
+    __call__ = update
+
+    def sample(self) -> None:
+        n = len(self.symbols)
+        last, ref = self._last[:n], self._ref[:n]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            row = np.log(last / ref)
+        row = np.where(np.isfinite(row), row, 0.0)
+        self._ref[:n] = np.where(np.isnan(last), ref, last)
+        self.push(row)
+
+    def push(self, row: np.ndarray) -> None:
+        m = len(self._sum)
+        full = np.zeros(m); full[: len(row)] = row
+        if self.count == self.window:
+            old = self._rows[self._head]
+            self._sum -= old
+            self._cross -= np.outer(old, old)
+        else:
+            self.count += 1
+        self._rows[self._head] = full
+        self._sum += full
+        self._cross += np.outer(full, full)
+        self._head = (self._head + 1) % self.window
+        self._cov = None
+
+    def last_price(self, symbol: str) -> float:
+        sid = self.ids.get(symbol)
+        return float(self._last[sid]) if sid is not None else math.nan
+
+    def covariance(self) -> np.ndarray:
+        """Sample covariance of the window (n_symbols x n_symbols), cached until the next push."""
+        if self._cov is None:
+            n, k = len(self.symbols), self.count
+            if k < 2:
+                self._cov = np.zeros((n, n))
+            else:
+                mean = self._sum[:n] / k
+                self._cov = (self._cross[:n, :n] - k * np.outer(mean, mean)) / (k - 1)
+        return self._cov
+
+
+def _leaf_prices(node: PortfolioComponent) -> Dict[str, float]:
+    prices: Dict[str, float] = {}
+    stack = [node]
+    while stack:
+        comp = stack.pop()
+        if isinstance(comp, PortfolioGroup):
+            stack.extend(comp.components)
+        elif isinstance(comp, Position) and comp.price is not None:
+            prices.setdefault(comp.symbol, float(comp.price))
+    return prices
+
+
+class PortfolioRisk:
+    """
+    Parametric (variance-covariance) VaR for any PortfolioGroup node.
+    Exposures are quantity x price, using the window's last traded price and
+    falling back to the leaf Position price.
+    """
+    def __init__(self, returns: ReturnsWindow, confidence: float = 0.99, horizon: float = 1.0):
+        self.returns = returns
+        self.confidence = confidence
+        self.horizon = horizon
+
+    @property
+    def z(self) -> float:
+        return NormalDist().inv_cdf(self.confidence) * math.sqrt(self.horizon)
+
+    def exposures(self, node: PortfolioComponent, prices: Mapping[str, float] | None = None) -> np.ndarray:
+        rw = self.returns
+        fallback = _leaf_prices(node)
+        w = np.zeros(len(rw.symbols))
+        for sym, qty in node.get_positions().items():
+            sid = rw.intern(sym)
+            if sid >= len(w):
+                w = np.pad(w, (0, sid + 1 - len(w)))
+            px = prices.get(sym) if prices else None
+            if px is None:
+                px = rw.last_price(sym)
+                if math.isnan(px):
+                    px = fallback.get(sym, 0.0)
+            w[sid] += qty * px
+        return w
+
+    def var(self, node: PortfolioComponent, prices: Mapping[str, float] | None = None) -> float:
+        return self.book(node, prices).var()
+
+    def component_var(self, node: PortfolioComponent, prices: Mapping[str, float] | None = None) -> Dict[str, float]:
+        return self.book(node, prices).component_var()
+
+    def book(self, node: PortfolioComponent, prices: Mapping[str, float] | None = None) -> "BookRisk":
+        return BookRisk(self, self.exposures(node, prices))
+
+
+class BookRisk:
+    """
+    VaR state for one book: exposure vector w and Sigma @ w. set_exposure()
+    applies a single position change as a rank-one update in O(n_symbols).
+    """
+    def __init__(self, risk: PortfolioRisk, exposures: np.ndarray):
+        self.risk = risk
+        self.w = exposures
+        self._cov = risk.returns.covariance()
+        self._cov_w = self._cov @ self.w
+
+    def _refresh(self) -> None:
+        cov = self.risk.returns.covariance()
+        if cov is not self._cov or len(self.w) != len(cov):
+            if len(self.w) < len(cov):
+                self.w = np.pad(self.w, (0, len(cov) - len(self.w)))
+            self._cov = cov
+            self._cov_w = cov @ self.w
+
+    def set_exposure(self, symbol: str, value: float) -> None:
+        sid = self.risk.returns.intern(symbol)
+        self._refresh()
+        delta = value - self.w[sid]
+        self.w[sid] = value
+        self._cov_w += delta * self._cov[:, sid]
+
+    def set_position(self, symbol: str, quantity: float, price: float | None = None) -> None:
+        px = self.risk.returns.last_price(symbol) if price is None else price
+        self.set_exposure(symbol, quantity * px)
+
+    def sigma(self) -> float:
+        self._refresh()
+        return math.sqrt(max(float(self.w @ self._cov_w), 0.0))
+
+    def var(self) -> float:
+        return self.risk.z * self.sigma()
+
+    def component_var(self) -> Dict[str, float]:
+        sigma = self.sigma()
+        if sigma == 0.0:
+            return {sym: 0.0 for sym, sid in self.risk.returns.ids.items() if self.w[sid]}
+        contrib = self.w * self._cov_w / sigma * self.risk.z
+        return {sym: float(contrib[sid]) for sym, sid in self.risk.returns.ids.items() if self.w[sid]}
@@ -0,0 +1,139 @@
+# shm.py
+# load ticks once into shared memory; worker processes attach read-only by name
+
+from __future__ import annotations
+from typing import Iterable, Iterator, List
+from multiprocessing import resource_tracker, shared_memory
+import json
+import os
+import sys
+import uuid
+import weakref
+import numpy as np
+from models import MarketDataPoint
+from tickstore import from_ns, to_ns
+
+_COLUMNS = (("codes", np.int32), ("prices", np.float64), ("timestamps", np.int64))
+
+
+def _tracker_id() -> List[int] | None:
+    """Identity of this process's resource tracker pipe; shared with the parent in fork/spawn children."""
+    if os.name != "posix" or sys.version_info >= (3, 13):
+        return None
+    st = os.fstat(resource_tracker.getfd())
+    return [st.st_dev, st.st_ino]
+
+
+def _open(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)          # registers with this process's tracker
+
+
+def _disown(shm: shared_memory.SharedMemory, owner_tracker: List[int] | None) -> None:
+    """
+    Attach without taking ownership: only the creating process may unlink.
+    A process with its own resource tracker must unregister the segment, or its
+    tracker unlinks it when the process exits; a worker that shares the owner's
+    tracker (fork/spawn children) must not, or it cancels the owner's
+    registration and the segments leak if the owner crashes.
+    """
+    tracker = _tracker_id()
+    if tracker is not None and tracker != owner_tracker:
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+
+def _release(segments: List[shared_memory.SharedMemory], unlink: bool) -> None:
+    for shm in segments:
+        try:
+            shm.close()
+        except BufferError:          # a view is still alive; the mapping goes with the process
+            pass
+        if unlink:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class SharedTicks:
+    """
+    Columnar tick dataset in multiprocessing.shared_memory:
+      codes (int32 index into `symbols`), prices (float64), timestamps (int64 ns UTC)
+    plus a small JSON header segment, all under one base `name`.
+    - SharedTicks.create(ticks) copies the data in once and owns the segments;
+      they are unlinked by close(), when the owner is garbage collected, or at
+      interpreter exit (weakref.finalize). If the owner dies without running
+      those, the multiprocessing resource tracker unlinks them.
+    - SharedTicks.attach(name) maps the same memory read-only, with no copy.
+    """
+    def __init__(self, name: str, symbols: List[str], segments: List[shared_memory.SharedMemory],
+                 n: int, owner: bool):
+        self.name = name
+        self.symbols = symbols
+        self.owner = owner
+        self._segments = segments
+        views = {}
+        for (col, dtype), shm in zip(_COLUMNS, segments[1:]):
+            arr = np.ndarray((n,), dtype=dtype, buffer=shm.buf)
+            arr.flags.writeable = False
+            views[col] = arr
+        self.codes, self.prices, self.timestamps = views["codes"], views["prices"], views["timestamps"]
+        self._finalizer = weakref.finalize(self, _release, segments, owner)
+
+    @classmethod
+    def create(cls, ticks: Iterable[MarketDataPoint], name: str | None = None) -> "SharedTicks":
+        name = name or f"ticks_{uuid.uuid4().hex[:12]}"
+        ids, symbols, codes, prices, stamps = {}, [], [], [], []
+        for t in ticks:
+            code = ids.get(t.symbol)
+            if code is None:
+                code = ids[t.symbol] = len(symbols)
+                symbols.append(t.symbol)
+            codes.append(code); prices.append(float(t.price)); stamps.append(to_ns(t.timestamp))
+        n = len(codes)
+        header = json.dumps({"n": n, "symbols": symbols, "tracker": _tracker_id()}).encode()
+        segments = []
+        try:
+            seg = shared_memory.SharedMemory(name=f"{name}_hdr", create=True, size=len(header))
+            seg.buf[: len(header)] = header
+            segments.append(seg)
+            for (col, dtype), values in zip(_COLUMNS, (codes, prices, stamps)):
+                arr = np.asarray(values, dtype=dtype)
+                seg = shared_memory.SharedMemory(name=f"{name}_{col}", create=True, size=max(arr.nbytes, 1))
+                segments.append(seg)
+                np.ndarray((n,), dtype=dtype, buffer=seg.buf)[...] = arr
+        except BaseException:
+            _release(segments, unlink=True)
+            raise
+        return cls(name, symbols, segments, n, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedTicks":
+        hdr = _open(f"{name}_hdr")
+        meta = json.loads(bytes(hdr.buf).rstrip(b"\x00"))
+        segments = [hdr] + [_open(f"{name}_{col}") for col, _ in _COLUMNS]
+        for shm in segments:
+            _disown(shm, meta.get("tracker"))
+        return cls(name, meta["symbols"], segments, meta["n"], owner=False)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def ticks(self, start: int = 0, stop: int | None = None) -> Iterator[MarketDataPoint]:
+        """Rows [start, stop) as MarketDataPoints, built lazily (feed straight into TradingEngine)."""
+        syms = self.symbols
+        codes, prices, stamps = self.codes, self.prices, self.timestamps
+        for i in range(start, len(codes) if stop is None else stop):
+            yield MarketDataPoint(syms[codes[i]], float(prices[i]), from_ns(stamps[i]))
+
+    def close(self) -> None:
+        """Drop this process's mapping (and unlink the segments if this is the owner)."""
+        self.codes = self.prices = self.timestamps = None
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,29 @@
+# tests/conftest.py
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+import random
+from datetime import datetime, timezone, timedelta
+from models import MarketDataPoint
+
+# shared tick factories: import them with `from tests.conftest import T0, tick, ticks`
+T0 = datetime(2025, 1, 1, 9, 30, tzinfo=timezone.utc)
+
+def tick(symbol, price, sec=0.0, start=T0):
+    return MarketDataPoint(symbol, price, start + timedelta(seconds=sec))
+
+def ticks(n, symbols=("AAPL",), price=float, step=1.0, start=T0):
+    """n ticks `step` seconds apart; symbols round-robin, price(i) for the i-th tick."""
+    return [tick(symbols[i % len(symbols)], price(i), i * step, start) for i in range(n)]
+
+def random_walk(n, seed, start=T0):
+    """One tick per second, AAPL/MSFT picked at random, each a 1% gaussian walk rounded to cents."""
+    rng = random.Random(seed)
+    px = {"AAPL": 100.0, "MSFT": 300.0}
+    out = []
+    for i in range(n):
+        sym = rng.choice(list(px))
+        px[sym] *= 1 + rng.gauss(0, 0.01)
+        out.append(tick(sym, round(px[sym], 2), i, start))
+    return out
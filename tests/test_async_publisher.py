@@ -0,0 +1,72 @@
+import threading
+import time
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from patterns.observer import AsyncSignalPublisher
+
+class Collector:
+    def __init__(self, gate: threading.Event | None = None):
+        self.seen = []
+        self.gate = gate
+    def update(self, signal):
+        if self.gate is not None:
+            self.gate.wait(2.0)
+        self.seen.append(signal["i"])
+
+def sig(i):
+    return {"symbol": "AAPL", "action": "BUY", "size": 1, "price": 1.0, "i": i}
+
+def test_async_delivers_in_order_and_flushes():
+    col = Collector()
+    with AsyncSignalPublisher(capacity=8, batch_size=3) as pub:
+        pub.attach(col)
+        for i in range(50):
+            pub.notify(sig(i))          # block policy: nothing lost
+        assert pub.flush(timeout=2.0)
+        assert col.seen == list(range(50))
+        assert pub.dropped() == 0
+
+def test_drop_newest_and_drop_oldest_count_drops():
+    gate = threading.Event()
+    newest, oldest = Collector(gate), Collector(gate)
+    pub = AsyncSignalPublisher(capacity=2, batch_size=1)
+    pub.attach(newest, policy="drop_newest")
+    pub.attach(oldest, policy="drop_oldest")
+    pub.notify(sig(0))
+    # let the worker pick up signal 0 and park inside the first observer
+    while pub.stats()[0]["pending"]:
+        time.sleep(0.005)
+    for i in range(1, 6):
+        pub.notify(sig(i))
+    gate.set()
+    pub.close()
+
+    assert newest.seen == [0, 1, 2]
+    assert oldest.seen == [0, 4, 5]
+    assert pub.dropped(newest) == 3
+    assert pub.dropped(oldest) == 3
+
+def test_batch_observer_and_closed_publisher():
+    class BatchObs:
+        def __init__(self): self.batches = []
+        def update(self, signal): raise AssertionError("update_batch should be used")
+        def update_batch(self, signals): self.batches.append([s["i"] for s in signals])
+    obs = BatchObs()
+    pub = AsyncSignalPublisher(batch_size=4)
+    pub.attach(obs)
+    for i in range(10):
+        pub.notify(sig(i))
+    pub.close()
+    assert sum(obs.batches, []) == list(range(10))
+    assert all(len(b) <= 4 for b in obs.batches)
+    with pytest.raises(RuntimeError, match="closed"):
+        pub.notify(sig(99))
+
+def test_unknown_policy_rejected():
+    pub = AsyncSignalPublisher()
+    with pytest.raises(ValueError):
+        pub.attach(Collector(), policy="spill")
+    pub.close()
@@ -0,0 +1,48 @@
+import io
+import json
+import sys, os
+import pytest
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from patterns.builder import PortfolioBuilder, iter_json_events
+
+def test_both_subportfolio_spellings():
+    data = {"name": "Main", "positions": [{"symbol": "AAPL", "quantity": 100, "price": 172.35}],
+            "sub_portfolios": [{"name": "A", "positions": [{"symbol": "SPY", "quantity": 20, "price": 430.5}]}],
+            "subportfolios": [{"name": "B", "positions": [{"symbol": "SPY", "quantity": 5}]}]}
+    g = PortfolioBuilder.from_dict(data).build()
+    assert g.get_positions() == {"AAPL": 100.0, "SPY": 25.0}
+
+def test_stream_matches_json_builder(tmp_path):
+    path = "data/portfolio_structure.json"
+    expected = PortfolioBuilder.from_json(path).build()
+    group, table = PortfolioBuilder.stream_json(path, table=True)
+    assert group == expected
+    assert table["symbol"] == ["AAPL", "MSFT", "SPY"]
+    assert table["portfolio"] == ["Main Portfolio", "Main Portfolio", "Index Holdings"]
+    assert PortfolioBuilder.stream_positions_table(path) == table
+
+def test_deep_structure_beyond_recursion_limit(tmp_path):
+    depth = sys.getrecursionlimit() + 500
+    p = tmp_path / "deep.json"
+    # json.dumps itself recurses, so write the nesting by hand
+    head = "".join(f'{{"name": "L{d}", "positions": [{{"symbol": "S", "quantity": 1}}], "sub_portfolios": ['
+                   for d in range(depth))
+    p.write_text(head + '{"name": "leaf", "positions": []}' + "]}" * depth, encoding="utf-8")
+    table = PortfolioBuilder.stream_positions_table(str(p))
+    assert len(table["symbol"]) == depth and table["portfolio"][-1] == f"L{depth - 1}"
+    group = PortfolioBuilder.stream_json(str(p))
+    assert group.name == "L0" and len(group.components) == 2
+
+def test_event_reader_handles_chunk_boundaries():
+    doc = {"name": "Main é \\\"q\\\"", "x": [1, -2.5e3, True, None, {"k": "v"}], "n": 12345678}
+    text = json.dumps(doc)
+    events = list(iter_json_events(io.StringIO(text), chunk_size=3))
+    for size in range(1, 12):
+        assert list(iter_json_events(io.StringIO(text), chunk_size=size)) == events
+    assert ("key", "n") in events and ("value", 12345678) in events
+    assert ("value", -2500.0) in events and ("value", None) in events
+    assert ("value", doc["name"]) in events
+    with pytest.raises(ValueError):
+        list(iter_json_events(io.StringIO('{"a": [1, 2}'), chunk_size=4))
@@ -0,0 +1,100 @@
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from datetime import timedelta
+from tests.conftest import T0, ticks
+from patterns.observer import SignalPublisher
+from patterns.command import Account, CommandInvoker
+from engine import TradingEngine, OrderRouter, BasicRisk
+
+class SimClock:
+    """Wall clock driven by the test: strategies 'spend' time by advancing it."""
+    def __init__(self, now):
+        self.now = now
+    def __call__(self):
+        return self.now
+
+class SlowStrategy:
+    def __init__(self, clock, cost):
+        self.clock, self.cost, self.seen = clock, cost, []
+    def generate_signals(self, tick):
+        self.seen.append((tick.symbol, tick.price))
+        self.clock.now += timedelta(seconds=self.cost)
+        return []
+
+def feed(n, step=0.1, symbols=("A", "B")):
+    return ticks(n, symbols, step=step)
+
+def make(data, strat, clock, **kw):
+    acct = Account()
+    return TradingEngine(data, [strat], SignalPublisher(), OrderRouter(), BasicRisk(acct.positions),
+                         acct, CommandInvoker(), clock=clock, **kw)
+
+def test_backlog_collapses_to_latest_per_symbol_in_order():
+    clock = SimClock(T0)
+    strat = SlowStrategy(clock, cost=1.0)                 # 10x slower than the 0.1s feed
+    eng = make(feed(100), strat, clock, conflate_lag=0.5)
+    eng.run()
+    m = eng.metrics
+    assert m.ticks_in == 100 and m.conflated > 50
+    assert m.ticks_processed == len(strat.seen) == 100 - m.conflated
+    assert m.conflation_rate == pytest.approx(m.conflated / 100)
+    prices = [p for _, p in strat.seen]
+    assert prices == sorted(prices)                        # cross-symbol order preserved
+    assert strat.seen[-2:] == [("A", 98.0), ("B", 99.0)]   # newest tick of each symbol survives
+    assert m.lag_max < 3.0                                 # lag stays bounded instead of growing
+
+def test_fast_engine_never_conflates():
+    clock = SimClock(T0)
+    strat = SlowStrategy(clock, cost=0.01)
+    eng = make(feed(50), strat, clock, conflate_lag=0.5)
+    # clock only moves with processing, so ticks stamped in the future are never behind
+    eng.run()
+    assert eng.metrics.conflated == 0 and len(strat.seen) == 50
+
+def test_without_conflation_every_tick_is_processed_and_counted():
+    clock = SimClock(T0)
+    strat = SlowStrategy(clock, cost=1.0)
+    eng = make(feed(40), strat, clock)
+    eng.run()
+    assert len(strat.seen) == 40
+    assert eng.metrics.snapshot()["ticks_in"] == 40 and eng.metrics.conflated == 0
+
+def test_max_batch_bounds_read_ahead():
+    clock = SimClock(T0 + timedelta(hours=1))             # everything has already arrived
+    strat = SlowStrategy(clock, cost=0.0)
+    eng = make(feed(100, symbols=("A",)), strat, clock, conflate_lag=0.5, conflate_max_batch=10)
+    eng.run()
+    assert [p for _, p in strat.seen] == [9.0, 19.0, 29.0, 39.0, 49.0, 59.0, 69.0, 79.0, 89.0, 99.0]
+    assert eng.metrics.conflations == 10
+
+def test_default_clock_follows_replay_pace_for_historical_data():
+    strat = SlowStrategy(SimClock(T0), cost=0.0)
+    eng = make(feed(2_000, step=1.0), strat, None, conflate_lag=0.5)     # stamped 2025: far behind wall time
+    eng.run()
+    assert eng.metrics.conflated == 0 and len(strat.seen) == 2_000
+
+def test_bars_and_windows_see_every_tick_while_strategies_are_conflated():
+    from pipeline import BarAggregator
+    from windows import PriceWindows
+    from patterns.strategy import MeanReversionStrategy
+    class BarRecorder:
+        bar_interval = 1
+        def __init__(self): self.bars = []
+        def generate_signals(self, bar):
+            self.bars.append((bar.open, bar.high, bar.low, bar.close, bar.volume))
+            return []
+    clock = SimClock(T0)
+    slow, bar_strat = SlowStrategy(clock, cost=1.0), BarRecorder()
+    mr = MeanReversionStrategy(window=5)
+    acct = Account()
+    data = feed(100, symbols=("A",))
+    eng = TradingEngine(data, [slow, bar_strat, mr], SignalPublisher(), OrderRouter(), BasicRisk(acct.positions),
+                        acct, CommandInvoker(), clock=clock, conflate_lag=0.5, windows=PriceWindows())
+    eng.run()
+    assert eng.metrics.conflated > 50
+    want = [(b.open, b.high, b.low, b.close, b.volume) for b in BarAggregator([1])(data)]
+    assert bar_strat.bars == want and sum(b[4] for b in want) == 100
+    assert eng.windows.series["A"].n == 100
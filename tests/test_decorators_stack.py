@@ -84,3 +84,24 @@ def test_numeric_formulas_reproduce_expected_values():
     assert m["volatility"] == expected_vol
     assert m["beta"] == expected_beta
     assert m["max_drawdown"] == expected_dd
+
+
+from analytics import InstrumentDecorator
+
+class LegacySharpeDecorator(InstrumentDecorator):     # written the pre-_decorate way
+    def get_metrics(self) -> dict:
+        metrics = super().get_metrics()
+        metrics["sharpe"] = round(float(metrics["price"]) / 100, 6)
+        return metrics
+
+
+def test_overridden_get_metrics_survives_in_a_stack():
+    base = DummyInstrument("MIX", 45.67)
+    inner = LegacySharpeDecorator(VolatilityDecorator(base))
+    outer = DrawdownDecorator(BetaDecorator(inner))
+    m = outer.get_metrics()
+    assert set(m) == {"symbol", "price", "volatility", "sharpe", "beta", "max_drawdown"}
+    assert m["sharpe"] == 0.4567 and m == DrawdownDecorator(BetaDecorator(VolatilityDecorator(
+        LegacySharpeDecorator(base)))).get_metrics()
+    base.price = 50.0                                 # not memoized across a legacy layer
+    assert outer.get_metrics()["sharpe"] == 0.5
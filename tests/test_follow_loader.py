@@ -0,0 +1,97 @@
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+import threading
+from patterns.singleton import Config
+from dataloader import DataLoader
+
+HEADER = "timestamp,symbol,price\n"
+
+def row(i, sym="AAPL"):
+    return f"2025-01-01T09:30:{i:02d}Z,{sym},{100 + i}\n"
+
+def make_loader(tmp_path):
+    cfg = Config.__new__(Config)       # bypass singleton loader for test
+    cfg._data = {"data_path": str(tmp_path), "cache_path": str(tmp_path / ".cache")}
+    return DataLoader(cfg)
+
+def test_yields_only_new_rows_and_waits_for_partial_lines(tmp_path):
+    path = tmp_path / "ticks.csv"
+    path.write_text(HEADER + row(0) + row(1))
+    loader = make_loader(tmp_path)
+    gen = loader.follow_market_data("ticks.csv", poll_interval=0, max_polls=10)
+    assert [next(gen).price, next(gen).price] == [100.0, 101.0]
+    with open(path, "a") as f:
+        f.write(row(2) + row(3)[:10])                  # second row only half written
+    assert next(gen).price == 102.0
+    with open(path, "a") as f:
+        f.write(row(3)[10:])
+    t = next(gen)
+    assert (t.symbol, t.price, t.timestamp.second) == ("AAPL", 103.0, 3)
+    assert t.timestamp.tzinfo is not None
+
+def test_restart_resumes_from_persisted_offset(tmp_path):
+    path = tmp_path / "ticks.csv"
+    path.write_text(HEADER + "".join(row(i) for i in range(3)))
+    loader = make_loader(tmp_path)
+    assert len(list(loader.follow_market_data("ticks.csv", poll_interval=0, max_polls=1))) == 3
+    with open(path, "a") as f:
+        f.write(row(3) + row(4))
+    again = list(make_loader(tmp_path).follow_market_data("ticks.csv", poll_interval=0, max_polls=2))
+    assert [t.price for t in again] == [103.0, 104.0]
+    assert os.path.exists(tmp_path / ".cache" / "follow_offsets.json")
+
+def test_truncated_file_restarts_without_replaying_old_rows(tmp_path):
+    path = tmp_path / "ticks.csv"
+    path.write_text(HEADER + "".join(row(i) for i in range(5)))
+    loader = make_loader(tmp_path)
+    list(loader.follow_market_data("ticks.csv", poll_interval=0, max_polls=1))
+    path.write_text(HEADER + row(3) + row(4) + row(5))     # rotated: overlaps the old tail
+    got = list(loader.follow_market_data("ticks.csv", poll_interval=0, max_polls=1))
+    assert [t.price for t in got] == [105.0]
+
+def test_stop_event_ends_the_generator(tmp_path):
+    (tmp_path / "ticks.csv").write_text(HEADER + row(0))
+    stop = threading.Event()
+    seen = []
+    for t in make_loader(tmp_path).follow_market_data("ticks.csv", poll_interval=0.01, stop=stop):
+        seen.append(t)
+        stop.set()
+    assert len(seen) == 1
+
+def test_closing_mid_batch_resumes_after_the_last_consumed_row(tmp_path):
+    (tmp_path / "ticks.csv").write_text(HEADER + "".join(row(i) for i in range(5)))
+    gen = make_loader(tmp_path).follow_market_data("ticks.csv", poll_interval=0, max_polls=1)
+    assert [next(gen).price for _ in range(3)] == [100.0, 101.0, 102.0]
+    gen.close()
+    again = list(make_loader(tmp_path).follow_market_data("ticks.csv", poll_interval=0, max_polls=1))
+    assert [t.price for t in again] == [103.0, 104.0]
+
+def test_malformed_rows_are_skipped_and_counted(tmp_path):
+    path = tmp_path / "ticks.csv"
+    path.write_text(HEADER + row(0) + "garbage,row\n" + "2025-01-01T09:30:01Z,AAPL,n/a\n" + row(2))
+    loader = make_loader(tmp_path)
+    got = list(loader.follow_market_data("ticks.csv", poll_interval=0, max_polls=1))
+    assert [t.price for t in got] == [100.0, 102.0]
+    assert loader.follow_state[str(path)]["bad_rows"] == 2
+    with open(path, "a") as f:
+        f.write(row(3))
+    again = list(make_loader(tmp_path).follow_market_data("ticks.csv", poll_interval=0, max_polls=1))
+    assert [t.price for t in again] == [103.0]
+
+def test_rotated_file_grown_past_the_old_offset_is_read_from_the_top(tmp_path):
+    path = tmp_path / "ticks.csv"
+    path.write_text(HEADER + row(0) + row(1))
+    loader = make_loader(tmp_path)
+    list(loader.follow_market_data("ticks.csv", poll_interval=0, max_polls=1))
+    os.replace(tmp_path / "ticks.csv", tmp_path / "ticks.csv.1")
+    path.write_text("symbol,timestamp,price\n" + "".join(f"MSFT,2025-01-01T09:30:{i:02d}Z,{200 + i}\n" for i in range(6)))
+    got = list(loader.follow_market_data("ticks.csv", poll_interval=0, max_polls=1))
+    assert [(t.symbol, t.price) for t in got] == [("MSFT", 202.0), ("MSFT", 203.0), ("MSFT", 204.0), ("MSFT", 205.0)]
+    with open(path, "r+") as f:                     # copytruncate-style rewrite in place, same inode
+        f.truncate(0)
+        f.write(HEADER + "".join(row(i, "IBM") for i in range(4, 12)))
+    got = list(loader.follow_market_data("ticks.csv", poll_interval=0, max_polls=1))
+    assert [(t.symbol, t.price) for t in got] == [("IBM", 106.0 + i) for i in range(6)]
@@ -0,0 +1,61 @@
+import os, sys
+import pytest
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from patterns.singleton import Config
+from patterns.factory import InstrumentFactory
+from dataloader import DataLoader
+from models import Stock, Bond, ETF
+
+CSV = ("symbol,type,price,sector,issuer,maturity\n"
+       "AAPL,Stock,172.35,Technology,Apple Inc.,\n"
+       "US10Y,Bond,100.00,Government,US Treasury,2035-10-01\n"
+       "SPY, etf ,430.50,Index,State Street,\n")
+
+def loader(tmp_path):
+    cfg = Config.__new__(Config)       # bypass singleton loader for test
+    cfg._data = {"data_path": str(tmp_path)}
+    (tmp_path / "instruments.csv").write_text(CSV, encoding="utf-8")
+    return DataLoader(cfg)
+
+def test_create_many_matches_row_factory():
+    frame = {"symbol": ["AAPL", "US10Y", "SPY"], "type": ["Stock", "BOND", "etf"],
+             "price": ["1.5", 2, 3.0], "sector": ["T", "G", "I"], "issuer": ["a", "b", "c"],
+             "maturity": ["", "2030-01-01", ""]}
+    bulk = InstrumentFactory.create_many(frame)
+    rows = [InstrumentFactory.create_instrument({k: v[i] for k, v in frame.items()}) for i in range(3)]
+    assert bulk == rows
+    assert [type(i) for i in bulk] == [Stock, Bond, ETF]
+    with pytest.raises(ValueError):
+        InstrumentFactory.create_many({"symbol": ["X"], "type": ["crypto"], "price": [1]})
+
+def test_pandas_frame_with_missing_cells_matches_rows(monkeypatch):
+    import csv, io
+    pd = pytest.importorskip("pandas")
+    text = CSV + "US2Y,Bond,99.5,,US Treasury,\n"          # empty sector and maturity
+    bulk = InstrumentFactory.create_many(pd.read_csv(io.StringIO(text)))
+    import patterns.factory as factory
+    def no_fields(cls):
+        raise AssertionError("field names are cached per class")
+    monkeypatch.setattr(factory, "fields", no_fields)
+    rows = [InstrumentFactory.create_instrument(r) for r in csv.DictReader(io.StringIO(text))]
+    assert bulk == rows
+    assert (bulk[3].sector, bulk[3].maturity) == ("", "")
+
+def test_registry_is_cached_until_csv_changes(tmp_path, monkeypatch):
+    dl = loader(tmp_path)
+    reg = dl.load_instrument_registry()
+    assert len(reg) == 3 and isinstance(reg["SPY"], ETF) and reg["US10Y"].maturity == "2035-10-01"
+    assert reg["AAPL"].symbol is sys.intern("AAPL")
+
+    def boom(*a, **k): raise AssertionError("should be served from cache")
+    monkeypatch.setattr(DataLoader, "load_instruments_bulk", boom)
+    assert dl.load_instrument_registry().symbols() == ["AAPL", "US10Y", "SPY"]
+    os.utime(tmp_path / "instruments.csv", ns=(1, 1))     # touched, same content
+    assert len(dl.load_instrument_registry()) == 3
+
+    monkeypatch.undo()
+    with open(tmp_path / "instruments.csv", "a", encoding="utf-8") as f:
+        f.write("MSFT,Stock,328.10,Technology,Microsoft Corp.,\n")
+    assert "MSFT" in dl.load_instrument_registry()
@@ -0,0 +1,64 @@
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from tests.conftest import ticks as make_ticks
+from memprofile import MemoryProfiler, MemoryBudgetExceeded
+from patterns.observer import SignalPublisher
+from patterns.command import Account, CommandInvoker
+from engine import TradingEngine, OrderRouter, BasicRisk
+
+def ticks(n):
+    return make_ticks(n, price=lambda i: 100.0 + i % 5)
+
+class LeakyStrategy:
+    def __init__(self):
+        self.history = []
+    def generate_signals(self, tick):
+        self.history.append(bytearray(1024))     # never trimmed
+        return []
+
+class QuietStrategy:
+    def generate_signals(self, tick):
+        return []
+
+def engine(strategies, data, profiler):
+    acct = Account()
+    return TradingEngine(data, strategies, SignalPublisher(), OrderRouter(), BasicRisk(acct.positions),
+                         acct, CommandInvoker(), profiler=profiler)
+
+def test_leaking_stage_fails_its_budget():
+    prof = MemoryProfiler(interval=100, budgets={"strategy": 200_000})
+    with prof, pytest.raises(MemoryBudgetExceeded, match="strategy"):
+        engine([LeakyStrategy()], ticks(1_000), prof).run()
+
+def test_bounded_run_stays_within_budget():
+    prof = MemoryProfiler(interval=100, budgets={"strategy": 50_000, "tick": 50_000})
+    with prof:
+        engine([QuietStrategy()], ticks(1_000), prof).run()
+    assert prof.report()["strategy"]["calls"] == 1_000
+
+def test_report_shows_growth_rate_and_top_site():
+    prof = MemoryProfiler(interval=50)
+    with prof:
+        engine([LeakyStrategy()], ticks(200), prof).run()
+    r = prof.report()["strategy"]
+    assert r["bytes_per_tick"] > 1000
+    assert r["top_sites"] and "test_memprofile.py" in r["top_sites"][0][0]
+    assert "strategy" in prof.format_report()
+
+def test_run_traces_without_an_explicit_start():
+    import tracemalloc
+    assert not tracemalloc.is_tracing()
+    prof = MemoryProfiler(interval=50)
+    engine([LeakyStrategy()], ticks(200), prof).run()
+    assert prof.report()["strategy"]["retained"] > 200 * 1024
+    assert not tracemalloc.is_tracing()
+    with pytest.raises(RuntimeError, match="tracemalloc"):
+        with prof.stage("strategy"):
+            pass
+    with prof:                                  # an outer start outlives the run's own start/stop
+        engine([QuietStrategy()], ticks(10), prof).run()
+        assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,63 @@
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from datetime import datetime, timezone
+from analytics import (VolatilityDecorator, BetaDecorator, DrawdownDecorator,
+                       StreamingAnalytics, batch_metrics)
+from models import Instrument, MarketDataPoint, Stock
+
+class CountingInstrument(Instrument):
+    def __init__(self, symbol: str, price: float):
+        super().__init__(symbol, price)
+        self.calls = 0
+    def get_metrics(self) -> dict:
+        self.calls += 1
+        return {"symbol": self.symbol, "price": float(self.price)}
+
+def stack(inst, analytics=None):
+    return DrawdownDecorator(BetaDecorator(VolatilityDecorator(inst, analytics=analytics)))
+
+def test_stack_builds_once_and_caches_until_price_changes():
+    base = CountingInstrument("AAPL", 12.34)
+    d = stack(base)
+    first = d.get_metrics()
+    assert d.get_metrics() == first and base.calls == 1
+
+    first["volatility"] = -1            # callers get copies
+    assert d.get_metrics()["volatility"] != -1
+
+    base.price = 45.67
+    m = d.get_metrics()
+    assert base.calls == 2 and m["price"] == 45.67
+    assert m == VolatilityDecorator(BetaDecorator(DrawdownDecorator(base))).get_metrics()
+
+def test_cache_invalidates_on_new_ticks_for_the_symbol():
+    an = StreamingAnalytics(window=5)
+    base = CountingInstrument("AAPL", 100.0)
+    d = stack(base, an)
+    t = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for px in (100.0, 101.0, 99.0):
+        an.update(MarketDataPoint("AAPL", px, t))
+    v1 = d.get_metrics()["volatility"]
+    an.update(MarketDataPoint("MSFT", 50.0, t))      # other symbol: still cached
+    d.get_metrics()
+    assert base.calls == 1
+    an.update(MarketDataPoint("AAPL", 90.0, t))
+    assert d.get_metrics()["volatility"] != v1 and base.calls == 2
+
+def test_batch_metrics_matches_decorator_stack():
+    insts = [Stock(f"S{i}", 1.5 + i * 7.37, "Tech", "X") for i in range(50)]
+    an = StreamingAnalytics(window=5)
+    t = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for px in (10.0, 11.0, 10.5):
+        an.update(MarketDataPoint("S3", px, t))
+    cols = batch_metrics(insts, analytics=an)
+    assert list(cols["symbol"][:2]) == ["S0", "S1"]
+    for i, inst in enumerate(insts):
+        m = stack(inst, an).get_metrics()
+        for key in ("price", "volatility", "beta", "max_drawdown"):
+            assert cols[key][i] == pytest.approx(m[key])
+    with pytest.raises(ValueError):
+        batch_metrics(insts, layers=["sharpe"])
@@ -0,0 +1,76 @@
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from reporting import MetricsObserver, QuantileSketch, RollingStats
+
+class FakeClock:
+    def __init__(self): self.now = 0.0
+    def __call__(self): return self.now
+
+def test_sketch_quantiles_within_relative_accuracy():
+    sk = QuantileSketch(accuracy=0.01)
+    for v in range(1, 10_001):
+        sk.add(float(v))
+    p50, p95, p99 = sk.quantiles((0.5, 0.95, 0.99))
+    assert p50 == pytest.approx(5_000, rel=0.02)
+    assert p95 == pytest.approx(9_500, rel=0.02)
+    assert p99 == pytest.approx(9_900, rel=0.02)
+    assert len(sk.bins) < 1_000          # bounded by the value range, not the count
+
+def test_rolling_window_expires_old_buckets():
+    rs = RollingStats(window_seconds=10, buckets=5)
+    for t in range(10):
+        rs.add(float(t), size=1.0, notional=100.0)
+    assert rs.stats(9.0)["count"] == 10
+    rs.add(12.0, size=5.0, notional=1_000.0)   # buckets for t < 4 fall out
+    st = rs.stats(12.0)
+    assert st["count"] == 7 and st["rate"] == pytest.approx(0.7)
+    assert rs.stats(100.0)["count"] == 0 and rs.notional.count == 0
+
+def test_metrics_observer_per_symbol_and_strategy():
+    clock = FakeClock()
+    met = MetricsObserver(window_seconds=60, clock=clock)
+    for i in range(100):
+        clock.now = i * 0.1
+        met.update({"symbol": "AAPL" if i % 2 else "MSFT", "action": "BUY", "size": 10,
+                    "price": 100.0 + i, "strategy": "MeanReversionStrategy"})
+    snap = met.snapshot()
+    assert snap["count"] == 100 and snap["by_action"] == {"BUY": 100}
+    assert set(snap["by_symbol"]) == {"AAPL", "MSFT"}
+    strat = snap["by_strategy"]["MeanReversionStrategy"]
+    assert strat["count"] == 100
+    assert strat["notional"]["p50"] == pytest.approx(1_500, rel=0.03)
+    assert strat["size"]["p99"] == pytest.approx(10, rel=0.02)
+    # cached between updates
+    assert met.snapshot()["by_strategy"]["MeanReversionStrategy"] is strat
+
+def test_collapsed_window_total_stays_equal_to_sum_of_slots():
+    rs = RollingStats(window_seconds=4, buckets=4, max_bins=8)
+    for t in range(40):
+        for j in range(5):
+            rs.add(t + j / 10, size=1.0, notional=float(10 ** ((t * 5 + j) % 7)) * (1 + j))
+        total = {}
+        for sk in rs._notional:
+            for k, c in sk.bins.items():
+                total[k] = total.get(k, 0) + c
+        assert rs.notional.bins == total and all(c > 0 for c in total.values())
+        assert len(rs.notional.bins) <= 8 and rs.notional.count == rs.count == sum(rs._counts)
+    assert rs.notional.floor is not None                 # the cap was actually hit
+    assert rs.stats(100.0)["count"] == 0 and rs.notional.bins == {}
+
+def test_snapshot_recomputes_only_touched_keys():
+    clock = FakeClock()
+    met = MetricsObserver(window_seconds=60, clock=clock)
+    for sym in ("A", "B", "C"):
+        met.update({"symbol": sym, "action": "SELL", "size": 1, "price": 10.0, "strategy": "S"})
+    first = met.snapshot()
+    assert met.snapshot() is first
+    met.update({"symbol": "B", "action": "BUY", "size": 2, "price": 10.0, "strategy": "S"})
+    second = met.snapshot()
+    assert second is not first and second["count"] == 4
+    assert second["by_symbol"]["A"] is first["by_symbol"]["A"]
+    assert second["by_symbol"]["B"]["count"] == 2 and first["by_symbol"]["B"]["count"] == 1
+    clock.now = 61.0                                     # every bucket expired
+    assert met.snapshot()["by_symbol"]["A"]["count"] == 0
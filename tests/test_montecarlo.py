@@ -0,0 +1,43 @@
+import math
+import numpy as np
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from statistics import NormalDist
+from models import PortfolioGroup, Position
+from montecarlo import MonteCarloVaR
+
+COV = np.array([[0.0004, 0.0002], [0.0002, 0.0009]])
+
+def model(chunk_size=5_000):
+    root = PortfolioGroup("Main")
+    root.add(Position("AAPL", 100, 170.0)); root.add(Position("MSFT", 50, 330.0))
+    return MonteCarloVaR.from_positions(root, COV, ["AAPL", "MSFT"], chunk_size=chunk_size)
+
+def test_results_independent_of_worker_count():
+    mc = model()
+    a = mc.simulate(23_000, seed=42, workers=1)
+    b = mc.simulate(23_000, seed=42, workers=2)
+    assert len(a) == 23_000 and np.array_equal(a, b)
+    assert not np.array_equal(a, mc.simulate(23_000, seed=43, workers=1))
+
+def test_var_and_es_close_to_parametric():
+    mc = model(chunk_size=50_000)
+    res = mc.run(200_000, seed=1, workers=1, confidence=0.99)
+    w = mc.exposures
+    sigma = math.sqrt(w @ COV @ w)
+    assert res["var"] == pytest.approx(NormalDist().inv_cdf(0.99) * sigma, rel=0.03)
+    assert res["es"] > res["var"] and res["scenarios"] == 200_000
+
+def test_stress_and_validation():
+    mc = model()
+    assert mc.stress({"AAPL": -0.1}) == pytest.approx(-0.1 * 100 * 170.0)
+    with pytest.raises(ValueError):
+        MonteCarloVaR(["A"], np.array([1.0, 2.0]), np.eye(1))
+    with pytest.raises(ValueError, match="chunk_size"):
+        MonteCarloVaR(["A"], np.array([1.0]), np.eye(1), chunk_size=0)
+    with pytest.raises(ValueError, match="n_scenarios"):
+        mc.run(0, workers=1)
+    assert mc.run(10, workers=1)["scenarios"] == 10            # one chunk smaller than chunk_size
@@ -0,0 +1,108 @@
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from tests.conftest import tick
+from orderbook import OrderBook, FillModel, FillSimulator
+from patterns.observer import SignalPublisher
+from patterns.command import Account, CommandInvoker
+from engine import TradingEngine, OrderRouter, BasicRisk
+from benchmarks.orderbook import make_events, run
+
+def test_price_time_priority_partial_fills_and_lazy_cancel():
+    book = OrderBook("AAPL")
+    a, _ = book.submit("SELL", 10, 101.0)
+    b, _ = book.submit("SELL", 10, 100.0)
+    c, _ = book.submit("SELL", 10, 100.0)
+    assert book.cancel(b.id) and not book.cancel(b.id)
+    order, fills = book.submit("BUY", 15, 101.0)
+    assert [(r.id, q, px) for r, q, px in fills] == [(c.id, 10, 100.0), (a.id, 5, 101.0)]
+    assert not order.active and a.remaining == 5
+    assert book.best_ask() == 101.0 and book.best_bid() is None
+    m, fills = book.submit("BUY", 50)                  # market: takes what is there, rest cancelled
+    assert [q for _, q, _ in fills] == [5] and m.remaining == 45 and not m.active
+    assert len(book) == 0
+
+def test_simulator_walks_the_ladder_and_undo_reverts_account():
+    acct = Account(cash=10_000)
+    sim = FillSimulator(acct, FillModel(half_spread_bps=10, level_bps=10, levels=3, depth=5))
+    sim.on_tick(tick("AAPL", 100.0))
+    cmd = sim.command(acct, {"symbol": "AAPL", "action": "BUY", "size": 12, "price": 100.0})
+    res = CommandInvoker().execute_cmd(cmd)
+    assert res["status"] == "executed" and res["quantity"] == 12 and res["fills"] == 3
+    assert res["price"] == pytest.approx((5 * 100.1 + 5 * 100.2 + 2 * 100.3) / 12)
+    assert acct.positions["AAPL"] == 12
+    cmd.undo()
+    assert acct.positions.get("AAPL", 0.0) == 0 and acct.cash == pytest.approx(10_000)
+
+def test_latency_and_resting_limit_fill_on_later_ticks():
+    acct, late = Account(cash=10_000), []
+    sim = FillSimulator(acct, FillModel(half_spread_bps=1, levels=1, depth=100, latency=1.0),
+                        on_fill=late.append)
+    sim.on_tick(tick("AAPL", 100.0, 0))
+    mkt = sim.command(acct, {"symbol": "AAPL", "action": "BUY", "size": 10, "price": 100.0})
+    assert mkt.execute()["status"] == "pending"
+    sim.on_tick(tick("AAPL", 101.0, 2))                 # arrives after the market moved
+    assert [(r["quantity"], r["price"]) for r in late] == [(10, pytest.approx(101.0 * 1.0001))]
+
+    lim = sim.command(acct, {"symbol": "AAPL", "action": "SELL", "size": 10, "price": 102.0, "order_type": "limit"})
+    lim.execute()
+    sim.on_tick(tick("AAPL", 101.5, 4))
+    assert lim.status == "resting"
+    with pytest.raises(ValueError):
+        FillModel(half_spread_bps=0)
+    sim.on_tick(tick("AAPL", 103.0, 5))                 # quote moves through the resting limit
+    assert (late[-1]["action"], late[-1]["price"]) == ("SELL", 102.0)
+    assert acct.positions.get("AAPL", 0.0) == 0
+
+def test_engine_command_factory_routes_through_simulator():
+    acct = Account(cash=100_000)
+    sim = FillSimulator(acct, FillModel(half_spread_bps=5, depth=1_000))
+    class Once:
+        def generate_signals(self, t):
+            return [{"symbol": t.symbol, "action": "BUY", "size": 10, "price": t.price}] if t.price == 101.0 else []
+    fills = []
+    eng = TradingEngine([tick("AAPL", 100.0, 0), tick("AAPL", 101.0, 1)], [Once()], SignalPublisher(), OrderRouter(),
+                        BasicRisk(acct.positions), acct, CommandInvoker(), on_fill=fills.append)
+    sim.connect(eng)
+    eng.run()
+    assert fills[0]["price"] == pytest.approx(101.0 * 1.0005)
+    assert acct.positions["AAPL"] == 10
+
+def test_deferred_fills_reach_engine_pnl_and_on_fill():
+    from pnl import MarkToMarket
+    acct, seen = Account(cash=100_000), []
+    sim = FillSimulator(acct, FillModel(half_spread_bps=1, levels=1, depth=100, latency=1.0))
+    class Once:
+        def generate_signals(self, t):
+            return [{"symbol": "AAPL", "action": "BUY", "size": 10, "price": t.price}] if t.price == 100.0 else []
+    pnl = MarkToMarket(cash=100_000)
+    eng = TradingEngine([tick("AAPL", 100.0, 0), tick("AAPL", 101.0, 2), tick("AAPL", 105.0, 3)], [Once()],
+                        SignalPublisher(), OrderRouter(), BasicRisk(acct.positions), acct, CommandInvoker(),
+                        on_fill=seen.append, pnl=pnl, on_tick=lambda t: seen.append(t.price))
+    sim.connect(eng)
+    eng.run()
+    assert [s if isinstance(s, float) else s["status"] for s in seen] == [100.0, "executed", 101.0, 105.0]
+    assert pnl.books["AAPL"].quantity == 10 == acct.positions["AAPL"]
+    assert pnl.unrealized == pytest.approx(10 * (105.0 - 101.0 * 1.0001))
+
+def test_benchmark_replay_keeps_book_consistent():
+    book = OrderBook("BENCH")
+    secs, fills = run(make_events(20_000, seed=1), book)
+    assert fills > 0
+    bid, ask = book.best_bid(), book.best_ask()
+    assert bid is None or ask is None or bid < ask
+
+def test_order_never_crosses_its_own_accounts_resting_order():
+    acct, other = Account(cash=100_000), Account(cash=100_000)
+    sim = FillSimulator(acct, FillModel(half_spread_bps=1, levels=1, depth=10))
+    sim.on_tick(tick("AAPL", 100.0, 0))
+    ask = sim.command(acct, {"symbol": "AAPL", "action": "SELL", "size": 5, "price": 100.5, "order_type": "limit"})
+    ask.execute()
+    buy = sim.command(acct, {"symbol": "AAPL", "action": "BUY", "size": 20, "price": 0.0})
+    res = buy.execute()
+    assert (res["quantity"], res["remaining"], buy.status) == (10, 10, "cancelled")
+    assert ask.status == "resting" and ask.filled == 0 and acct.positions["AAPL"] == 10
+    res = sim.command(other, {"symbol": "AAPL", "action": "BUY", "size": 5, "price": 0.0}).execute()
+    assert (res["quantity"], res["price"]) == (5, 100.5) and ask.filled == 5
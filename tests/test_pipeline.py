@@ -0,0 +1,112 @@
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+import random
+from datetime import datetime, timedelta
+from models import MarketDataPoint
+from tests.conftest import T0, tick
+from pipeline import ReorderBuffer
+
+def test_reorders_within_window_and_dedups():
+    rb = ReorderBuffer(lateness=2.0)
+    stream = [tick("A", 1, 0), tick("B", 2, 2), tick("A", 3, 1), tick("B", 2, 2),   # dup from 2nd source
+              tick("A", 4, 5), tick("B", 5, 4), tick("A", 6, 9)]
+    out = list(rb(stream))
+    assert [t.timestamp for t in out] == sorted(t.timestamp for t in out)
+    assert [t.price for t in out] == [1, 3, 2, 5, 4, 6]
+    assert rb.stats() == {"received": 7, "emitted": 6, "pending": 0, "late_dropped": 0, "duplicates": 1}
+
+def test_late_ticks_are_dropped_and_counted():
+    rb = ReorderBuffer(lateness=1.0)
+    assert rb.push(tick("A", 1, 0)) == []
+    assert [t.price for t in rb.push(tick("A", 2, 5))] == [1]
+    assert rb.push(tick("A", 9, -1)) == []           # older than what was already emitted
+    assert rb.late_dropped == 1
+    assert [t.price for t in rb.flush()] == [2]
+
+def test_memory_bounded_by_window_and_dedup_capacity():
+    rb = ReorderBuffer(lateness=5.0, dedup_capacity=100)
+    rng = random.Random(7)
+    peak = 0
+    out = []
+    for i in range(5_000):
+        out += rb.push(tick("A", float(i), i + rng.uniform(-3, 3)))
+        peak = max(peak, rb.pending)
+    out += rb.flush()
+    assert peak <= 20
+    assert len(rb._keys) == 100
+    assert len(out) == 5_000 and rb.late_dropped == 0
+    assert all(a.timestamp <= b.timestamp for a, b in zip(out, out[1:]))
+
+def test_max_pending_forces_release_and_negative_lateness_rejected():
+    rb = ReorderBuffer(lateness=3600.0, max_pending=2)
+    released = [t for i in range(5) for t in rb.push(tick("A", float(i), i))]
+    assert [t.price for t in released] == [0.0, 1.0, 2.0]
+    assert rb.pending == 2
+    with pytest.raises(ValueError):
+        ReorderBuffer(lateness=-1)
+
+from pipeline import BarAggregator
+from patterns.strategy import MeanReversionStrategy, BreakoutStrategy
+from patterns.observer import SignalPublisher
+from patterns.command import Account, CommandInvoker
+from engine import TradingEngine, OrderRouter, BasicRisk
+from windows import PriceWindows
+
+def test_bar_aggregator_ohlcv_for_several_intervals():
+    agg = BarAggregator(intervals=(1, 5))
+    prices = [10, 12, 9, 11, 13, 8, 14, 7]               # one tick every 0.5s
+    closed = []
+    for i, p in enumerate(prices):
+        closed += agg.update(tick("A", float(p), i * 0.5))
+    closed += agg.flush()
+    one = [(b.open, b.high, b.low, b.close, b.volume) for b in closed if b.interval == 1]
+    assert one == [(10, 12, 10, 12, 2), (9, 11, 9, 11, 2), (13, 13, 8, 8, 2), (14, 14, 7, 7, 2)]
+    five = [b for b in closed if b.interval == 5]
+    assert [(b.open, b.high, b.low, b.close, b.volume) for b in five] == [(10, 14, 7, 7, 8)]
+    assert five[0].price == 7 and five[0].timestamp == T0 + timedelta(seconds=5)
+    with pytest.raises(ValueError):
+        BarAggregator(intervals=())
+
+def test_bars_close_when_the_watermark_passes_them():
+    agg = BarAggregator(intervals=(1,))
+    assert agg.update(tick("RARE", 5.0, 0.2)) == []
+    assert agg.update(tick("A", 1.0, 0.5)) == []
+    closed = agg.update(tick("A", 2.0, 1.5))             # RARE never ticks again, its bar still closes
+    assert [(b.symbol, b.timestamp) for b in closed] == [("RARE", T0 + timedelta(seconds=1)),
+                                                         ("A", T0 + timedelta(seconds=1))]
+    assert agg.update(tick("RARE", 6.0, 0.9)) == [] and agg.late_ticks == 1
+    naive = BarAggregator(intervals=(60,))
+    naive.update(MarketDataPoint("A", 1.0, datetime(2025, 1, 1, 9, 30, 30)))
+    bar, = naive.flush()
+    assert bar.start == datetime(2025, 1, 1, 9, 30) and bar.start.tzinfo is None
+
+def test_engine_routes_closed_bars_to_bar_strategies():
+    calls = {"tick": 0, "bar": []}
+    class TickCounter:
+        def generate_signals(self, t):
+            calls["tick"] += 1
+            return []
+    class BarRecorder:
+        bar_interval = 60
+        def generate_signals(self, b):
+            calls["bar"].append((b.symbol, b.volume, b.price))
+            return []
+    data = [tick("A", 100.0 + i, i) for i in range(180)]     # T0 is on the minute: three full bars
+    acct = Account()
+    TradingEngine(data, [TickCounter(), BarRecorder()], SignalPublisher(), OrderRouter(),
+                  BasicRisk(acct.positions), acct, CommandInvoker()).run()
+    assert calls["tick"] == 180
+    assert calls["bar"] == [("A", 60, 159.0), ("A", 60, 219.0), ("A", 60, 279.0)]
+
+def test_bar_driven_strategies_keep_their_own_windows():
+    strat = BreakoutStrategy(window=3, size=1.0, bar_interval=60)
+    mr = MeanReversionStrategy(window=4, bar_interval=60)
+    acct = Account()
+    eng = TradingEngine([tick("A", 100.0 + (i // 60), i) for i in range(600)], [strat, mr], SignalPublisher(),
+                        OrderRouter(), BasicRisk(acct.positions), acct, CommandInvoker(), windows=PriceWindows())
+    eng.run()
+    assert strat._windows is None and not eng.windows.requests
+    assert acct.positions["A"] > 0                     # rising bar closes break out upward
@@ -0,0 +1,54 @@
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from tests.conftest import tick
+from pnl import MarkToMarket, EquityCurve
+from patterns.observer import SignalPublisher
+from patterns.strategy import MeanReversionStrategy
+from patterns.command import Account, CommandInvoker
+from engine import TradingEngine, OrderRouter, BasicRisk
+
+def test_average_cost_realized_and_unrealized():
+    m = MarkToMarket(cash=1_000.0)
+    m.apply("AAPL", 10, 100.0)
+    m.apply("AAPL", 10, 110.0)               # avg 105
+    m.on_tick(tick("AAPL", 120.0))
+    assert m.unrealized == pytest.approx(20 * 15)
+    m.apply("AAPL", -15, 120.0)              # realize 15 * 15
+    assert m.realized == pytest.approx(225.0)
+    assert m.books["AAPL"].avg_price == pytest.approx(105.0)
+    m.apply("AAPL", -10, 100.0)              # close 5 (+-25), flip to short 5 @ 100
+    assert m.realized == pytest.approx(225.0 - 25.0)
+    assert m.books["AAPL"].quantity == -5 and m.books["AAPL"].avg_price == 100.0
+    m.on_tick(tick("AAPL", 90.0))
+    assert m.unrealized == pytest.approx(50.0)
+    assert m.equity == pytest.approx(1_000.0 + 200.0 + 50.0)
+
+def test_ticks_for_other_symbols_do_not_move_pnl():
+    m = MarkToMarket()
+    m.apply("AAPL", 1, 10.0)
+    for i in range(1000):
+        m.on_tick(tick(f"S{i}", 1.0 + i))
+    assert m.unrealized == 0.0 and len(m.snapshot()["positions"]) == 1
+
+def test_equity_curve_is_bounded_and_downsampled():
+    c = EquityCurve(capacity=8)
+    for i in range(1000):
+        c.append(i, float(i))
+    assert len(c) <= 8 and c.points[0] == (0, 0.0)
+    ts = [t for t, _ in c.points]
+    assert len({b - a for a, b in zip(ts, ts[1:])}) == 1     # evenly spaced
+
+def test_engine_feeds_mark_to_market():
+    ticks = [tick("AAPL", 100.0, 0), tick("AAPL", 95.0, 1), tick("AAPL", 97.0, 2)]
+    acct = Account(100_000)
+    m = MarkToMarket(cash=100_000)
+    TradingEngine(data=ticks, strategies=[MeanReversionStrategy(window=2, threshold=0.02, size=10)],
+                  publisher=SignalPublisher(), router=OrderRouter(),
+                  risk=BasicRisk(positions=acct.positions), account=acct,
+                  invoker=CommandInvoker(), pnl=m).run()
+    assert m.books["AAPL"].quantity == acct.positions["AAPL"]
+    assert m.equity == pytest.approx(acct.equity({"AAPL": 97.0}))
+    assert len(m.curve) == 3
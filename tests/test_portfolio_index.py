@@ -0,0 +1,97 @@
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from models import PortfolioComponent, PortfolioGroup, Position
+
+class CountingPosition(Position):
+    calls = 0
+    def get_value(self):
+        CountingPosition.calls += 1
+        return super().get_value()
+
+def tree():
+    root = PortfolioGroup("Main")
+    tech = PortfolioGroup("Tech")
+    idx = PortfolioGroup("Index")
+    root.add(CountingPosition("AAPL", 100, 170.0))
+    root.add(tech); root.add(idx)
+    tech.add(CountingPosition("AAPL", 50, 170.0)); tech.add(CountingPosition("MSFT", 10, 330.0))
+    for i in range(100):
+        idx.add(CountingPosition(f"S{i}", 1, 10.0))
+    return root, tech, idx
+
+def test_index_tracks_leaves_and_paths():
+    root, tech, idx = tree()
+    assert len(root.leaves("AAPL")) == 2 and len(tech.leaves("AAPL")) == 1
+    paths = {tuple(g.name for g in path) for _, path in root.locate("AAPL")}
+    assert paths == {("Main",), ("Main", "Tech")}
+    assert root.get_positions()["AAPL"] == 150.0
+
+def test_reprice_touches_only_affected_leaves_and_ancestors():
+    root, tech, idx = tree()
+    assert root.get_value() == pytest.approx(150 * 170 + 3300 + 1000)
+    CountingPosition.calls = 0
+    assert root.reprice({"AAPL": 200.0, "NOPE": 1.0}) == 2
+    assert root.get_value() == pytest.approx(150 * 200 + 3300 + 1000)
+    # Index subtree (100 leaves) stayed cached: only root + Tech leaves recomputed
+    assert CountingPosition.calls == 3
+    tech.leaves("MSFT")[0].quantity = 20
+    assert root.get_value() == pytest.approx(150 * 200 + 6600 + 1000)
+
+def test_remove_and_symbol_change_update_index():
+    root, tech, idx = tree()
+    root.remove(tech)
+    assert len(root.leaves("AAPL")) == 1 and "MSFT" not in root.get_positions()
+    assert root.get_value() == pytest.approx(100 * 170 + 1000)
+    leaf = idx.leaves("S0")[0]
+    leaf.symbol = "SPY"
+    assert root.leaves("SPY") == [leaf] and root.leaves("S0") == []
+    other = PortfolioGroup("Other")
+    other.add(leaf)                                   # shared leaf: both groups track it
+    leaf.price = 20.0
+    assert other.get_value() == 20.0 and root.get_value() == pytest.approx(100 * 170 + 1010)
+    # constructor components are indexed too
+    g = PortfolioGroup("G", [Position("X", 2, 5.0)])
+    assert g.get_positions() == {"X": 2.0} and g.get_value() == 10.0
+
+class Cash(PortfolioComponent):
+    """A component the index knows nothing about."""
+    def __init__(self, amount):
+        self.amount = amount
+    def get_value(self):
+        return self.amount
+    def get_positions(self):
+        return {"USD": self.amount}
+
+def test_shared_and_unknown_components_keep_composite_semantics():
+    root, tech, idx = tree()
+    cash = Cash(500.0)
+    tech.add(cash)
+    root.add(tech)                                    # Tech now reachable along two paths
+    assert root.get_positions()["AAPL"] == 200.0 and root.get_positions()["USD"] == 1000.0
+    assert root.get_value() == pytest.approx(100 * 170 + 2 * (50 * 170 + 3300 + 500) + 1000)
+    cash.amount = 0.0                                 # no notification: still picked up
+    tech.leaves("MSFT")[0].price = 0.0
+    assert root.get_value() == pytest.approx(100 * 170 + 2 * 50 * 170 + 1000)
+    assert sorted(len(p) for _, p in root.locate("MSFT")) == [2, 2]
+    root.remove(tech)
+    assert root.get_positions()["USD"] == 0.0 and root.get_positions()["AAPL"] == 150.0
+
+def test_deep_tree_builds_and_values_without_recursion():
+    from patterns.builder import PortfolioBuilder
+    depth = 5_000
+    data = node = {"name": "L0", "positions": [{"symbol": "AAPL", "quantity": 1, "price": 2.0}]}
+    for i in range(1, depth):
+        child = {"name": f"L{i}", "positions": [{"symbol": f"S{i % 7}", "quantity": 1, "price": 2.0}]}
+        node["subportfolios"] = [child]
+        node = child
+    node["positions"][0]["symbol"] = "ZZZ"
+    root = PortfolioBuilder.from_dict(data).build()
+    assert root.get_value() == pytest.approx(2.0 * depth)
+    assert sum(root.get_positions().values()) == depth
+    deepest, = root.leaves("ZZZ")
+    deepest.price = 3.0
+    assert root.get_value() == pytest.approx(2.0 * depth + 1.0)
+    assert [len(path) for _, path in root.locate("ZZZ")] == [depth]
@@ -0,0 +1,56 @@
+import math
+import numpy as np
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from statistics import NormalDist
+from models import PortfolioGroup, Position
+from tests.conftest import tick
+from risk import ReturnsWindow, PortfolioRisk
+
+def make_window(n=60, window=40):
+    rng = np.random.default_rng(7)
+    rw = ReturnsWindow(window=window, interval=60)
+    px = {"AAPL": 100.0, "MSFT": 200.0, "SPY": 400.0}
+    for i in range(n):
+        common = rng.normal(0, 0.01)
+        for sym in px:
+            px[sym] *= math.exp(common + rng.normal(0, 0.005))
+            rw.update(tick(sym, px[sym], 60 * i))
+    return rw
+
+def test_incremental_covariance_matches_numpy():
+    rw = make_window()
+    rows = np.roll(rw._rows, -rw._head, axis=0)[:, :3]
+    assert rw.count == 40
+    assert np.allclose(rw.covariance(), np.cov(rows, rowvar=False))
+
+def test_parametric_and_component_var_for_a_subtree():
+    rw = make_window()
+    risk = PortfolioRisk(rw, confidence=0.99)
+    book = PortfolioGroup("Tech")
+    book.add(Position("AAPL", 100, 0.0)); book.add(Position("MSFT", -20, 0.0))
+    root = PortfolioGroup("Main"); root.add(book); root.add(Position("SPY", 10, 0.0))
+
+    w = np.array([100 * rw.last_price("AAPL"), -20 * rw.last_price("MSFT"), 0.0])
+    expected = NormalDist().inv_cdf(0.99) * math.sqrt(w @ rw.covariance() @ w)
+    assert risk.var(book) == pytest.approx(expected)
+    comp = risk.component_var(book)
+    assert set(comp) == {"AAPL", "MSFT"}
+    assert sum(comp.values()) == pytest.approx(expected)
+    assert risk.var(root) > 0
+
+def test_single_position_change_updates_incrementally():
+    rw = make_window()
+    risk = PortfolioRisk(rw)
+    node = PortfolioGroup("B"); node.add(Position("AAPL", 50, 0.0))
+    br = risk.book(node)
+    br.set_position("SPY", 5)
+    node.add(Position("SPY", 5, 0.0))
+    assert br.var() == pytest.approx(risk.var(node))
+    # a brand-new symbol with leaf price only
+    br.set_position("NEW", 1, price=10.0)
+    node.add(Position("NEW", 1, 10.0))
+    assert br.var() == pytest.approx(risk.var(node))
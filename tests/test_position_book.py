@@ -0,0 +1,67 @@
+import pytest
+import numpy as np
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from models import PositionBook
+from patterns.command import Account, ExecuteOrderCommand
+from engine import BasicRisk
+
+def test_book_interns_symbols_and_grows():
+    book = PositionBook(capacity=2)
+    for i in range(10):
+        book.apply(f"S{i}", 1.0, 10.0)
+    assert len(book) == 10
+    assert book.ids["S7"] == 7 and book.symbols[7] == "S7"
+    assert book.qty[:10].sum() == pytest.approx(10.0)
+
+def test_vectorized_mark_to_market_and_pnl():
+    acct = Account(10_000.0)
+    ExecuteOrderCommand(acct, "AAPL", "BUY", 10, 100.0).execute()
+    ExecuteOrderCommand(acct, "MSFT", "SELL", 5, 200.0).execute()
+    prices = {"AAPL": 110.0, "MSFT": 190.0}
+
+    assert acct.market_value(prices) == pytest.approx(10 * 110.0 - 5 * 190.0)
+    assert acct.book.gross_exposure(prices) == pytest.approx(10 * 110.0 + 5 * 190.0)
+    assert acct.book.total_pnl(prices) == pytest.approx(100.0 + 50.0)
+    assert acct.equity(prices) == pytest.approx(10_000.0 + 150.0)
+    # aligned arrays are accepted as-is
+    vec = acct.book.price_vector(prices)
+    assert np.allclose(acct.book.net_pnl(vec), [100.0, 50.0])
+    # a partial close keeps its realized gain in the net figure
+    ExecuteOrderCommand(acct, "AAPL", "SELL", 5, 120.0).execute()
+    assert acct.book.net_pnl(acct.book.price_vector(prices))[0] == pytest.approx(100.0 + 5 * 10.0)
+
+def test_undo_is_the_exact_inverse_of_apply():
+    acct = Account(10_000.0)
+    buy = ExecuteOrderCommand(acct, "AAPL", "BUY", 10, 100.0); buy.execute()
+    ExecuteOrderCommand(acct, "AAPL", "SELL", 10, 120.0).execute()       # round trip: +200 realized
+    again = ExecuteOrderCommand(acct, "AAPL", "BUY", 10, 110.0); again.execute()
+    sell = ExecuteOrderCommand(acct, "AAPL", "SELL", 4, 130.0); sell.execute()
+    before = (acct.book.qty.copy(), acct.book.cost.copy())
+    extra = ExecuteOrderCommand(acct, "AAPL", "SELL", 6, 90.0); extra.execute()
+    extra.undo()
+    assert np.array_equal(acct.book.qty, before[0]) and np.array_equal(acct.book.cost, before[1])
+    sell.undo()
+    assert acct.positions["AAPL"] == 10
+    assert acct.book.total_pnl({"AAPL": 110.0}) == pytest.approx(200.0)
+    again.undo()                                                         # flat again: realized PnL survives
+    assert "AAPL" not in acct.positions and acct.book.qty[0] == 0.0
+    assert acct.book.total_pnl({"AAPL": 110.0}) == pytest.approx(200.0)
+
+def test_positions_view_behaves_like_dict():
+    acct = Account()
+    acct.apply_trade("SPY", 3.0, 400.0)
+    assert dict(acct.positions) == {"SPY": 3.0}
+    assert acct.positions == {"SPY": 3.0}
+    assert "QQQ" not in acct.positions and acct.positions.get("QQQ", 0.0) == 0.0
+    acct.revert_trade("SPY", 3.0, 400.0)
+    assert len(acct.positions) == 0 and "SPY" not in acct.positions
+
+def test_basic_risk_reads_positions_view():
+    acct = Account()
+    risk = BasicRisk(positions=acct.positions, max_pos=10, max_order=10)
+    acct.apply_trade("AAPL", 8.0, 1.0)
+    assert risk.approve({"symbol": "AAPL", "action": "BUY", "size": 5}) is None
+    assert risk.approve({"symbol": "AAPL", "action": "SELL", "size": 5}) is not None
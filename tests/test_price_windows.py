@@ -0,0 +1,82 @@
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from models import MarketDataPoint
+from tests.conftest import T0, random_walk
+from windows import PriceWindows
+from patterns.strategy import MeanReversionStrategy, BreakoutStrategy
+from patterns.observer import SignalPublisher
+from patterns.command import Account, CommandInvoker
+from engine import TradingEngine, OrderRouter, BasicRisk
+
+def stream(n=2_000, seed=3):
+    return random_walk(n, seed)
+
+def make_strategies():
+    return [MeanReversionStrategy(window=w, threshold=0.01) for w in (8, 20)] + \
+           [BreakoutStrategy(window=w) for w in (5, 20)]
+
+def test_views_match_plain_windows():
+    pw = PriceWindows()
+    pw.register(5); pw.register(5, lag=1)
+    prices = [3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0]
+    for i, p in enumerate(prices):
+        pw.update(MarketDataPoint("X", p, T0))
+        cur, prev = pw.view("X", 5), pw.view("X", 5, lag=1)
+        assert cur.values() == prices[max(0, i - 4): i + 1]
+        assert (cur.sum, cur.max, cur.min) == (sum(cur.values()), max(cur.values()), min(cur.values()))
+        assert prev.values() == prices[max(0, i - 5): i]
+    assert len(pw.series["X"].prices) == 7            # one buffer sized to the largest need
+    assert pw.view("Y", 5) is None
+
+def test_bound_strategies_emit_same_signals_as_standalone():
+    data = stream()
+    standalone = make_strategies()
+    want = [[s.generate_signals(t) for s in standalone] for t in data]
+
+    bound = make_strategies()
+    pw = PriceWindows()
+    for s in bound:
+        s.bind_windows(pw)
+    got = []
+    for t in data:
+        pw.update(t)
+        got.append([s.generate_signals(t) for s in bound])
+    assert got == want
+    assert all(not s._prices for s in bound)          # no per-strategy copies
+
+def test_engine_binds_windows_only_while_running():
+    acct = Account()
+    strats = make_strategies()
+    seen = []
+    eng = TradingEngine(stream(300), strats, SignalPublisher(), OrderRouter(), BasicRisk(acct.positions),
+                        acct, CommandInvoker(), windows=PriceWindows(),
+                        on_tick=lambda t: seen.append(all(s._windows is eng.windows for s in strats)))
+    assert all(s._windows is None for s in strats)     # constructing the engine does not touch them
+    eng.run()
+    assert seen and all(seen)
+    assert sorted(eng.windows.requests) == [(5, 1), (8, 0), (20, 0), (20, 1)]
+    assert eng.windows.series["AAPL"].n > 0
+    assert all(s._windows is None for s in strats)     # unbound again after the run
+    plain = TradingEngine(stream(10), strats, SignalPublisher(), OrderRouter(), BasicRisk(acct.positions),
+                          acct, CommandInvoker())
+    assert plain.windows is None                        # sharing is opt-in
+
+def test_bound_strategy_falls_back_to_own_window_for_unseen_symbols():
+    pw = PriceWindows()
+    strat = BreakoutStrategy(window=2)
+    strat.bind_windows(pw)
+    pw.update(MarketDataPoint("AAPL", 1.0, T0))
+    sigs = [strat.generate_signals(MarketDataPoint("IBM", p, T0)) for p in (1.0, 2.0, 3.0)]
+    assert sigs[:2] == [[], []] and sigs[2][0]["action"] == "BUY"
+    assert list(strat._prices["IBM"]) == [2.0, 3.0]
+
+def test_register_after_data_is_rejected():
+    pw = PriceWindows()
+    pw.register(3)
+    pw.update(MarketDataPoint("X", 1.0, T0))
+    assert pw.register(3) == (3, 0)
+    with pytest.raises(RuntimeError):
+        pw.register(4)
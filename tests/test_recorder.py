@@ -0,0 +1,89 @@
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from datetime import timedelta
+from tests.conftest import T0, random_walk
+from recorder import SignalRecorder, SignalRecording, StaleRecordingError, fingerprint
+from patterns.strategy import MeanReversionStrategy, BreakoutStrategy
+from patterns.observer import SignalPublisher
+from patterns.command import Account, CommandInvoker
+from engine import TradingEngine, OrderRouter, BasicRisk
+
+def stream(n=1_500, seed=5):
+    return random_walk(n, seed)
+
+def strategies():
+    return [MeanReversionStrategy(window=10, threshold=0.01), BreakoutStrategy(window=15)]
+
+def make_engine(data, strats, fills, recorder=None):
+    acct = Account(cash=100_000)
+    eng = TradingEngine(data, strats, SignalPublisher(), OrderRouter(),
+                        BasicRisk(acct.positions, max_pos=100, max_order=50), acct, CommandInvoker(),
+                        on_fill=fills.append, recorder=recorder)
+    return eng, acct
+
+def test_replay_reproduces_fills_without_strategies(tmp_path):
+    path = str(tmp_path / "signals.bin")
+    fp = fingerprint(strategies(), extra="seed-5")
+    live_fills = []
+    with SignalRecorder(path, fp) as rec:
+        eng, live = make_engine(stream(), strategies(), live_fills, rec)
+        eng.run()
+    assert rec.count > 0
+
+    replay_fills = []
+    eng, acct = make_engine([], [], replay_fills)
+    n = eng.replay(SignalRecording(path).check(fp).signals())
+    assert n == rec.count
+    assert replay_fills == live_fills
+    assert acct.cash == live.cash and dict(acct.positions) == dict(live.positions)
+
+def test_roundtrip_keeps_extra_keys_and_timestamps(tmp_path):
+    path = str(tmp_path / "s.bin")
+    sig = {"symbol": "AAPL", "action": "SELL", "size": 5.0, "price": 101.25, "meta": {"mean": 100.5},
+           "strategy": "X", "order_type": "limit"}
+    with SignalRecorder(path, "fp", meta={"run": 1}) as rec:
+        rec.record(T0, sig)
+        rec.record(T0 + timedelta(microseconds=7), {**sig, "meta": {}, "strategy": "Y"})
+    recording = SignalRecording(path)
+    assert recording.meta == {"run": 1}
+    (t1, s1), (t2, s2) = list(recording)
+    assert (t1, s1) == (T0, sig)
+    assert t2 == T0 + timedelta(microseconds=7) and s2["strategy"] == "Y"
+
+def test_fingerprint_guards_stale_recordings(tmp_path):
+    data = tmp_path / "ticks.csv"
+    data.write_text("timestamp,symbol,price\n2025-01-01T09:30:00Z,AAPL,100\n")
+    fp = fingerprint(strategies(), [str(data)])
+    path = str(tmp_path / "s.bin")
+    SignalRecorder(path, fp).close()
+    SignalRecording(path).check(fp)
+    with pytest.raises(StaleRecordingError):
+        SignalRecording(path).check(fingerprint([MeanReversionStrategy(window=11), BreakoutStrategy(window=15)], [str(data)]))
+    data.write_text("timestamp,symbol,price\n2025-01-01T09:30:00Z,AAPL,101\n")
+    with pytest.raises(StaleRecordingError):
+        SignalRecording(path).check(fingerprint(strategies(), [str(data)]))
+
+def test_truncated_file_is_reported(tmp_path):
+    path = tmp_path / "s.bin"
+    with SignalRecorder(str(path), "fp") as rec:
+        rec.record(T0, {"symbol": "A", "action": "BUY", "size": 1, "price": 1.0, "strategy": "S"})
+    path.write_bytes(path.read_bytes()[:-3])
+    with pytest.raises(ValueError, match="truncated"):
+        list(SignalRecording(str(path)))
+
+def test_recording_goes_stale_when_signal_shaping_config_changes(tmp_path):
+    from patterns.singleton import Config
+    from main import signal_fingerprint
+    data = tmp_path / "ticks.csv"
+    data.write_text("timestamp,symbol,price\n")
+    cfg = Config.__new__(Config)       # bypass singleton loader for test
+    cfg._data = {"reorder_lateness_seconds": 2.0, "conflate_lag_seconds": None}
+    path = str(tmp_path / "signals.bin")
+    SignalRecorder(path, signal_fingerprint(cfg, [str(data)])).close()
+    SignalRecording(path).check(signal_fingerprint(cfg, [str(data)]))
+    cfg._data["conflate_lag_seconds"] = 0.5
+    with pytest.raises(StaleRecordingError):
+        SignalRecording(path).check(signal_fingerprint(cfg, [str(data)]))
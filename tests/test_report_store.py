@@ -0,0 +1,81 @@
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from report_store import RunReportWriter, RunReport
+from pnl import EquityCurve
+
+def test_chunks_manifest_and_lazy_load(tmp_path):
+    w = RunReportWriter(str(tmp_path), run_id="r1", chunk_rows=4, fmt="csv")
+    for i in range(10):
+        w.update({"symbol": "AAPL", "action": "BUY", "price": 100.0 + i, "quantity": 1})
+    w.on_fill({"symbol": "AAPL", "action": "BUY", "price": 101.0, "quantity": 1, "status": "executed"})
+    path = w.close()
+
+    rep = RunReport(path)
+    assert sorted(rep.streams()) == ["fills", "signals"]
+    assert rep.rows("signals") == 10
+    assert rep.manifest["streams"]["signals"]["parts"] == ["part-00000.csv", "part-00001.csv", "part-00002.csv"]
+    chunks = list(rep.iter_chunks("signals"))
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    df = rep.load("signals")
+    assert df["price"].tolist() == [100.0 + i for i in range(10)]
+
+def test_heterogeneous_rows_and_nested_values(tmp_path):
+    with RunReportWriter(str(tmp_path), run_id="r2", fmt="csv") as w:
+        w.record_stats("ingest", ticks=5)
+        w.record_stats("route", orders=2, meta={"late": 1})
+    rows = list(RunReport(w.path).iter_rows("stats"))
+    assert rows[0] == {"stage": "ingest", "ticks": "5", "orders": "", "meta": ""}
+    assert rows[1]["meta"] == '{"late": 1}'
+
+def test_equity_curve_stream(tmp_path):
+    curve = EquityCurve(capacity=8)
+    for i in range(5):
+        curve.append(i, 1000.0 + i)
+    w = RunReportWriter(str(tmp_path), run_id="r3", fmt="csv")
+    w.write_equity_curve(curve)
+    w.close()
+    assert RunReport(w.path).load("equity")["equity"].tolist() == [1000.0 + i for i in range(5)]
+
+def test_closed_writer_rejects_rows_and_bad_format(tmp_path):
+    w = RunReportWriter(str(tmp_path), run_id="r4", fmt="csv")
+    w.close()
+    with pytest.raises(RuntimeError):
+        w.update({"symbol": "X"})
+    with pytest.raises(ValueError):
+        RunReportWriter(str(tmp_path), fmt="xlsx")
+
+def test_parquet_chunks_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    w = RunReportWriter(str(tmp_path), run_id="r5", chunk_rows=3, fmt="parquet")
+    for i in range(7):
+        w.update({"symbol": "AAPL", "action": "SELL", "price": 50.0 + i, "meta": {"i": i}})
+    w.record_stats("run", orders=7)
+    rep = RunReport(w.close())
+    assert rep.manifest["streams"]["signals"]["parts"][-1] == "part-00002.parquet"
+    assert [len(c) for c in rep.iter_chunks("signals")] == [3, 3, 1]
+    assert rep.load("signals")["price"].tolist() == [50.0 + i for i in range(7)]
+    assert next(rep.iter_rows("stats"))["orders"] == 7
+
+def test_main_streams_equity_curve_and_order_count(tmp_path):
+    import json, shutil, subprocess
+    data = tmp_path / "data"
+    data.mkdir()
+    for name in ("external_data_bloomberg.xml", "external_data_yahoo.json"):
+        shutil.copy(os.path.join(ROOT, "data", name), data / name)
+    rows = [f"2025-10-01 09:{30 + i // 60:02d}:{i % 60:02d},AAPL,{170 + (i % 40) - 20 * (i % 80 >= 40)}"
+            for i in range(240)]
+    (data / "market_data.csv").write_text("timestamp,symbol,price\n" + "\n".join(rows) + "\n")
+    cfg = {"data_path": str(data), "report_path": str(tmp_path / "reports"), "run_report": True,
+           "console_log": False}
+    (tmp_path / "config.json").write_text(json.dumps(cfg))
+    subprocess.run([sys.executable, "main.py", "--config", str(tmp_path / "config.json")],
+                   cwd=ROOT, check=True, capture_output=True)
+    (run,) = os.listdir(tmp_path / "reports")
+    rep = RunReport(str(tmp_path / "reports" / run))
+    assert rep.rows("equity") > 200
+    stats = {r["stage"]: r for r in rep.iter_rows("stats")}
+    assert int(stats["run"]["orders"]) == rep.rows("fills") > 0
+    assert float(stats["run"]["equity"]) == pytest.approx(float(list(rep.iter_rows("equity"))[-1]["equity"]))
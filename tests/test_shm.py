@@ -0,0 +1,74 @@
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+import gc
+import subprocess
+import time
+from tests.conftest import ticks
+from shm import SharedTicks
+from main import walk_forward, run_fold
+
+def make_ticks(n=200):
+    return ticks(n, symbols=("MSFT", "AAPL", "AAPL"), price=lambda i: 100.0 + i % 17)
+
+def test_attach_gives_read_only_zero_copy_views():
+    ticks = make_ticks()
+    with SharedTicks.create(ticks) as owner:
+        reader = SharedTicks.attach(owner.name)
+        assert reader.symbols == ["MSFT", "AAPL"] and len(reader) == 200
+        assert not reader.prices.flags.writeable
+        with pytest.raises(ValueError):
+            reader.prices[0] = 1.0
+        got = list(reader.ticks(5, 8))
+        assert [(t.symbol, t.price, t.timestamp) for t in got] == [(t.symbol, t.price, t.timestamp) for t in ticks[5:8]]
+        reader.close()
+        assert owner.prices[0] == 100.0          # a reader closing does not unlink
+
+def test_owner_close_and_gc_unlink_segments():
+    owner = SharedTicks.create(make_ticks(10))
+    name = owner.name
+    owner.close()
+    with pytest.raises(FileNotFoundError):
+        SharedTicks.attach(name)
+    name = SharedTicks.create(make_ticks(10)).name      # dropped immediately
+    gc.collect()
+    with pytest.raises(FileNotFoundError):
+        SharedTicks.attach(name)
+
+def test_segments_removed_when_owner_process_exits():
+    code = ("import sys; sys.path.insert(0, %r); from shm import SharedTicks; from tests.test_shm import make_ticks; "
+            "s = SharedTicks.create(make_ticks(10)); print(s.name); raise SystemExit(3)" % ROOT)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert proc.returncode == 3
+    with pytest.raises(FileNotFoundError):
+        SharedTicks.attach(proc.stdout.strip())
+
+def attached_len(name):
+    with SharedTicks.attach(name) as s:
+        return len(s)
+
+def test_segments_removed_when_owner_crashes_after_a_worker_attached():
+    code = ("import os, sys; sys.path.insert(0, %r); from concurrent.futures import ProcessPoolExecutor; "
+            "from shm import SharedTicks; from tests.test_shm import make_ticks, attached_len; "
+            "s = SharedTicks.create(make_ticks(10)); print(s.name, flush=True); "
+            "pool = ProcessPoolExecutor(1); assert pool.submit(attached_len, s.name).result() == 10; "
+            "pool.shutdown(); os._exit(3)" % ROOT)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert proc.returncode == 3, proc.stderr
+    assert "KeyError" not in proc.stderr
+    deadline = time.monotonic() + 10              # the tracker unlinks once the owner's pipe closes
+    while True:
+        try:
+            SharedTicks.attach(proc.stdout.strip()).close()
+        except FileNotFoundError:
+            break
+        assert time.monotonic() < deadline, "segments leaked after the owner crashed"
+        time.sleep(0.05)
+
+def test_walk_forward_folds_attach_by_name():
+    with SharedTicks.create(make_ticks(300)) as shared:
+        folds = walk_forward(shared.name, len(shared), folds=3, workers=2)
+        assert [(f["start"], f["stop"]) for f in folds] == [(0, 100), (100, 200), (200, 300)]
+        assert folds[1] == run_fold(shared.name, 100, 200)     # same result in-process
@@ -0,0 +1,22 @@
+import pytest
+import subprocess
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from benchmarks.startup import check, load_budgets
+
+def test_heavy_dependencies_load_on_first_use():
+    code = ("import lazy, dataloader, engine; "
+            "assert not lazy.is_loaded('pandas') and not lazy.is_loaded('numpy'); "
+            "from patterns.command import Account; Account().apply_trade('A', 1, 1.0); "
+            "assert lazy.is_loaded('numpy') and not lazy.is_loaded('pandas')")
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+@pytest.mark.skipif(not os.environ.get("STARTUP_BUDGET"),
+                    reason="wall-clock budget; set STARTUP_BUDGET=1 (or run benchmarks/startup.py)")
+def test_startup_within_configured_budget():
+    budgets = load_budgets(os.path.join(ROOT, "data", "config.json"))
+    assert "main.py --help" in budgets
+    over = [(name, ms, budget) for name, ms, budget in check(budgets, repeat=3) if ms > budget]
+    assert not over, f"startup budget exceeded: {over}"
@@ -0,0 +1,49 @@
+import math
+import statistics
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from analytics import StreamingAnalytics, VolatilityDecorator, BetaDecorator, DrawdownDecorator
+from models import Stock
+from tests.conftest import tick
+
+def feed(an, rows):
+    for i, (sym, px) in enumerate(rows):
+        an.update(tick(sym, px, i))
+
+def test_rolling_volatility_matches_batch_stdev():
+    prices = [100, 101, 99, 102, 98, 103, 97, 104]
+    an = StreamingAnalytics(window=5)
+    feed(an, [("AAPL", p) for p in prices])
+    rets = [math.log(b / a) for a, b in zip(prices, prices[1:])][-5:]
+    assert an.volatility("AAPL") == pytest.approx(statistics.stdev(rets))
+    assert an.ewma_volatility("AAPL") > 0
+
+def test_beta_against_benchmark_and_drawdown():
+    an = StreamingAnalytics(window=50, benchmark="SPY")
+    spy, lev = 100.0, 50.0
+    rows = []
+    for i in range(30):
+        r = 0.01 if i % 3 else -0.015
+        spy *= math.exp(r); lev *= math.exp(2 * r)
+        rows += [("SPY", spy), ("LEV", lev)]
+    feed(an, rows)
+    assert an.beta("LEV") == pytest.approx(2.0, rel=1e-6)
+    assert an.beta("SPY") == 1.0
+
+    feed(an, [("DD", p) for p in (100, 120, 90, 110, 60, 130)])
+    assert an.max_drawdown("DD") == pytest.approx(0.5)
+
+def test_decorators_read_shared_state():
+    an = StreamingAnalytics(window=10)
+    feed(an, [("AAPL", p) for p in (100, 102, 101, 90)])
+    stock = Stock("AAPL", 90.0, "Technology", "Apple Inc.")
+    m = DrawdownDecorator(BetaDecorator(VolatilityDecorator(stock, analytics=an))).get_metrics()
+    assert m["volatility"] == round(an.volatility("AAPL"), 6)
+    assert m["max_drawdown"] == round(1 - 90 / 102, 6)
+    assert m["beta"] == 0.0            # no benchmark ticks yet
+    # unseen symbols keep the static fallback
+    other = VolatilityDecorator(Stock("MSFT", 12.34, "Technology", "Microsoft"), analytics=an)
+    assert other.get_metrics()["volatility"] == round((math.log1p(12.34) % 0.2) + 0.01, 6)
@@ -0,0 +1,53 @@
+import json
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from patterns.singleton import Config
+from patterns.observer import SignalPublisher, LoggerObserver
+from reporting import StructuredLogSink
+import reporting
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_sink_writes_json_lines_without_console(tmp_path, capsys):
+    cfg = Config.__new__(Config)       # bypass singleton loader for test
+    cfg._data = {"report_path": str(tmp_path)}
+    sink = StructuredLogSink.from_config(cfg, flush_interval=60)
+    pub = SignalPublisher()
+    pub.attach(LoggerObserver(console=False, sink=sink))
+    pub.attach(reporting.LoggerObserver(console=False, sink=sink))
+
+    pub.notify({"symbol": "AAPL", "action": "BUY", "size": 10, "price": 150.0})
+    sink.write("fill", {"status": "executed", "symbol": "AAPL"})
+    sink.close()
+
+    assert capsys.readouterr().out == ""
+    rows = read_lines(sink.path)
+    assert [r["kind"] for r in rows] == ["signal", "signal", "fill"]
+    assert rows[0]["symbol"] == "AAPL" and rows[0]["price"] == 150.0
+
+def test_background_thread_flushes_batches(tmp_path):
+    sink = StructuredLogSink(str(tmp_path), batch_size=5, flush_interval=60)
+    for i in range(5):
+        sink.write("signal", {"i": i})
+    # reaching batch_size wakes the writer thread; no explicit flush needed
+    for _ in range(200):
+        if sink.written == 5:
+            break
+        sink._thread.join(0.01)
+    assert sink.written == 5
+    sink.close()
+
+def test_sink_rotates_by_size(tmp_path):
+    sink = StructuredLogSink(str(tmp_path), max_bytes=200, backups=2, flush_interval=60)
+    for i in range(20):
+        sink.write("signal", {"i": i, "pad": "x" * 50})
+        sink.flush()
+    sink.close()
+    names = sorted(os.listdir(tmp_path))
+    assert names == ["events.jsonl", "events.jsonl.1", "events.jsonl.2"]
+    assert os.path.getsize(os.path.join(tmp_path, "events.jsonl.1")) >= 200
+    assert read_lines(os.path.join(tmp_path, "events.jsonl.1"))[-1]["i"] < 20
@@ -0,0 +1,59 @@
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from patterns.observer import SignalPublisher, AsyncSignalPublisher, SubscriptionIndex
+import reporting
+
+class Tape:
+    def __init__(self, name, out):
+        self.name = name; self.out = out
+    def update(self, signal):
+        self.out.append((self.name, signal["symbol"], signal["action"]))
+
+def sig(symbol, action, size=10, price=100.0):
+    return {"symbol": symbol, "action": action, "size": size, "price": price}
+
+def test_filtered_subscriptions_receive_only_matching_signals():
+    out = []
+    pub = SignalPublisher()
+    pub.attach(Tape("all", out))
+    pub.attach(Tape("aapl", out), symbols={"AAPL"})
+    pub.attach(Tape("sells", out), actions=["sell"])
+    pub.attach(Tape("big_msft", out), symbols=["MSFT"], min_notional=5_000)
+
+    pub.notify(sig("AAPL", "BUY"))
+    pub.notify(sig("MSFT", "SELL"))                 # notional 1000
+    pub.notify(sig("MSFT", "BUY", size=100))        # notional 10000
+
+    assert out == [
+        ("all", "AAPL", "BUY"), ("aapl", "AAPL", "BUY"),
+        ("all", "MSFT", "SELL"), ("sells", "MSFT", "SELL"),
+        ("all", "MSFT", "BUY"), ("big_msft", "MSFT", "BUY"),
+    ]
+
+def test_index_match_touches_only_matching_buckets():
+    idx = SubscriptionIndex()
+    for i in range(500):
+        idx.add(object(), symbols={f"S{i}"})
+    hit = object()
+    idx.add(hit, symbols={"S7"}, actions={"BUY"}, min_notional=50)
+    assert [s.observer for s in idx.match(sig("S7", "BUY"))][-1] is hit
+    assert len(idx.match(sig("S7", "SELL"))) == 1
+    assert len(idx.match(sig("S7", "BUY", size=1, price=1.0))) == 1
+    idx.remove(hit)
+    assert hit not in idx and len(idx) == 500
+
+def test_async_and_reporting_publishers_share_filters():
+    out = []
+    with AsyncSignalPublisher() as apub:
+        apub.attach(Tape("spy", out), symbols={"SPY"}, policy="drop_newest")
+        apub.notify(sig("AAPL", "BUY")); apub.notify(sig("SPY", "BUY"))
+        apub.flush(timeout=2.0)
+    assert out == [("spy", "SPY", "BUY")]
+
+    rpub = reporting.SignalPublisher()
+    met = reporting.MetricsObserver()
+    rpub.attach(met, actions={"SELL"})
+    rpub.notify(sig("AAPL", "BUY")); rpub.notify(sig("AAPL", "SELL"))
+    assert met.snapshot()["by_action"] == {"SELL": 1}
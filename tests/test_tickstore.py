@@ -0,0 +1,102 @@
+import pytest
+import os, sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from datetime import datetime, timezone, timedelta
+from models import MarketDataPoint
+from tests import conftest
+from patterns.singleton import Config
+from dataloader import DataLoader
+from tickstore import TickStore, to_ns, from_ns
+
+T0 = conftest.T0.replace(hour=22, minute=0)           # late session: partitions cross midnight
+
+def make_ticks():
+    # 4 hours across midnight, two symbols, written out of order
+    ticks = conftest.ticks(120, price=lambda i: 100.0 + i, step=120, start=T0)
+    ticks += conftest.ticks(80, ("MSFT",), price=lambda i: 300.0 + i, step=180, start=T0 + timedelta(minutes=1))
+    return ticks[::-1]
+
+def test_partitions_and_ns_roundtrip(tmp_path):
+    store = TickStore(str(tmp_path), index_stride=4)
+    assert store.write(make_ticks()) == 200
+    assert store.dates() == ["2025-01-01", "2025-01-02"]
+    assert store.symbols("2025-01-02") == ["AAPL", "MSFT"]
+    ts = datetime(2025, 3, 4, 5, 6, 7, 891011, tzinfo=timezone.utc)
+    assert from_ns(to_ns(ts)) == ts
+
+@pytest.mark.parametrize("stride", [1, 3, 16, 1024])
+def test_load_range_matches_brute_force(tmp_path, stride):
+    ticks = make_ticks()
+    store = TickStore(str(tmp_path), index_stride=stride)
+    store.write(ticks)
+    start, end = T0 + timedelta(minutes=95), T0 + timedelta(hours=2, minutes=37)
+    got = store.load_range(["AAPL", "MSFT"], start, end)
+    want = sorted((t for t in ticks if start <= t.timestamp < end), key=lambda t: (t.timestamp, t.symbol))
+    assert [(t.symbol, t.price, t.timestamp) for t in got] == [(t.symbol, t.price, t.timestamp) for t in want]
+    assert store.load_range("GOOG", start, end) == []
+
+def test_incremental_write_merges_sorted(tmp_path):
+    store = TickStore(str(tmp_path), index_stride=2)
+    store.write([MarketDataPoint("AAPL", 2.0, T0 + timedelta(seconds=2))])
+    store.write([MarketDataPoint("AAPL", 1.0, T0 + timedelta(seconds=1)),
+                 MarketDataPoint("AAPL", 3.0, T0 + timedelta(seconds=3))])
+    ts, px = store.load_arrays("AAPL", T0, T0 + timedelta(minutes=1))
+    assert px.tolist() == [1.0, 2.0, 3.0]
+    assert (ts[1:] > ts[:-1]).all()
+
+def test_import_from_adapters(tmp_path):
+    cfg = Config.__new__(Config)       # bypass singleton loader for test
+    cfg._data = {"data_path": os.path.join(ROOT, "data")}
+    store = TickStore(str(tmp_path))
+    n = store.import_files(DataLoader(cfg), ["external_data_yahoo.json", "external_data_bloomberg.xml"])
+    assert n == 2
+    got = store.load_range(["AAPL", "MSFT"], datetime(2025, 10, 1, tzinfo=timezone.utc),
+                           datetime(2025, 10, 2, tzinfo=timezone.utc))
+    assert [(t.symbol, t.price) for t in got] == [("AAPL", 172.35), ("MSFT", 328.10)]
+
+def test_later_ticks_append_in_place_and_keep_the_index(tmp_path, monkeypatch):
+    import numpy as np
+    store = TickStore(str(tmp_path), index_stride=3)
+    ticks = [MarketDataPoint("AAPL", float(i), T0 + timedelta(seconds=i)) for i in range(20)]
+    store.write(ticks[:5])
+    d = os.path.join(str(tmp_path), "2025-01-01", "AAPL")
+    inode = os.stat(os.path.join(d, "ts.i8")).st_ino
+    def no_memmap(*a, **k):
+        raise AssertionError("write must not map partition files")
+    monkeypatch.setattr(np, "memmap", no_memmap)
+    for lo, hi in ((5, 7), (7, 13), (13, 20)):           # batch sizes that straddle index strides
+        store.write(ticks[lo:hi][::-1])
+    assert os.stat(os.path.join(d, "ts.i8")).st_ino == inode                    # never rewritten
+    store.write([MarketDataPoint("AAPL", 99.0, T0 + timedelta(seconds=19))])    # tie with the tail: replaces it
+    store.write([MarketDataPoint("AAPL", -1.0, T0 - timedelta(seconds=1))])     # out of order: merge
+    monkeypatch.undo()
+    ts = np.fromfile(os.path.join(d, "ts.i8"), dtype="<i8")
+    assert np.fromfile(os.path.join(d, "index.i8"), dtype="<i8").tolist() == ts[::3].tolist()
+    _, px = store.load_arrays("AAPL", T0 - timedelta(minutes=1), T0 + timedelta(minutes=1))
+    assert px.tolist() == [-1.0] + [float(i) for i in range(19)] + [99.0]
+
+def test_reimport_keeps_one_row_per_timestamp(tmp_path):
+    cfg = Config.__new__(Config)
+    cfg._data = {"data_path": os.path.join(ROOT, "data")}
+    store = TickStore(str(tmp_path), index_stride=2)
+    ticks = make_ticks()
+    store.write(ticks)
+    store.write(ticks[::-1])
+    store.write([MarketDataPoint("AAPL", 1.0, T0), MarketDataPoint("AAPL", 2.0, T0)])   # last one wins
+    ts, px = store.load_arrays("AAPL", T0, T0 + timedelta(hours=5))
+    assert len(ts) == 120 and (ts[1:] > ts[:-1]).all() and px[0] == 2.0
+    files = ["external_data_yahoo.json", "external_data_bloomberg.xml"]
+    for _ in range(2):
+        store.import_files(DataLoader(cfg), files)
+    got = store.load_range(["AAPL", "MSFT"], datetime(2025, 10, 1, tzinfo=timezone.utc),
+                           datetime(2025, 10, 2, tzinfo=timezone.utc))
+    assert [(t.symbol, t.price) for t in got] == [("AAPL", 172.35), ("MSFT", 328.10)]
+
+@pytest.mark.parametrize("symbol", ["../escape", "A/B", "..", ""])
+def test_symbol_cannot_leave_the_store(tmp_path, symbol):
+    store = TickStore(str(tmp_path / "store"))
+    with pytest.raises(ValueError, match="partition"):
+        store.write([MarketDataPoint(symbol, 1.0, T0)])
+    assert not os.path.exists(str(tmp_path / "escape"))
@@ -0,0 +1,180 @@
+# tickstore.py
+# date/symbol partitioned binary tick store with time-range queries
+
+from __future__ import annotations
+from typing import Dict, Iterable, List, Sequence, Tuple
+from datetime import datetime, timedelta, timezone
+import os
+import numpy as np
+from models import MarketDataPoint
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NS = timedelta(microseconds=1)
+TS_FILE, PX_FILE, INDEX_FILE = "ts.i8", "px.f8", "index.i8"
+
+
+def to_ns(ts: datetime) -> int:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return (ts - EPOCH) // _NS * 1000
+
+
+def from_ns(ns: int) -> datetime:
+    return EPOCH + timedelta(microseconds=int(ns) // 1000)
+
+
+class TickStore:
+    """
+    Ticks on disk as root/YYYY-MM-DD/SYMBOL/{ts.i8, px.f8, index.i8}.
+    - ts.i8 / px.f8: fixed-width little-endian int64 ns UTC timestamps and
+      float64 prices, sorted by timestamp
+    - index.i8: every `index_stride`-th timestamp (sparse index)
+    load_range() memory-maps a partition, binary-searches the sparse index and
+    then only the one stride-sized block around each bound, so reading two hours
+    out of a month touches just the pages in that window.
+    write() appends in place when the new ticks start after a partition's last
+    timestamp, and only rewrites (sort-merge) partitions it must reorder.
+    A timestamp is stored once per partition: the last price written for it wins,
+    so importing the same file twice leaves the store unchanged.
+    """
+    def __init__(self, root: str, index_stride: int = 1024):
+        if index_stride < 1:
+            raise ValueError("index_stride must be >= 1")
+        self.root = root
+        self.index_stride = index_stride
+
+    def _dir(self, day: str, symbol: str) -> str:
+        if not symbol or symbol in (".", "..") or "/" in symbol or "\\" in symbol or os.sep in symbol:
+            raise ValueError(f"symbol {symbol!r} is not a valid partition name")
+        return os.path.join(self.root, day, symbol)
+
+    # ==== write ====
+    def write(self, ticks: Iterable[MarketDataPoint]) -> int:
+        """Merge ticks into their date/symbol partitions; returns the number written."""
+        parts: Dict[Tuple[str, str], Tuple[List[int], List[float]]] = {}
+        n = 0
+        for t in ticks:
+            ns = to_ns(t.timestamp)
+            day = from_ns(ns).strftime("%Y-%m-%d")
+            ts, px = parts.setdefault((day, t.symbol), ([], []))
+            ts.append(ns); px.append(float(t.price))
+            n += 1
+        for (day, symbol), (ts, px) in parts.items():
+            self._merge(day, symbol, np.array(ts, dtype="<i8"), np.array(px, dtype="<f8"))
+        return n
+
+    @staticmethod
+    def _last_per_ts(ts: np.ndarray, px: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Stable sort by timestamp, keeping only the last row of each run of equal timestamps."""
+        order = np.argsort(ts, kind="stable")
+        ts, px = ts[order], px[order]
+        keep = np.append(ts[1:] != ts[:-1], True)
+        return ts[keep], px[keep]
+
+    def _merge(self, day: str, symbol: str, ts: np.ndarray, px: np.ndarray) -> None:
+        ts, px = self._last_per_ts(ts, px)
+        d = self._dir(day, symbol)
+        os.makedirs(d, exist_ok=True)
+        ts_path = os.path.join(d, TS_FILE)
+        n_old = os.path.getsize(ts_path) // 8 if os.path.exists(ts_path) else 0
+        if n_old:
+            with open(ts_path, "rb") as f:
+                f.seek((n_old - 1) * 8)
+                tail = int(np.frombuffer(f.read(8), dtype="<i8")[0])
+            if ts[0] > tail:                            # the common case: appending later ticks
+                self._append(d, n_old, ts, px)
+                return
+            # read into memory (no memmap) so nothing maps the files os.replace swaps out
+            old_ts = np.fromfile(ts_path, dtype="<i8", count=n_old)
+            old_px = np.fromfile(os.path.join(d, PX_FILE), dtype="<f8", count=n_old)
+            # new rows sort after existing ones on ties, so their price replaces the stored one
+            ts, px = self._last_per_ts(np.concatenate([old_ts, ts]), np.concatenate([old_px, px]))
+        for name, arr in ((PX_FILE, px), (TS_FILE, ts), (INDEX_FILE, ts[:: self.index_stride])):
+            tmp = os.path.join(d, name + ".tmp")
+            arr.tofile(tmp)
+            os.replace(tmp, os.path.join(d, name))
+
+    def _append(self, d: str, n_old: int, ts: np.ndarray, px: np.ndarray) -> None:
+        """
+        Extend a partition in place. ts.i8 is the source of truth for the row
+        count: px.f8 and index.i8 are cut back to match it first, so a write
+        interrupted part-way is repaired by the next one.
+        """
+        stride = self.index_stride
+        first = -(-n_old // stride) * stride              # next row position that is indexed
+        for name, arr, keep in ((PX_FILE, px, n_old), (INDEX_FILE, ts[first - n_old:: stride], first // stride),
+                                (TS_FILE, ts, n_old)):
+            with open(os.path.join(d, name), "r+b") as f:
+                f.truncate(keep * 8)
+                f.seek(0, os.SEEK_END)
+                arr.tofile(f)
+
+    def import_files(self, loader, paths: str | Sequence[str]) -> int:
+        """Import CSV/JSON/XML files through DataLoader.load_market_data."""
+        return self.write(loader.load_market_data(paths))
+
+    # ==== read ====
+    def _read(self, day: str, symbol: str) -> Tuple[np.ndarray, np.ndarray]:
+        d = self._dir(day, symbol)
+        path = os.path.join(d, TS_FILE)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.zeros(0, dtype="<i8"), np.zeros(0, dtype="<f8")
+        return (np.memmap(path, dtype="<i8", mode="r"),
+                np.memmap(os.path.join(d, PX_FILE), dtype="<f8", mode="r"))
+
+    def dates(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+
+    def symbols(self, day: str) -> List[str]:
+        d = os.path.join(self.root, day)
+        return sorted(os.listdir(d)) if os.path.isdir(d) else []
+
+    def _bound(self, ts: np.ndarray, index: np.ndarray, value: int) -> int:
+        """searchsorted(ts, value, 'left') touching one stride of ts."""
+        block = int(np.searchsorted(index, value, side="left")) - 1
+        if block < 0:
+            return 0
+        lo = block * self.index_stride
+        hi = min(lo + self.index_stride + 1, len(ts))
+        return lo + int(np.searchsorted(ts[lo:hi], value, side="left"))
+
+    def slice(self, day: str, symbol: str, start_ns: int, end_ns: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows of one partition with start_ns <= ts < end_ns (copied out of the memmap)."""
+        ts, px = self._read(day, symbol)
+        if not len(ts):
+            return ts, px
+        index = np.fromfile(os.path.join(self._dir(day, symbol), INDEX_FILE), dtype="<i8")
+        if len(index) != -(-len(ts) // self.index_stride):   # interrupted write: rebuild
+            index = np.array(ts[:: self.index_stride])
+        i, j = self._bound(ts, index, start_ns), self._bound(ts, index, end_ns)
+        return np.array(ts[i:j]), np.array(px[i:j])
+
+    def load_arrays(self, symbol: str, start: datetime, end: datetime) -> Tuple[np.ndarray, np.ndarray]:
+        """Timestamps (int64 ns) and prices for one symbol over [start, end)."""
+        s, e = to_ns(start), to_ns(end)
+        day, last = from_ns(s).date(), from_ns(e).date()
+        ts_parts, px_parts = [], []
+        while day <= last:
+            ts, px = self.slice(day.isoformat(), symbol, s, e)
+            if len(ts):
+                ts_parts.append(ts); px_parts.append(px)
+            day += timedelta(days=1)
+        if not ts_parts:
+            return np.zeros(0, dtype="<i8"), np.zeros(0, dtype="<f8")
+        return np.concatenate(ts_parts), np.concatenate(px_parts)
+
+    def load_range(self, symbols: Sequence[str], start: datetime, end: datetime) -> List[MarketDataPoint]:
+        """MarketDataPoints for `symbols` over [start, end), merged in timestamp order (ties follow `symbols`)."""
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        ts_parts, px_parts, sym_parts = [], [], []
+        for k, sym in enumerate(symbols):
+            ts, px = self.load_arrays(sym, start, end)
+            ts_parts.append(ts); px_parts.append(px); sym_parts.append(np.full(len(ts), k))
+        if not ts_parts:
+            return []
+        ts, px, code = np.concatenate(ts_parts), np.concatenate(px_parts), np.concatenate(sym_parts)
+        order = np.argsort(ts, kind="stable")
+        return [MarketDataPoint(symbols[code[i]], float(px[i]), from_ns(ts[i])) for i in order]
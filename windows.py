@@ -0,0 +1,130 @@
+# windows.py
+# one rolling price window per symbol, shared by every strategy of an engine
+
+from __future__ import annotations
+from typing import Dict, List, Tuple
+from collections import deque
+from itertools import islice
+from models import MarketDataPoint
+
+
+class WindowView:
+    """
+    Last `length` prices of one symbol (ending `lag` prices before the newest),
+    shared by every strategy that asked for the same (length, lag).
+    max/min come from monotonic deques (O(1) amortized per tick); sum is
+    computed at most once per tick and cached, in the same order as sum(deque)
+    so results are bit-identical to a strategy's own window.
+    """
+    __slots__ = ("length", "lag", "series", "count", "_sum", "_sum_at", "_max", "_min")
+
+    def __init__(self, series: "_Series", length: int, lag: int):
+        self.series = series
+        self.length = length
+        self.lag = lag
+        self.count = 0
+        self._sum = 0.0
+        self._sum_at = -1                   # series.n when _sum was computed
+        self._max: deque = deque()          # (index, price), prices decreasing
+        self._min: deque = deque()          # (index, price), prices increasing
+
+    def _push(self, idx: int) -> None:
+        """Price `idx` enters the window (and idx - length leaves it)."""
+        px = self.series.at(idx)
+        out = idx - self.length
+        if out < 0:
+            self.count += 1
+        mx, mn = self._max, self._min
+        while mx and mx[-1][1] <= px: mx.pop()
+        mx.append((idx, px))
+        while mx[0][0] <= out: mx.popleft()
+        while mn and mn[-1][1] >= px: mn.pop()
+        mn.append((idx, px))
+        while mn[0][0] <= out: mn.popleft()
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def sum(self) -> float:
+        n = self.series.n
+        if self._sum_at != n:
+            self._sum = sum(self.values())
+            self._sum_at = n
+        return self._sum
+
+    @property
+    def max(self) -> float | None:
+        return self._max[0][1] if self.count else None
+
+    @property
+    def min(self) -> float | None:
+        return self._min[0][1] if self.count else None
+
+    @property
+    def mean(self) -> float | None:
+        return self.sum / self.count if self.count else None
+
+    def values(self) -> List[float]:
+        s = self.series
+        start = len(s.prices) - self.lag - self.count
+        return list(islice(s.prices, start, start + self.count))
+
+
+class _Series:
+    __slots__ = ("prices", "n", "views")
+
+    def __init__(self, capacity: int):
+        self.prices: deque = deque(maxlen=capacity)
+        self.n = 0                                   # prices seen so far
+        self.views: Dict[Tuple[int, int], WindowView] = {}
+
+    def at(self, idx: int) -> float:
+        return self.prices[idx - (self.n - len(self.prices))]
+
+    def append(self, price: float) -> None:
+        self.prices.append(price)
+        self.n += 1
+        for v in self.views.values():
+            idx = self.n - 1 - v.lag
+            if idx >= 0:
+                v._push(idx)
+
+
+class PriceWindows:
+    """
+    Per-symbol price history kept once for all strategies, sized to the largest
+    lookback requested. Strategies call register(length, lag) when bound and read
+    view(symbol, length, lag) on each tick; the engine calls update(tick) once per
+    tick before any strategy runs. lag=1 gives the window *before* the current
+    price (what BreakoutStrategy compares against).
+    """
+    def __init__(self):
+        self.series: Dict[str, _Series] = {}
+        self.requests: List[Tuple[int, int]] = []
+        self.capacity = 1
+
+    def register(self, length: int, lag: int = 0) -> Tuple[int, int]:
+        if length < 1 or lag < 0:
+            raise ValueError("length must be >= 1 and lag >= 0")
+        key = (length, lag)
+        if key not in self.requests:
+            if self.series:
+                raise RuntimeError("register windows before the first update")
+            self.requests.append(key)
+            self.capacity = max(self.capacity, length + lag + 1)
+        return key
+
+    def update(self, tick: MarketDataPoint) -> None:
+        s = self.series.get(tick.symbol)
+        if s is None:
+            s = self.series[tick.symbol] = _Series(self.capacity)
+            for length, lag in self.requests:
+                s.views[(length, lag)] = WindowView(s, length, lag)
+        s.append(float(tick.price))
+
+    __call__ = update
+
+    def view(self, symbol: str, length: int, lag: int = 0) -> WindowView | None:
+        s = self.series.get(symbol)
+        return s.views[(length, lag)] if s is not None else None